@@ -0,0 +1,413 @@
+import os
+import csv
+import io
+import time
+import argparse
+import logging
+from datetime import date
+from concurrent.futures import ProcessPoolExecutor
+
+from kcd_master import KCD_MASTER_FILE, load_kcd_columns
+from fee_schedule import SCRAPED_CSV, load_scraped_records
+from mapping_tables import load_all_mappings
+from code_versions import STORE_FILE, SYSTEM_KCD, SYSTEM_FEE, CodeVersionStore
+
+# 설정
+CHUNK_BYTES = 4 << 20        # 작업 단위 (약 4MB 분량의 행)
+MAX_PENDING = 4              # 워커당 대기 작업 수 (메모리 상한)
+DEFAULT_DX_COLUMNS = ["진단코드"]       # 첫 번째가 주진단 (나머지 부진단은 비어 있어도 됨)
+DEFAULT_PROC_COLUMNS = ["수가코드"]
+DEFAULT_DATE_COLUMN = "진료일자"
+
+# 오류 사유
+KCD_MISSING = "진단코드 누락"
+KCD_UNKNOWN = "KCD에 없는 코드"
+KCD_NOT_BILLABLE = "최하위코드 아님 (청구 불가 상위분류)"
+KCD_NOT_VALID = "진료일자 기준 유효하지 않은 KCD 코드"
+FEE_UNKNOWN = "수가코드 목록에 없는 코드"
+FEE_NOT_VALID = "진료일자 기준 유효하지 않은 수가코드"
+DATE_INVALID = "진료일자 형식 오류"
+
+logger = logging.getLogger(__name__)
+
+# 워커 프로세스 전역 상태 (initializer에서 설정)
+_CONFIG = None
+
+
+def normalize_kcd(code):
+    """청구서 진단코드 표기 통일 ('c341' → 'C34.1', 'C34.1 ' → 'C34.1')"""
+    code = code.strip().upper().replace(".", "")
+    if len(code) > 3:
+        return code[:3] + "." + code[3:]
+    return code
+
+
+def normalize_date(value):
+    """'20250815' / '2025-08-15' → '2025-08-15' (빈 값은 None, 날짜가 아니면 ValueError)"""
+    value = value.strip()
+    if not value:
+        return None
+    if len(value) == 8 and value.isdigit():
+        value = f"{value[:4]}-{value[4:6]}-{value[6:]}"
+    return date.fromisoformat(value[:10]).isoformat()
+
+
+def build_code_sets(kcd_path=KCD_MASTER_FILE, fee_csv=SCRAPED_CSV, with_mapping_codes=False):
+    """검증용 해시 집합 사전 계산"""
+    columns = load_kcd_columns(kcd_path)
+    kcd_all, kcd_billable = set(), set()
+    for code, heading, leaf in zip(columns["질병분류코드"], columns["표제어"], columns["최하위코드"]):
+        if heading and code:
+            kcd_all.add(code)
+            if leaf == "1":
+                kcd_billable.add(code)
+
+    # 스크래핑 CSV는 상세 팝업 값이 밀려 있을 수 있어 행 코드(child_code)와 수가코드를 모두 사용
+    fee_codes = set()
+    for row in load_scraped_records(fee_csv):
+        for key in ("수가코드", "child_code"):
+            if row.get(key):
+                fee_codes.add(row[key].strip())
+    if with_mapping_codes:
+        fee_codes.update(row["수가코드"] for row in load_all_mappings() if row.get("수가코드"))
+
+    return {
+        "kcd_all": frozenset(kcd_all),
+        "kcd_billable": frozenset(kcd_billable),
+        "fee_codes": frozenset(fee_codes),
+    }
+
+
+def _init_worker(config):
+    """워커 초기화 - 코드 집합과 버전 저장소를 프로세스당 한 번만 준비"""
+    global _CONFIG
+    _CONFIG = dict(config)
+    store_path = _CONFIG.get("store_path")
+    _CONFIG["store"] = CodeVersionStore.load(store_path) if store_path else None
+    # 청구 데이터는 같은 코드/일자가 반복되므로 원문 값 단위로 판정 결과를 재사용
+    _CONFIG["dx_cache"] = {}
+    _CONFIG["proc_cache"] = {}
+    _CONFIG["date_cache"] = {}
+    _CONFIG["raw_date_cache"] = {}
+
+
+def _dx_verdict(raw):
+    """진단코드 원문 → (정규화 코드, 오류 사유 또는 None)"""
+    cfg = _CONFIG
+    code = normalize_kcd(raw)
+    if not code:
+        return code, KCD_MISSING if cfg["require_dx"] else None
+    if code not in cfg["kcd_all"]:
+        return code, KCD_UNKNOWN
+    if code not in cfg["kcd_billable"]:
+        return code, KCD_NOT_BILLABLE
+    return code, None
+
+
+def _proc_verdict(raw):
+    """수가코드 원문 → (정규화 코드, 오류 사유 또는 None)"""
+    code = raw.strip().upper()
+    if code and code not in _CONFIG["fee_codes"]:
+        return code, FEE_UNKNOWN
+    return code, None
+
+
+def _date_verdict(raw):
+    """진료일자 원문 → (정규화 일자 또는 None, 오류 사유 또는 None)"""
+    try:
+        return normalize_date(raw), None
+    except ValueError:
+        return None, DATE_INVALID
+
+
+def _valid_sets(service_date):
+    """진료일자 시점의 (KCD, 수가코드) 유효 집합 - 버전 저장소가 없으면 (None, None)"""
+    cfg = _CONFIG
+    cached = cfg["date_cache"].get(service_date)
+    if cached is None:
+        store = cfg["store"]
+        if store is None:
+            cached = (None, None)
+        else:
+            kcd = store.valid_codes(SYSTEM_KCD, service_date) if store.snapshots.get(SYSTEM_KCD) else None
+            fee = store.valid_codes(SYSTEM_FEE, service_date) if store.snapshots.get(SYSTEM_FEE) else None
+            cached = (kcd, fee)
+        cfg["date_cache"][service_date] = cached
+    return cached
+
+
+def _check_row(line_no, dx_codes, proc_codes, raw_date, errors):
+    """한 청구 라인 검증 - 오류는 errors에 (라인, 구분, 코드, 사유)로 추가"""
+    cfg = _CONFIG
+    dx_cache, proc_cache = cfg["dx_cache"], cfg["proc_cache"]
+    ok = True
+
+    # 진료일자가 날짜가 아니면 그 라인만 오류로 기록하고 버전 검증은 건너뜀
+    verdict = cfg["raw_date_cache"].get(raw_date)
+    if verdict is None:
+        verdict = cfg["raw_date_cache"][raw_date] = _date_verdict(raw_date)
+    service_date, reason = verdict
+    if reason is not None:
+        errors.append((line_no, "진료일자", raw_date.strip(), reason))
+        ok = False
+    kcd_valid, fee_valid = _valid_sets(service_date) if service_date else (None, None)
+
+    for position, raw in enumerate(dx_codes):
+        # 누락 검사는 첫 번째(주진단) 컬럼만 - 부진단 컬럼이 비어 있으면 건너뜀
+        if position and not raw.strip():
+            continue
+        verdict = dx_cache.get(raw)
+        if verdict is None:
+            verdict = dx_cache[raw] = _dx_verdict(raw)
+        code, reason = verdict
+        if reason is None and kcd_valid is not None and code and code not in kcd_valid:
+            reason = KCD_NOT_VALID
+        if reason is not None:
+            errors.append((line_no, "진단", code, reason))
+            ok = False
+
+    for raw in proc_codes:
+        verdict = proc_cache.get(raw)
+        if verdict is None:
+            verdict = proc_cache[raw] = _proc_verdict(raw)
+        code, reason = verdict
+        if reason is None and fee_valid is not None and code and code not in fee_valid:
+            reason = FEE_NOT_VALID
+        if reason is not None:
+            errors.append((line_no, "수가", code, reason))
+            ok = False
+
+    return ok
+
+
+def _validate_csv_chunk(first_line, raw_lines):
+    """CSV 원본 행 묶음 검증 (파싱도 워커에서 수행) - 라인 번호는 레코드가 시작하는 파일 줄"""
+    cfg = _CONFIG
+    dx_idx, proc_idx, date_idx = cfg["dx_idx"], cfg["proc_idx"], cfg["date_idx"]
+    errors = []
+    records = invalid_lines = 0
+
+    text = b"".join(raw_lines).decode(cfg["encoding"])
+    reader = csv.reader(io.StringIO(text))
+    consumed = 0  # 직전 레코드까지 읽은 줄 수 (따옴표 안 줄바꿈이 있으면 레코드보다 많음)
+    for fields in reader:
+        line_no, consumed = first_line + consumed, reader.line_num
+        if not fields:
+            continue
+        n = len(fields)
+        dx = [fields[i] if i < n else "" for i in dx_idx]
+        proc = [fields[i] if i < n else "" for i in proc_idx]
+        raw_date = fields[date_idx] if date_idx is not None and date_idx < n else ""
+        records += 1
+        if not _check_row(line_no, dx, proc, raw_date, errors):
+            invalid_lines += 1
+
+    return records, invalid_lines, errors
+
+
+def _validate_row_chunk(first_line, rows):
+    """이미 컬럼이 분리된 행 묶음 검증 (Parquet 입력용) - rows: [(진단코드들, 수가코드들, 진료일자)]"""
+    errors = []
+    invalid_lines = 0
+    for offset, (dx, proc, service_date) in enumerate(rows):
+        raw_date = str(service_date) if service_date else ""
+        if not _check_row(first_line + offset, dx, proc, raw_date, errors):
+            invalid_lines += 1
+    return len(rows), invalid_lines, errors
+
+
+def iter_csv_chunks(path, chunk_bytes=CHUNK_BYTES):
+    """CSV를 헤더와 (시작 라인번호, 원본 행 묶음)으로 분할 - 레코드 경계에서만 자름"""
+    with open(path, "rb") as f:
+        header = f.readline()
+        line_no = 2
+        while True:
+            lines = f.readlines(chunk_bytes)
+            if not lines:
+                break
+            # 따옴표 안 줄바꿈으로 레코드가 묶음 경계에서 잘리지 않도록 따옴표가 짝이 맞을 때까지 이어 읽음
+            quotes = sum(line.count(b'"') for line in lines)
+            while quotes % 2:
+                line = f.readline()
+                if not line:
+                    break
+                lines.append(line)
+                quotes += line.count(b'"')
+            yield header, line_no, lines
+            line_no += len(lines)
+
+
+def iter_parquet_chunks(path, dx_cols, proc_cols, date_col, batch_rows=200_000):
+    """Parquet 파일을 (시작 라인번호, 행 묶음)으로 분할 (pyarrow 필요)"""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet 입력에는 pyarrow가 필요함 (pip install pyarrow)")
+
+    parquet = pq.ParquetFile(path)
+    columns = list(dict.fromkeys(dx_cols + proc_cols + ([date_col] if date_col else [])))
+    available = set(parquet.schema_arrow.names)
+    columns = [c for c in columns if c in available]
+
+    line_no = 1
+    for batch in parquet.iter_batches(batch_size=batch_rows, columns=columns):
+        data = batch.to_pydict()
+        n = batch.num_rows
+        empty = [""] * n
+        dx = list(zip(*[data.get(c, empty) for c in dx_cols])) if dx_cols else [()] * n
+        proc = list(zip(*[data.get(c, empty) for c in proc_cols])) if proc_cols else [()] * n
+        dates = data.get(date_col, [None] * n) if date_col else [None] * n
+        rows = [
+            ([v or "" for v in dx[i]], [v or "" for v in proc[i]], dates[i])
+            for i in range(n)
+        ]
+        yield line_no, rows
+        line_no += n
+
+
+class ClaimValidator:
+    """청구 파일을 묶음 단위로 프로세스 풀에 분배해 검증"""
+
+    def __init__(self, code_sets, dx_columns=DEFAULT_DX_COLUMNS, proc_columns=DEFAULT_PROC_COLUMNS,
+                 date_column=DEFAULT_DATE_COLUMN, store_path=None, workers=None,
+                 require_dx=True, encoding="utf-8-sig"):
+        self.code_sets = code_sets
+        self.dx_columns = list(dx_columns)
+        self.proc_columns = list(proc_columns)
+        self.date_column = date_column
+        self.store_path = store_path
+        self.workers = workers or os.cpu_count() or 1
+        self.require_dx = require_dx
+        self.encoding = encoding
+
+        self.source = None
+        self.total_lines = 0
+        self.invalid_lines = 0
+        self.reason_counts = {}
+
+    def _config(self, header=None):
+        config = dict(self.code_sets)
+        config.update({
+            "store_path": self.store_path,
+            "require_dx": self.require_dx,
+            "encoding": self.encoding,
+        })
+        if header is not None:
+            names = [h.strip() for h in next(csv.reader([header.decode(self.encoding)]))]
+            missing = [c for c in self.dx_columns + self.proc_columns if c not in names]
+            if missing:
+                raise ValueError(f"청구 파일에 없는 컬럼: {missing} (헤더: {names})")
+            config["dx_idx"] = [names.index(c) for c in self.dx_columns]
+            config["proc_idx"] = [names.index(c) for c in self.proc_columns]
+            config["date_idx"] = names.index(self.date_column) if self.date_column in names else None
+        return config
+
+    def validate(self, path, error_writer=None):
+        """청구 파일 검증 - 오류 라인은 error_writer(csv.writer)로 스트리밍 기록"""
+        self.source = os.path.basename(path)
+        is_parquet = path.lower().endswith(".parquet")
+
+        if is_parquet:
+            chunks = iter_parquet_chunks(path, self.dx_columns, self.proc_columns, self.date_column)
+            config = self._config()
+            func = _validate_row_chunk
+            first = next(chunks, None)
+        else:
+            chunks = iter_csv_chunks(path)
+            first = next(chunks, None)
+            if first is None:
+                return self.summary()
+            header, line_no, lines = first
+            config = self._config(header)
+            func = _validate_csv_chunk
+            first = (line_no, lines)
+            chunks = ((n, lines) for _, n, lines in chunks)
+
+        if first is None:
+            return self.summary()
+
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(config,)) as pool:
+            pending = [pool.submit(func, *first)]
+            for chunk in chunks:
+                pending.append(pool.submit(func, *chunk))
+                # 대기 작업이 많으면 가장 오래된 결과부터 회수 (메모리 상한 + 입력 순서 유지)
+                while len(pending) >= self.workers * MAX_PENDING:
+                    self._collect(pending.pop(0).result(), error_writer)
+            for future in pending:
+                self._collect(future.result(), error_writer)
+
+        elapsed = time.perf_counter() - start
+        return self.summary(elapsed)
+
+    def _collect(self, result, error_writer):
+        lines, invalid, errors = result
+        self.total_lines += lines
+        self.invalid_lines += invalid
+        for error in errors:
+            self.reason_counts[error[3]] = self.reason_counts.get(error[3], 0) + 1
+        if error_writer is not None:
+            error_writer.writerows((self.source,) + error for error in errors)
+
+    def summary(self, elapsed=0.0):
+        return {
+            "전체_라인": self.total_lines,
+            "오류_라인": self.invalid_lines,
+            "사유별_건수": dict(sorted(self.reason_counts.items(), key=lambda kv: -kv[1])),
+            "소요시간_초": round(elapsed, 3),
+            "초당_라인": int(self.total_lines / elapsed) if elapsed else 0,
+        }
+
+
+def main():
+    """청구 라인 검증 실행"""
+    parser = argparse.ArgumentParser(description="청구 파일 진단코드(KCD)·수가코드 일괄 검증")
+    parser.add_argument("claims", nargs="+", help="청구 파일 (CSV 또는 Parquet)")
+    parser.add_argument("--dx-cols", default=",".join(DEFAULT_DX_COLUMNS), help="진단코드 컬럼 (쉼표 구분, 첫 번째가 주진단)")
+    parser.add_argument("--proc-cols", default=",".join(DEFAULT_PROC_COLUMNS), help="수가코드 컬럼 (쉼표 구분)")
+    parser.add_argument("--date-col", default=DEFAULT_DATE_COLUMN, help="진료일자 컬럼 (버전 검증용)")
+    parser.add_argument("--store", help=f"버전 저장소 JSON (지정 시 진료일자 기준 유효성 검증, 예: {STORE_FILE})")
+    parser.add_argument("--kcd", default=KCD_MASTER_FILE, help="KCD 마스터파일")
+    parser.add_argument("--fee-csv", default=SCRAPED_CSV, help="스크래핑 수가코드 CSV")
+    parser.add_argument("--with-mapping-codes", action="store_true", help="매핑테이블 수가코드도 유효 코드로 포함")
+    parser.add_argument("--workers", type=int, default=None, help="워커 프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--no-require-dx", action="store_true", help="주진단 컬럼이 비어 있어도 오류로 보지 않음")
+    parser.add_argument("--errors", help="오류 라인 CSV 저장 경로")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    code_sets = build_code_sets(args.kcd, args.fee_csv, args.with_mapping_codes)
+    logger.info(
+        f"검증 집합: KCD {len(code_sets['kcd_all'])}개 (최하위 {len(code_sets['kcd_billable'])}개), "
+        f"수가코드 {len(code_sets['fee_codes'])}개"
+    )
+
+    error_file = open(args.errors, "w", newline="", encoding="utf-8-sig") if args.errors else None
+    try:
+        writer = None
+        if error_file:
+            writer = csv.writer(error_file)
+            writer.writerow(["파일", "라인", "구분", "코드", "사유"])
+
+        for path in args.claims:
+            validator = ClaimValidator(
+                code_sets,
+                dx_columns=[c for c in args.dx_cols.split(",") if c],
+                proc_columns=[c for c in args.proc_cols.split(",") if c],
+                date_column=args.date_col,
+                store_path=args.store,
+                workers=args.workers,
+                require_dx=not args.no_require_dx,
+            )
+            summary = validator.validate(path, writer)
+            logger.info(f"📄 {path}")
+            for key, value in summary.items():
+                logger.info(f"   └─ {key}: {value}")
+    finally:
+        if error_file:
+            error_file.close()
+
+
+if __name__ == "__main__":
+    main()
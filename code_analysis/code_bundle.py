@@ -0,0 +1,353 @@
+import os
+import sys
+import json
+import math
+import mmap
+import time
+import struct
+import argparse
+import logging
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+
+from code_store import STORE_FILE, SCHEMA_VERSION, CodeStore, build_store
+from record_table import CATEGORICAL_RATIO
+
+# 설정
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(BASE_DIR, "cache")
+BUNDLE_FILE = os.path.join(CACHE_DIR, "code_bundle.bin")
+
+# 내보낼 테이블 → 정렬 키 컬럼 (fee_mappings는 수가코드 하나에 여러 행)
+EXPORT_TABLES = {
+    "kcd_codes": "질병분류코드",
+    "kcd_terms": "질병분류코드",
+    "morphology": "형태분류코드",
+    "morphology_sites": "질병분류코드",
+    "fee_codes": "수가코드",
+    "fee_mappings": "수가코드",
+}
+
+# 바이너리 포맷: 헤더 | 목차 JSON (utf-8) | 8바이트 정렬된 컬럼 블록들
+# 목차에 테이블별 행 수, 키 컬럼, 컬럼별 형식과 블록 위치(오프셋, 개수, typecode)를 기록
+MAGIC = b"CBUNDLE\x00"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sIIQ")  # magic, 포맷 버전, 예약, 목차 크기
+ALIGN = 8
+
+# 컬럼 형식
+COL_STR = "str"    # 오프셋(Q) + utf-8 힙 (None은 빈 문자열로 저장)
+COL_DICT = "dict"  # 사전 번호(B/H/I) + 사전 문자열 (str 형식)
+COL_INT = "int"    # q (None은 NULL_INT)
+COL_REAL = "real"  # d (None은 NaN)
+NULL_INT = -(1 << 63)
+
+logger = logging.getLogger(__name__)
+
+
+class _BlockWriter:
+    """8바이트 정렬 블록 누적 - (오프셋, 개수, typecode) 반환 (오프셋은 데이터 영역 기준)"""
+
+    def __init__(self):
+        self.chunks = []
+        self.size = 0
+
+    def add(self, data, typecode=None):
+        if isinstance(data, array):
+            count, typecode = len(data), data.typecode
+            if sys.byteorder != "little":
+                data = array(typecode, data)
+                data.byteswap()
+            data = data.tobytes()
+        else:
+            count = len(data)
+        offset = self.size
+        pad = -len(data) % ALIGN
+        self.chunks.append(data + b"\x00" * pad)
+        self.size += len(data) + pad
+        return [offset, count, typecode]
+
+
+def _str_blocks(writer, values):
+    encoded = [(value or "").encode("utf-8") for value in values]
+    offsets = array("Q", [0])
+    for raw in encoded:
+        offsets.append(offsets[-1] + len(raw))
+    return {"offsets": writer.add(offsets), "heap": writer.add(b"".join(encoded))}
+
+
+def _column_blocks(writer, declared, values):
+    """SQLite 선언 형식 + 고유값 비율로 컬럼 형식 결정 후 블록 기록"""
+    if declared == "INTEGER":
+        return COL_INT, {"values": writer.add(array("q", [NULL_INT if v is None else v for v in values]))}
+    if declared == "REAL":
+        return COL_REAL, {"values": writer.add(array("d", [math.nan if v is None else v for v in values]))}
+
+    distinct = sorted(set(v or "" for v in values))
+    if values and len(distinct) <= len(values) * CATEGORICAL_RATIO and len(distinct) < (1 << 32):
+        index = {value: i for i, value in enumerate(distinct)}
+        typecode = "B" if len(distinct) <= 1 << 8 else "H" if len(distinct) <= 1 << 16 else "I"
+        blocks = {"codes": writer.add(array(typecode, [index[v or ""] for v in values]))}
+        blocks.update({f"dict_{k}": v for k, v in _str_blocks(writer, distinct).items()})
+        return COL_DICT, blocks
+    return COL_STR, _str_blocks(writer, values)
+
+
+def export_bundle(store_path=STORE_FILE, path=BUNDLE_FILE, tables=EXPORT_TABLES):
+    """코드 저장소 테이블을 키 순으로 정렬해 mmap용 바이너리 번들로 기록"""
+    writer = _BlockWriter()
+    toc = {
+        "format_version": FORMAT_VERSION,
+        "schema_version": SCHEMA_VERSION,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "tables": {},
+    }
+
+    with CodeStore(store_path) as store:
+        toc["sources"] = {row["name"]: row["digest"] for row in store.query("SELECT name, digest FROM sources")}
+        for table, key in tables.items():
+            declared = {row["name"]: row["type"] for row in store.query(f"PRAGMA table_info({table})")}
+            rows = store.conn.execute(f"SELECT * FROM {table} ORDER BY {key}").fetchall()
+            columns = {}
+            for i, name in enumerate(declared):
+                kind, blocks = _column_blocks(writer, declared[name], [row[i] for row in rows])
+                columns[name] = {"type": kind, "blocks": blocks}
+            toc["tables"][table] = {"rows": len(rows), "key": key, "columns": columns}
+
+    toc_bytes = json.dumps(toc, ensure_ascii=False).encode("utf-8")
+    toc_bytes += b" " * (-(HEADER.size + len(toc_bytes)) % ALIGN)
+
+    # 새 파일에 쓴 뒤 교체 - 이미 mmap으로 열어 둔 프로세스는 이전 파일을 계속 사용
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(toc_bytes)))
+        f.write(toc_bytes)
+        for chunk in writer.chunks:
+            f.write(chunk)
+    os.replace(tmp_path, path)
+
+    size = os.path.getsize(path)
+    logger.info(f"💾 코드 번들 저장: {path} ({size / 1024:.0f}KB)")
+    for table, info in toc["tables"].items():
+        kinds = [column["type"] for column in info["columns"].values()]
+        logger.info(f"   └─ {table}: {info['rows']}개 행, 컬럼 {len(kinds)}개 ({', '.join(sorted(set(kinds)))})")
+    return toc
+
+
+class _Strings:
+    """mmap 위의 오프셋 + 힙 문자열 시퀀스 (접근한 항목만 디코딩)"""
+
+    def __init__(self, offsets, heap):
+        self.offsets = offsets
+        self.heap = heap
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return bytes(self.heap[self.offsets[i]:self.offsets[i + 1]]).decode("utf-8")
+
+
+class _Dictionary:
+    """사전 인코딩 컬럼 - 사전은 처음 접근할 때 한 번만 디코딩 (고유값 수만큼)"""
+
+    def __init__(self, codes, strings):
+        self.codes = codes
+        self.strings = strings
+        self.values = None
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, i):
+        if self.values is None:
+            self.values = [self.strings[j] for j in range(len(self.strings))]
+        return self.values[self.codes[i]]
+
+
+class BundleTable:
+    """번들의 테이블 하나 - 키 컬럼이 정렬되어 있어 bisect로 O(log n) 조회"""
+
+    def __init__(self, name, rows, key, columns):
+        self.name = name
+        self.rows = rows
+        self.key = key
+        self.columns = columns  # 컬럼명 → (형식, 시퀀스)
+        self.keys = columns[key][1]
+
+    def __len__(self):
+        return self.rows
+
+    def value(self, name, i):
+        kind, seq = self.columns[name]
+        value = seq[i]
+        if kind == COL_INT:
+            return None if value == NULL_INT else value
+        if kind == COL_REAL:
+            return None if math.isnan(value) else value
+        return value or None
+
+    def row(self, i):
+        return {name: self.value(name, i) for name in self.columns}
+
+    def find(self, code):
+        """키 → (시작, 끝) 행 범위"""
+        return bisect_left(self.keys, code), bisect_right(self.keys, code)
+
+    def get(self, code):
+        """키가 같은 첫 행 (없으면 None)"""
+        lo, hi = self.find(code)
+        return self.row(lo) if lo < hi else None
+
+    def get_all(self, code):
+        lo, hi = self.find(code)
+        return [self.row(i) for i in range(lo, hi)]
+
+    def prefix(self, prefix):
+        """접두어가 같은 행 번호 범위"""
+        return range(bisect_left(self.keys, prefix), bisect_left(self.keys, prefix + "\uffff"))
+
+
+class CodeBundle:
+    """mmap으로 연 코드 번들 - 목차 JSON만 읽고 컬럼은 배열 뷰로 바로 참조 (파싱 없음)"""
+
+    def __init__(self, path=BUNDLE_FILE):
+        if sys.byteorder != "little":
+            raise RuntimeError("리틀 엔디언 환경에서만 mmap 로딩 지원")
+
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        self._views = [view]
+
+        magic, version, _, toc_size = HEADER.unpack_from(view, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 번들 파일 형식: {path}")
+        self.toc = json.loads(bytes(view[HEADER.size:HEADER.size + toc_size]))
+        self._data = HEADER.size + toc_size
+
+        self.tables = {}
+        for name, info in self.toc["tables"].items():
+            columns = {}
+            for column, spec in info["columns"].items():
+                blocks = spec["blocks"]
+                if spec["type"] == COL_STR:
+                    seq = _Strings(self._block(blocks["offsets"]), self._block(blocks["heap"]))
+                elif spec["type"] == COL_DICT:
+                    strings = _Strings(self._block(blocks["dict_offsets"]), self._block(blocks["dict_heap"]))
+                    seq = _Dictionary(self._block(blocks["codes"]), strings)
+                else:
+                    seq = self._block(blocks["values"])
+                columns[column] = (spec["type"], seq)
+            self.tables[name] = BundleTable(name, info["rows"], info["key"], columns)
+
+    def _block(self, block):
+        offset, count, typecode = block
+        start = self._data + offset
+        if typecode is None:
+            part = self._views[0][start:start + count]
+        else:
+            part = self._views[0][start:start + count * struct.calcsize(typecode)].cast(typecode)
+        self._views.append(part)
+        return part
+
+    def close(self):
+        for table in self.tables.values():
+            for _, seq in table.columns.values():
+                if isinstance(seq, _Dictionary):
+                    seq.values = None
+        self.tables = {}
+        for v in reversed(self._views):
+            v.release()
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __getitem__(self, table):
+        return self.tables[table]
+
+    def kcd(self, code):
+        return self.tables["kcd_codes"].get(code)
+
+    def fee(self, code):
+        return self.tables["fee_codes"].get(code)
+
+    def fee_mappings(self, code):
+        return self.tables["fee_mappings"].get_all(code)
+
+    def morphologies_for_kcd(self, code):
+        """KCD 코드(또는 소분류)에 연결된 형태분류"""
+        sites = self.tables["morphology_sites"]
+        morphology = self.tables["morphology"]
+        codes = {row["형태분류코드"] for c in {code, code.split(".")[0]} for row in sites.get_all(c)}
+        return [morphology.get(m) for m in sorted(codes)]
+
+
+def main():
+    """코드 번들 내보내기/조회 실행"""
+    parser = argparse.ArgumentParser(description="KCD·수가코드 mmap 바이너리 번들")
+    parser.add_argument("--bundle", default=BUNDLE_FILE, help="번들 파일 경로")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    export = sub.add_parser("export", help="코드 저장소 → 번들 (저장소가 원본보다 오래되었으면 먼저 갱신)")
+    export.add_argument("--store", default=STORE_FILE)
+    export.add_argument("--no-build", action="store_true", help="저장소 갱신 생략")
+
+    sub.add_parser("info", help="번들 목차 출력")
+
+    lookup = sub.add_parser("lookup", help="코드 조회 (예: lookup kcd_codes C34.1 C50.9)")
+    lookup.add_argument("table", choices=list(EXPORT_TABLES))
+    lookup.add_argument("codes", nargs="+")
+
+    bench = sub.add_parser("bench", help="열기 시간 + 조회 처리량 측정")
+    bench.add_argument("--lookups", type=int, default=100_000)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.command == "export":
+        if not args.no_build:
+            build_store(args.store)
+        export_bundle(args.store, args.bundle)
+        return
+
+    start = time.perf_counter()
+    with CodeBundle(args.bundle) as bundle:
+        opened = (time.perf_counter() - start) * 1000
+
+        if args.command == "info":
+            toc = bundle.toc
+            logger.info(f"포맷 {toc['format_version']}, 스키마 {toc['schema_version']}, 생성 {toc['created']} (열기 {opened:.2f}ms)")
+            for name, info in toc["tables"].items():
+                logger.info(f"   └─ {name}: {info['rows']}개 행, 키 {info['key']}")
+                for column, spec in info["columns"].items():
+                    logger.info(f"      {column}: {spec['type']}")
+
+        elif args.command == "lookup":
+            table = bundle[args.table]
+            for code in args.codes:
+                rows = table.get_all(code)
+                print(json.dumps({"code": code, "rows": rows}, ensure_ascii=False))
+            logger.info(f"열기 {opened:.2f}ms")
+
+        else:
+            table = bundle["kcd_codes"]
+            step = max(1, len(table) // 1000)
+            codes = [table.keys[i] for i in range(0, len(table), step)]
+            start = time.perf_counter()
+            for i in range(args.lookups):
+                table.get(codes[i % len(codes)])
+            elapsed = time.perf_counter() - start
+            logger.info(f"열기 {opened:.2f}ms, KCD 조회 {args.lookups}회 {elapsed * 1000:.0f}ms "
+                        f"({args.lookups / elapsed:,.0f}회/초, 평균 {elapsed / args.lookups * 1e6:.1f}µs)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+import os
+import csv
+import sys
+import mmap
+import time
+import struct
+import argparse
+import logging
+from array import array
+from bisect import bisect_left
+
+from kcd_master import KCD_MASTER_FILE, load_kcd_rows, load_morphology_rows, kcd_headings, split_neoplasm_codes
+from mapping_tables import load_all_mappings
+
+# 설정
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(BASE_DIR, "cache")
+GRAPH_FILE = os.path.join(CACHE_DIR, "code_graph.bin")
+
+# 노드 종류 (노드 키 = "종류:코드")
+NODE_KINDS = ("kcd", "fee", "drug", "snomed", "morph")
+
+# 매핑 유형별 간선 가중치
+MAPPING_WEIGHTS = {"exact": 1.0, "broad": 0.5, "narrow": 0.5}
+
+# 바이너리 포맷: 헤더 | 이름 오프셋(Q) | 정방향 indptr(Q) | 역방향 indptr(Q)
+#               | 정방향 indices(I) | 역방향 indices(I) | 정방향 가중치(f) | 역방향 가중치(f) | 이름 힙(utf-8)
+MAGIC = b"CGRAPH\x00\x00"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sIIQQ")  # magic, version, 노드 수, 간선 수, 힙 크기
+
+logger = logging.getLogger(__name__)
+
+
+def node_key(kind, code):
+    """노드 키 생성"""
+    if kind not in NODE_KINDS:
+        raise ValueError(f"알 수 없는 노드 종류: {kind}")
+    return f"{kind}:{code}"
+
+
+class CodeGraphBuilder:
+    """간선을 모아 CSR(Compressed Sparse Row) 바이너리 파일로 기록"""
+
+    def __init__(self):
+        self.nodes = set()
+        self.edges = {}  # (출발 키, 도착 키) → 누적 가중치
+
+    def add_node(self, kind, code):
+        self.nodes.add(node_key(kind, code))
+
+    def add_edge(self, src_kind, src_code, dst_kind, dst_code, weight=1.0):
+        """간선 추가 (같은 간선은 가중치 누적)"""
+        src, dst = node_key(src_kind, src_code), node_key(dst_kind, dst_code)
+        self.nodes.add(src)
+        self.nodes.add(dst)
+        self.edges[(src, dst)] = self.edges.get((src, dst), 0.0) + weight
+
+    def add_kcd_headings(self, headings):
+        """KCD 표제어를 노드로 등록 (간선 없이도 접두어 조회 가능하도록)"""
+        for code in headings:
+            self.add_node("kcd", code)
+
+    def add_mapping_rows(self, rows):
+        """매핑테이블: 수가코드 → SNOMED CT"""
+        for row in rows:
+            if not row.get("수가코드"):
+                continue
+            self.add_node("fee", row["수가코드"])
+            if row.get("SCTID"):
+                weight = MAPPING_WEIGHTS.get(row.get("매핑유형"), 0.5)
+                self.add_edge("fee", row["수가코드"], "snomed", row["SCTID"], weight)
+
+    def add_morphology_rows(self, rows):
+        """형태분류: M코드 → 신생물 KCD 코드"""
+        for row in rows:
+            if not row.get("형태분류코드"):
+                continue
+            self.add_node("morph", row["형태분류코드"])
+            for code in split_neoplasm_codes(row.get("신생물코드")):
+                self.add_edge("morph", row["형태분류코드"], "kcd", code)
+
+    def add_edge_file(self, path):
+        """추가 간선 CSV 로드 (청구 동시발생 등)
+
+        컬럼: src_kind, src_code, dst_kind, dst_code, weight(선택)
+        """
+        with open(path, "r", newline="", encoding="utf-8-sig") as f:
+            for row in csv.DictReader(f):
+                self.add_edge(
+                    row["src_kind"], row["src_code"].strip(),
+                    row["dst_kind"], row["dst_code"].strip(),
+                    float(row.get("weight") or 1.0),
+                )
+
+    def write(self, path=GRAPH_FILE):
+        """CSR 바이너리 파일 기록"""
+        names = sorted(self.nodes)
+        ids = {name: i for i, name in enumerate(names)}
+        n, m = len(names), len(self.edges)
+
+        # 이름 힙
+        encoded = [name.encode("utf-8") for name in names]
+        offsets = array("Q", [0])
+        for raw in encoded:
+            offsets.append(offsets[-1] + len(raw))
+        heap = b"".join(encoded)
+
+        def csr(pairs):
+            pairs.sort()
+            indptr = array("Q", [0] * (n + 1))
+            for src, _, _ in pairs:
+                indptr[src + 1] += 1
+            for i in range(n):
+                indptr[i + 1] += indptr[i]
+            return indptr, array("I", [p[1] for p in pairs]), array("f", [p[2] for p in pairs])
+
+        edge_list = [(ids[src], ids[dst], w) for (src, dst), w in self.edges.items()]
+        fwd_ptr, fwd_idx, fwd_w = csr(edge_list)
+        rev_ptr, rev_idx, rev_w = csr([(d, s, w) for s, d, w in edge_list])
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, n, m, len(heap)))
+            for block in (offsets, fwd_ptr, rev_ptr, fwd_idx, rev_idx, fwd_w, rev_w):
+                if sys.byteorder != "little":
+                    block.byteswap()
+                f.write(block.tobytes())
+            f.write(heap)
+
+        logger.info(f"💾 코드 그래프 저장: {path} (노드 {n}개, 간선 {m}개)")
+        return n, m
+
+
+class _NodeNames:
+    """mmap 위의 정렬된 노드 이름을 시퀀스로 노출 (bisect 용, 전체 디코딩 없음)"""
+
+    def __init__(self, offsets, heap):
+        self.offsets = offsets
+        self.heap = heap
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return bytes(self.heap[self.offsets[i]:self.offsets[i + 1]]).decode("utf-8")
+
+
+class CodeGraph:
+    """mmap으로 연 CSR 코드 그래프 - 로딩 시 파싱 없이 배열을 그대로 참조"""
+
+    def __init__(self, path=GRAPH_FILE):
+        if sys.byteorder != "little":
+            raise RuntimeError("리틀 엔디언 환경에서만 mmap 로딩 지원")
+
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+
+        magic, version, n, m, heap_size = HEADER.unpack_from(view, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 그래프 파일 형식: {path}")
+        self.node_count, self.edge_count = n, m
+
+        pos = HEADER.size
+        blocks = []
+        for fmt, count in (("Q", n + 1), ("Q", n + 1), ("Q", n + 1), ("I", m), ("I", m), ("f", m), ("f", m)):
+            size = struct.calcsize(fmt) * count
+            blocks.append(view[pos:pos + size].cast(fmt))
+            pos += size
+        offsets, self.fwd_ptr, self.rev_ptr, self.fwd_idx, self.rev_idx, self.fwd_w, self.rev_w = blocks
+        self._views = [view] + blocks + [view[pos:pos + heap_size]]
+        self.names = _NodeNames(offsets, self._views[-1])
+
+    def close(self):
+        for v in reversed(self._views):
+            v.release()
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.node_count
+
+    def node_id(self, key):
+        """노드 키 → 번호 (없으면 None) - O(log n)"""
+        i = bisect_left(self.names, key)
+        if i < len(self.names) and self.names[i] == key:
+            return i
+        return None
+
+    def prefix_ids(self, prefix):
+        """접두어가 같은 노드 번호 범위 ('kcd:C34' → C34, C34.0, C34.1, ...)"""
+        lo = bisect_left(self.names, prefix)
+        hi = bisect_left(self.names, prefix + "\uffff")
+        return range(lo, hi)
+
+    def _adjacent(self, i, direction):
+        if direction in ("out", "both"):
+            for k in range(self.fwd_ptr[i], self.fwd_ptr[i + 1]):
+                yield self.fwd_idx[k], self.fwd_w[k]
+        if direction in ("in", "both"):
+            for k in range(self.rev_ptr[i], self.rev_ptr[i + 1]):
+                yield self.rev_idx[k], self.rev_w[k]
+
+    def neighbors(self, key, direction="both", kind=None):
+        """인접 노드 목록 [(노드 키, 가중치)]"""
+        i = self.node_id(key)
+        if i is None:
+            return []
+        result = [(self.names[j], w) for j, w in self._adjacent(i, direction)]
+        if kind:
+            result = [(name, w) for name, w in result if name.startswith(kind + ":")]
+        return result
+
+    def two_hop(self, key, kind=None, direction="both"):
+        """2-hop 이웃 점수 {노드 키: Σ 가중치곱} (점수 내림차순)"""
+        start = self.node_id(key)
+        if start is None:
+            return {}
+        return self._two_hop_ids([start], kind, direction)
+
+    def related(self, prefix, kind=None, direction="both", hops=1):
+        """접두어 범위 전체의 이웃 집계 (예: 'kcd:C34' 하위 코드와 연결된 수가코드)"""
+        sources = list(self.prefix_ids(prefix))
+        if hops == 2:
+            return self._two_hop_ids(sources, kind, direction)
+
+        scores = {}
+        for i in sources:
+            for j, w in self._adjacent(i, direction):
+                scores[j] = scores.get(j, 0.0) + w
+        return self._ranked(scores, kind, exclude=set(sources))
+
+    def _two_hop_ids(self, sources, kind, direction):
+        exclude = set(sources)
+        scores = {}
+        for i in sources:
+            for j, w1 in self._adjacent(i, direction):
+                for k, w2 in self._adjacent(j, direction):
+                    scores[k] = scores.get(k, 0.0) + w1 * w2
+        return self._ranked(scores, kind, exclude)
+
+    def _ranked(self, scores, kind, exclude):
+        prefix = kind + ":" if kind else ""
+        ranked = sorted(((w, self.names[j]) for j, w in scores.items() if j not in exclude), reverse=True)
+        return {name: w for w, name in ranked if name.startswith(prefix)}
+
+
+def build_graph(path=GRAPH_FILE, kcd_path=KCD_MASTER_FILE, edge_files=()):
+    """KCD·형태분류·매핑테이블(+추가 간선 CSV)로 코드 그래프 생성"""
+    builder = CodeGraphBuilder()
+    builder.add_kcd_headings(kcd_headings(load_kcd_rows(kcd_path)))
+    builder.add_morphology_rows(load_morphology_rows(kcd_path))
+    builder.add_mapping_rows(load_all_mappings())
+    for edge_file in edge_files:
+        builder.add_edge_file(edge_file)
+    return builder.write(path)
+
+
+def main():
+    """코드 그래프 생성/조회 실행"""
+    parser = argparse.ArgumentParser(description="KCD·수가·약제 코드 교차 그래프")
+    parser.add_argument("--graph", default=GRAPH_FILE, help="그래프 바이너리 경로")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="그래프 생성")
+    build.add_argument("--edges", nargs="*", default=[], help="추가 간선 CSV (src_kind,src_code,dst_kind,dst_code,weight)")
+
+    query = sub.add_parser("query", help="이웃 조회 (예: kcd:C34 --prefix --kind fee)")
+    query.add_argument("key")
+    query.add_argument("--kind", choices=NODE_KINDS, help="결과 노드 종류 필터")
+    query.add_argument("--prefix", action="store_true", help="접두어 범위 전체 집계")
+    query.add_argument("--hops", type=int, choices=[1, 2], default=1)
+    query.add_argument("--limit", type=int, default=20)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.command == "build":
+        build_graph(args.graph, edge_files=args.edges)
+        return
+
+    start = time.perf_counter()
+    with CodeGraph(args.graph) as graph:
+        opened = time.perf_counter()
+        if args.prefix:
+            result = graph.related(args.key, kind=args.kind, hops=args.hops)
+        elif args.hops == 2:
+            result = graph.two_hop(args.key, kind=args.kind)
+        else:
+            result = dict(graph.neighbors(args.key, kind=args.kind))
+        done = time.perf_counter()
+
+        for name, weight in list(result.items())[:args.limit]:
+            print(f"{name}\t{weight:g}")
+    logger.info(f"그래프 로딩 {(opened - start) * 1000:.2f}ms, 조회 {(done - opened) * 1e6:.0f}µs ({len(result)}건)")
+
+
+if __name__ == "__main__":
+    main()
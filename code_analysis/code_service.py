@@ -0,0 +1,352 @@
+import os
+import json
+import time
+import asyncio
+import argparse
+import logging
+from collections import OrderedDict
+from urllib.parse import urlsplit, parse_qs
+
+from code_bundle import BUNDLE_FILE, CodeBundle, export_bundle
+from code_store import STORE_FILE, build_store
+
+try:
+    import orjson
+except ImportError:  # orjson 미설치 시 표준 json 사용
+    orjson = None
+
+# 설정
+HOST = "127.0.0.1"
+PORT = 8765
+CACHE_SIZE = 50_000         # LRU 캐시 항목 수 (코드/검색어 단위)
+MAX_BATCH = 1000            # 요청당 최대 코드 수
+MAX_BODY = 1024 * 1024      # 요청 본문 최대 크기
+SEARCH_LIMIT = 20           # 검색 결과 기본 개수
+MAX_SEARCH_LIMIT = 200
+SEARCH_TYPES = (None, "kcd", "fee")  # 검색 type 파라미터 (None은 전체)
+
+logger = logging.getLogger(__name__)
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+def dumps(obj):
+    """응답 본문 JSON bytes (orjson 우선)"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+class RequestError(Exception):
+    """클라이언트 요청 오류 (HTTP 상태 코드 포함)"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class LRUCache:
+    """OrderedDict 기반 LRU 캐시 (앞쪽이 가장 오래 사용하지 않은 항목)"""
+
+    def __init__(self, max_size=CACHE_SIZE):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, compute):
+        """캐시 값 반환 (없으면 compute()로 계산 후 저장 - None 결과도 저장)"""
+        try:
+            value = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            value = self.entries[key] = compute()
+            if len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+            return value
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return value
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {"size": len(self.entries), "max_size": self.max_size, "hits": self.hits,
+                "misses": self.misses, "hit_rate": round(self.hits / total, 4) if total else None}
+
+
+class CodeService:
+    """코드 번들 위의 읽기 전용 조회 서비스 (엔드포인트 = async 처리 함수)"""
+
+    def __init__(self, bundle, cache_size=CACHE_SIZE):
+        self.bundle = bundle
+        self.cache = LRUCache(cache_size)
+        self.requests = 0
+        self.started = time.time()
+        self.routes = {
+            "/kcd/lookup": self.kcd_lookup,
+            "/fee/lookup": self.fee_lookup,
+            "/map": self.map_codes,
+            "/search": self.search,
+            "/stats": self.stats,
+        }
+        self.search_index = self._build_search_index()
+        self.gram_index = self._build_gram_index()
+        self.snomed_index = self._build_snomed_index()
+
+    def _build_search_index(self):
+        """(소문자 검색 문자열, 종류, 코드, 이름) 목록 - 부분 문자열 검색용"""
+        entries = []
+        kcd = self.bundle["kcd_codes"]
+        for i in range(len(kcd)):
+            names = [kcd.value("한글명칭", i), kcd.value("영문명칭", i)]
+            entries.append(("kcd", kcd.keys[i], names))
+
+        fees = self.bundle["fee_codes"]
+        seen = set()
+        for i in range(len(fees)):
+            seen.add(fees.keys[i])
+            entries.append(("fee", fees.keys[i], [fees.value("행위명_한글", i) or fees.value("행위명", i),
+                                                   fees.value("행위명_영문", i)]))
+        mappings = self.bundle["fee_mappings"]
+        for i in range(len(mappings)):
+            code = mappings.keys[i]
+            if code and code not in seen:
+                seen.add(code)
+                entries.append(("fee", code, [mappings.value("한글명", i), mappings.value("영문명", i)]))
+
+        return [(" ".join(n for n in names if n).lower(), kind, code, names[0] or names[1])
+                for kind, code, names in entries]
+
+    def _build_gram_index(self):
+        """글자/연속 두 글자 → 검색 항목 번호 목록 (오름차순) - 부분 문자열 검색 후보 축소용"""
+        index = {}
+        for i, (text, _, _, _) in enumerate(self.search_index):
+            for gram in set(text) | {text[j:j + 2] for j in range(len(text) - 1)}:
+                index.setdefault(gram, []).append(i)
+        return index
+
+    def _build_snomed_index(self):
+        """SCTID → 수가코드 목록"""
+        index = {}
+        mappings = self.bundle["fee_mappings"]
+        for i in range(len(mappings)):
+            sctid = mappings.value("SCTID", i)
+            if sctid:
+                codes = index.setdefault(sctid, [])
+                if mappings.keys[i] not in codes:
+                    codes.append(mappings.keys[i])
+        return index
+
+    # ---------- 엔드포인트 ----------
+
+    async def kcd_lookup(self, params):
+        """KCD 코드 일괄 조회 (morphology=1이면 연결된 형태분류 포함)"""
+        morphology = _flag(params.get("morphology"))
+        results = {}
+        for code in _codes(params):
+            row = self.cache.get(("kcd", code), lambda: self.bundle.kcd(code))
+            if row is not None and morphology:
+                morphologies = self.cache.get(("kcd_morphology", code), lambda: self.bundle.morphologies_for_kcd(code))
+                row = dict(row, 형태분류=morphologies)
+            results[code] = row
+        return {"results": results, "missing": [code for code, row in results.items() if row is None]}
+
+    async def fee_lookup(self, params):
+        """수가코드 일괄 조회 (스크래핑 수가 정보)"""
+        results = {code: self.cache.get(("fee", code), lambda: self.bundle.fee(code)) for code in _codes(params)}
+        return {"results": results, "missing": [code for code, row in results.items() if row is None]}
+
+    async def map_codes(self, params):
+        """수가코드 → SNOMED CT 매핑 (sctids 지정 시 SCTID → 수가코드)"""
+        sctids = _codes(params, "sctids", required=False)
+        if sctids:
+            return {"results": {sctid: self.snomed_index.get(sctid, []) for sctid in sctids}}
+        return {"results": {code: self.cache.get(("map", code), lambda: self.bundle.fee_mappings(code))
+                            for code in _codes(params)}}
+
+    async def search(self, params):
+        """코드 접두어 + 한글/영문 이름 부분 문자열 검색 (q는 문자열 또는 목록)"""
+        queries = params.get("q")
+        if isinstance(queries, str):
+            queries = [queries]
+        if not queries or not all(isinstance(q, str) and q.strip() for q in queries):
+            raise RequestError(400, "검색어(q)가 필요합니다")
+        if len(queries) > MAX_BATCH:
+            raise RequestError(413, f"검색어는 요청당 {MAX_BATCH}개까지")
+        try:
+            limit = min(int(params.get("limit") or SEARCH_LIMIT), MAX_SEARCH_LIMIT)
+        except (TypeError, ValueError):
+            raise RequestError(400, "limit은 정수여야 합니다")
+        if limit < 1:
+            raise RequestError(400, "limit은 1 이상이어야 합니다")
+        kind = params.get("type")
+        if kind not in SEARCH_TYPES:
+            raise RequestError(400, "type은 kcd 또는 fee 중 하나여야 합니다")
+
+        results = {}
+        for q in queries:
+            results[q] = self.cache.get(("search", q, limit, kind), lambda: self._search(q.strip(), limit, kind))
+        return {"results": results}
+
+    def _search(self, q, limit, kind):
+        matches = []
+        if kind in (None, "kcd"):
+            kcd = self.bundle["kcd_codes"]
+            for i in kcd.prefix(q.upper())[:limit]:
+                matches.append({"type": "kcd", "code": kcd.keys[i], "name": kcd.value("한글명칭", i)})
+        found = {(m["type"], m["code"]) for m in matches}
+        needle = q.lower()
+        # 검색어의 두 글자 조각 중 가장 드문 것을 가진 항목만 확인 (전체 항목 선형 탐색 대신)
+        grams = [needle[j:j + 2] for j in range(len(needle) - 1)] or [needle]
+        candidates = min((self.gram_index.get(gram, ()) for gram in grams), key=len)
+        for i in candidates:
+            if len(matches) >= limit:
+                break
+            text, entry_kind, code, name = self.search_index[i]
+            if (kind is None or entry_kind == kind) and needle in text and (entry_kind, code) not in found:
+                matches.append({"type": entry_kind, "code": code, "name": name})
+        return matches
+
+    async def stats(self, params):
+        return {"requests": self.requests, "uptime": round(time.time() - self.started, 1),
+                "cache": self.cache.stats(), "bundle": {k: self.bundle.toc[k] for k in ("format_version", "created")}}
+
+    # ---------- HTTP ----------
+
+    async def dispatch(self, method, target, body):
+        """요청 → (상태 코드, 응답 객체) - GET은 쿼리 문자열, POST는 JSON 본문"""
+        self.requests += 1
+        url = urlsplit(target)
+        handler = self.routes.get(url.path)
+        if handler is None:
+            return 404, {"error": f"없는 경로: {url.path}"}
+        if method not in ("GET", "POST"):
+            return 405, {"error": "GET/POST만 지원"}
+
+        params = {k: v[0] if len(v) == 1 else v for k, v in parse_qs(url.query).items()}
+        if method == "POST" and body:
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                return 400, {"error": "JSON 본문을 해석할 수 없습니다"}
+            if not isinstance(payload, dict):
+                return 400, {"error": "JSON 본문은 객체여야 합니다"}
+            params.update(payload)
+        try:
+            return 200, await handler(params)
+        except RequestError as e:
+            return e.status, {"error": str(e)}
+
+    async def handle_connection(self, reader, writer):
+        """HTTP/1.1 keep-alive 연결 처리"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                    length = int(headers.get("content-length") or 0)
+                    if length < 0:
+                        raise ValueError(length)
+                except ValueError:
+                    self._write(writer, 400, {"error": "잘못된 요청"}, False)
+                    break
+                if length > MAX_BODY:
+                    self._write(writer, 413, {"error": f"본문은 {MAX_BODY}바이트까지"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                try:
+                    status, payload = await self.dispatch(method, target, body)
+                except Exception as e:
+                    logger.error(f"⚠️ 요청 처리 실패 {method} {target}: {e}")
+                    status, payload = 500, {"error": "내부 오류"}
+
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                self._write(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _write(writer, status, payload, keep_alive):
+        body = dumps(payload)
+        head = (f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+
+
+def _codes(params, key="codes", required=True):
+    """codes 파라미터 → 코드 목록 (JSON 목록 또는 쉼표 구분 문자열)"""
+    codes = params.get(key)
+    if isinstance(codes, str):
+        codes = codes.split(",")
+    if not codes:
+        if required:
+            raise RequestError(400, f"{key} 파라미터가 필요합니다")
+        return []
+    if not isinstance(codes, list) or not all(isinstance(code, str) for code in codes):
+        raise RequestError(400, f"{key}는 문자열 목록이어야 합니다")
+    if len(codes) > MAX_BATCH:
+        raise RequestError(413, f"{key}는 요청당 {MAX_BATCH}개까지")
+    return [code.strip().upper() for code in codes if code.strip()]
+
+
+def _flag(value):
+    return value in (True, 1, "1", "true", "yes")
+
+
+def open_bundle(path=BUNDLE_FILE, store_path=STORE_FILE):
+    """번들 열기 (없으면 코드 저장소 갱신 후 내보내기)"""
+    if not os.path.exists(path):
+        logger.info(f"코드 번들 없음 - 생성: {path}")
+        build_store(store_path)
+        export_bundle(store_path, path)
+    return CodeBundle(path)
+
+
+async def serve(host=HOST, port=PORT, bundle_path=BUNDLE_FILE, cache_size=CACHE_SIZE):
+    start = time.perf_counter()
+    with open_bundle(bundle_path) as bundle:
+        service = CodeService(bundle, cache_size)
+        server = await asyncio.start_server(service.handle_connection, host, port)
+        logger.info(f"✅ 코드 조회 서비스 시작: http://{host}:{port} (준비 {(time.perf_counter() - start) * 1000:.0f}ms)")
+        logger.info(f"   └─ 엔드포인트: {', '.join(service.routes)}")
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    """코드 조회 HTTP 서비스 실행"""
+    parser = argparse.ArgumentParser(description="KCD·수가코드 읽기 전용 조회 HTTP 서비스")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--bundle", default=BUNDLE_FILE, help="코드 번들 파일 (없으면 생성)")
+    parser.add_argument("--cache-size", type=int, default=CACHE_SIZE, help="LRU 캐시 항목 수")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    try:
+        asyncio.run(serve(args.host, args.port, args.bundle, args.cache_size))
+    except KeyboardInterrupt:
+        logger.info("서비스 종료")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import time
+import json
+import random
+import asyncio
+import argparse
+import logging
+
+from code_bundle import BUNDLE_FILE, CodeBundle
+from code_service import HOST, PORT
+
+# 설정
+CONNECTIONS = 32     # 동시 keep-alive 연결 수
+DURATION = 10.0      # 측정 시간 (초)
+BATCH = 1            # 요청당 코드 수
+SAMPLE_CODES = 2000  # 번들에서 뽑을 코드 수
+
+logger = logging.getLogger(__name__)
+
+
+def sample_codes(bundle_path=BUNDLE_FILE, count=SAMPLE_CODES, seed=0):
+    """번들에서 조회용 KCD/수가코드 표본 추출"""
+    rng = random.Random(seed)
+    with CodeBundle(bundle_path) as bundle:
+        samples = {}
+        for name, table in (("kcd", "kcd_codes"), ("fee", "fee_mappings")):
+            keys = bundle[table].keys
+            samples[name] = [keys[rng.randrange(len(keys))] for _ in range(count)]
+    return samples
+
+
+def build_request(endpoint, codes, host):
+    if endpoint == "/search":
+        payload = {"q": [code[:3] for code in codes], "limit": 5}
+    else:
+        payload = {"codes": codes}
+    body = json.dumps(payload).encode("utf-8")
+    head = (f"POST {endpoint} HTTP/1.1\r\nHost: {host}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n")
+    return head.encode("latin-1") + body
+
+
+async def read_response(reader):
+    """응답 상태 코드 (본문은 Content-Length만큼 읽고 버림)"""
+    status_line = await reader.readline()
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return int(status_line.split()[1])
+
+
+async def worker(host, port, requests, deadline, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    i = 0
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            writer.write(requests[i % len(requests)])
+            await writer.drain()
+            status = await read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+            i += 1
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, endpoint, connections, duration, batch, samples):
+    codes = samples["fee" if endpoint in ("/fee/lookup", "/map") else "kcd"]
+    requests = [build_request(endpoint, codes[i:i + batch], host) for i in range(0, len(codes), batch)]
+    random.Random(1).shuffle(requests)
+
+    latencies, errors = [], []
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(worker(host, port, requests[i::connections] or requests, deadline, latencies, errors)
+                           for i in range(connections)))
+    elapsed = time.perf_counter() - start
+    return latencies, errors, elapsed
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
+
+
+def main():
+    """코드 조회 서비스 부하 테스트 - RPS와 p50/p99 지연 출력"""
+    parser = argparse.ArgumentParser(description="code_service.py 부하 테스트 (서비스를 먼저 실행)")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--endpoint", default="/kcd/lookup",
+                        choices=["/kcd/lookup", "/fee/lookup", "/map", "/search"])
+    parser.add_argument("--connections", type=int, default=CONNECTIONS)
+    parser.add_argument("--duration", type=float, default=DURATION)
+    parser.add_argument("--batch", type=int, default=BATCH, help="요청당 코드 수")
+    parser.add_argument("--bundle", default=BUNDLE_FILE, help="표본 코드를 뽑을 번들")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    samples = sample_codes(args.bundle)
+    logger.info(f"🔥 부하 테스트: {args.endpoint}, 연결 {args.connections}개, {args.duration:.0f}초, 요청당 코드 {args.batch}개")
+    latencies, errors, elapsed = asyncio.run(run_load(args.host, args.port, args.endpoint, args.connections,
+                                                      args.duration, args.batch, samples))
+
+    latencies.sort()
+    count = len(latencies)
+    logger.info("=" * 60)
+    logger.info(f"요청 {count}건 / {elapsed:.1f}초 → {count / elapsed:,.0f} RPS (코드 {count * args.batch / elapsed:,.0f}개/초)")
+    logger.info(f"   └─ 지연 p50 {percentile(latencies, 0.50) * 1000:.2f}ms, "
+                f"p99 {percentile(latencies, 0.99) * 1000:.2f}ms, 최대 {latencies[-1] * 1000 if latencies else 0:.2f}ms")
+    if errors:
+        logger.info(f"⚠️ 실패 응답 {len(errors)}건 (상태 코드 {sorted(set(errors))})")
+    logger.info("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,583 @@
+import os
+import sys
+import json
+import math
+import time
+import sqlite3
+import hashlib
+import argparse
+import logging
+from datetime import datetime
+
+from kcd_master import (KCD_MASTER_FILE, KCD_LEVELS, load_kcd_columns, load_morphology_rows,
+                        split_neoplasm_codes, file_digest)
+from fee_schedule import SCRAPED_CSV, INSTITUTION_COLUMNS, parse_won, load_scraped_records
+from mapping_tables import MAPPING_FILES, load_mapping_table
+
+# 설정
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(BASE_DIR, "cache")
+STORE_FILE = os.path.join(CACHE_DIR, "code_store.sqlite")
+SCRAPED_JSON_DIR = os.path.join(BASE_DIR, "..", "koicd", "koicd_scraping_results", "json_pages")
+KOICD_SCRAPING_DIR = os.path.abspath(os.path.join(BASE_DIR, "..", "koicd", "koicd_scraping"))
+FEE_LOADER_VERSION = 3  # 수가코드 적재 규칙 버전 (원본 해시와 함께 기록 - 바뀌면 원본이 같아도 다시 적재)
+SCHEMA_VERSION = 2
+
+# 스크래핑 레코드 키 → fee_codes 컬럼 (괄호/슬래시가 든 키는 SQL에서 쓰기 쉽게 정리)
+FEE_TEXT_COLUMNS = {
+    "행위명": "행위명",
+    "분류코드": "분류코드",
+    "분류단계": "분류단계",
+    "행위명(한글)": "행위명_한글",
+    "행위명(영문)": "행위명_영문",
+    "수술여부": "수술여부",
+    "급여여부": "급여여부",
+    "본인부담률50/100": "본인부담률_50",
+    "본인부담률80/100": "본인부담률_80",
+    "본인부담률90/100": "본인부담률_90",
+    "중복인정여부": "중복인정여부",
+    "수집일시": "수집일시",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+
+-- 적재한 원본 파일 (내용 해시가 같으면 다시 적재하지 않음)
+CREATE TABLE IF NOT EXISTS sources (
+    name TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    loaded_at TEXT NOT NULL
+);
+
+-- KCD 표제어 (질병분류코드당 한 행 - 중분류/소분류가 같은 코드면 더 세분화된 행)
+CREATE TABLE IF NOT EXISTS kcd_codes (
+    질병분류코드 TEXT PRIMARY KEY,
+    분류기준 TEXT,
+    계층깊이 INTEGER,
+    상위코드 TEXT,
+    대분류코드 TEXT,
+    한글명칭 TEXT,
+    영문명칭 TEXT,
+    최하위코드 INTEGER NOT NULL DEFAULT 0,
+    국내세분화코드 INTEGER NOT NULL DEFAULT 0,
+    한의병명 INTEGER NOT NULL DEFAULT 0,
+    국내추가진단명 INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS kcd_codes_parent ON kcd_codes(상위코드);
+CREATE INDEX IF NOT EXISTS kcd_codes_chapter ON kcd_codes(대분류코드, 분류기준);
+
+-- KCD 동의어/포함/제외 주석 행
+CREATE TABLE IF NOT EXISTS kcd_terms (
+    질병분류코드 TEXT NOT NULL,
+    한글명칭 TEXT,
+    영문명칭 TEXT,
+    검별 TEXT,
+    주석 TEXT
+);
+CREATE INDEX IF NOT EXISTS kcd_terms_code ON kcd_terms(질병분류코드);
+
+-- 신생물 형태분류 (M코드)
+CREATE TABLE IF NOT EXISTS morphology (
+    형태분류코드 TEXT PRIMARY KEY,
+    한글명칭 TEXT,
+    영문명칭 TEXT,
+    신생물코드 TEXT
+);
+
+-- 형태분류 → 신생물 KCD 코드 ('C18.-'는 소분류 코드 'C18'로 저장)
+CREATE TABLE IF NOT EXISTS morphology_sites (
+    형태분류코드 TEXT NOT NULL,
+    질병분류코드 TEXT NOT NULL,
+    PRIMARY KEY (형태분류코드, 질병분류코드)
+);
+CREATE INDEX IF NOT EXISTS morphology_sites_kcd ON morphology_sites(질병분류코드);
+
+-- 스크래핑 수가코드 (행 코드 기준, 단가는 원 단위 숫자, 상위코드는 상위 수가코드 - 없으면 분류번호)
+CREATE TABLE IF NOT EXISTS fee_codes (
+    수가코드 TEXT PRIMARY KEY,
+    상위코드 TEXT,
+    계층깊이 INTEGER,
+    행위명 TEXT,
+    분류코드 TEXT,
+    분류단계 TEXT,
+    행위명_한글 TEXT,
+    행위명_영문 TEXT,
+    수술여부 TEXT,
+    급여여부 TEXT,
+    상대가치점수 REAL,
+    의원단가 REAL,
+    병원급이상단가 REAL,
+    치과병의원단가 REAL,
+    보건기관단가 REAL,
+    조산원단가 REAL,
+    한방병원단가 REAL,
+    본인부담률_50 TEXT,
+    본인부담률_80 TEXT,
+    본인부담률_90 TEXT,
+    중복인정여부 TEXT,
+    페이지 INTEGER,
+    수집일시 TEXT
+);
+CREATE INDEX IF NOT EXISTS fee_codes_parent ON fee_codes(상위코드);
+CREATE INDEX IF NOT EXISTS fee_codes_class ON fee_codes(분류코드);
+CREATE INDEX IF NOT EXISTS fee_codes_category ON fee_codes(분류단계);
+
+-- 수가코드 → SNOMED CT 매핑테이블 (1장/2장)
+CREATE TABLE IF NOT EXISTS fee_mappings (
+    장 TEXT NOT NULL,
+    번호 INTEGER,
+    수가코드 TEXT NOT NULL,
+    수가분류번호 TEXT,
+    한글명 TEXT,
+    영문명 TEXT,
+    절 TEXT,
+    세분류 TEXT,
+    관리진료과 TEXT,
+    카디널리티 TEXT,
+    매핑유형 TEXT,
+    SCTID TEXT,
+    SNOMED_FSN TEXT,
+    계층 TEXT,
+    비고 TEXT
+);
+CREATE INDEX IF NOT EXISTS fee_mappings_code ON fee_mappings(수가코드);
+CREATE INDEX IF NOT EXISTS fee_mappings_class ON fee_mappings(수가분류번호);
+CREATE INDEX IF NOT EXISTS fee_mappings_sctid ON fee_mappings(SCTID);
+"""
+
+logger = logging.getLogger(__name__)
+
+
+def _flag(value):
+    return 1 if value == "1" else 0
+
+
+def _number(value):
+    """금액/점수 문자열 → 숫자 (빈 값은 None)"""
+    number = parse_won(value)
+    return None if math.isnan(number) else number
+
+
+def kcd_tables(columns):
+    """KCD 컬럼 데이터 → (표제어 행, 주석 행) - 상위코드는 마스터파일 행 순서(대→중→소→세)로 결정"""
+    codes = []
+    terms = []
+    chain = []  # 현재 경로의 (깊이, 코드)
+    chapter = None
+    for i, code in enumerate(columns["질병분류코드"]):
+        if not code:
+            continue
+        if not columns["표제어"][i]:
+            terms.append((code, columns["한글명칭"][i], columns["영문명칭"][i], columns["검별"][i], columns["주석"][i]))
+            continue
+
+        level = columns["분류기준"][i]
+        depth = KCD_LEVELS.get(level)
+        if depth is None:
+            # 한국고유코드 표제어 등 분류기준이 없는 행은 직전 표제어의 하위로 취급
+            depth = chain[-1][0] + 1 if chain else 0
+        while chain and chain[-1][0] >= depth:
+            chain.pop()
+        # B99처럼 중분류와 소분류가 같은 코드면 한 단계 더 위를 상위로
+        parents = [c for _, c in chain if c != code]
+        parent = parents[-1] if parents else None
+        if depth == 0:
+            chapter = code
+        chain.append((depth, code))
+
+        codes.append((
+            code, level, depth, parent, chapter,
+            columns["한글명칭"][i], columns["영문명칭"][i],
+            _flag(columns["최하위코드"][i]), _flag(columns["국내세분화코드"][i]),
+            _flag(columns["한의병명"][i]), _flag(columns["국내추가진단명"][i]),
+        ))
+    return codes, terms
+
+
+def fee_row(record):
+    """병합된 스크래핑 레코드 → fee_codes 행 dict
+
+    원본 레코드는 상세 팝업 값이 이웃 행 것으로 밀려 있을 수 있으므로 merge_fee_records로
+    상세 값을 행위명이 일치하는 수가코드에 귀속하고 상위코드/행위명을 채운 뒤 넘겨야 한다.
+    """
+    code = (record.get("child_code") or record.get("수가코드") or "").strip()
+    level = record.get("hierarchy_level")
+    row = {
+        "수가코드": code,
+        "상위코드": record.get("상위코드"),
+        "계층깊이": int(level) if level not in (None, "") else None,
+        "상대가치점수": _number(record.get("상대가치점수")),
+        "페이지": int(record["페이지"]) if record.get("페이지") not in (None, "") else None,
+    }
+    for key, column in FEE_TEXT_COLUMNS.items():
+        value = record.get(key)
+        row[column] = value.strip() if isinstance(value, str) and value.strip() else None
+    for column in INSTITUTION_COLUMNS.values():
+        row[column] = _number(record.get(column))
+    return row
+
+
+def merge_fee_records(sources):
+    """[(출처명, 스크래핑 레코드)] → 수가코드별 병합 레코드 (koicd_merge.MergeEngine으로 밀린 팝업 값 재귀속)
+
+    병합 결과로 koicd_hierarchy 트리를 만들어 상위코드(상위 수가코드, 없으면 분류번호)와
+    분류단계를 떼어 낸 행위명을 함께 채운다.
+    """
+    if KOICD_SCRAPING_DIR not in sys.path:
+        sys.path.append(KOICD_SCRAPING_DIR)
+    from koicd_merge import MergeEngine
+    from koicd_hierarchy import build_hierarchy
+
+    engine = MergeEngine()
+    for name, records in sources:
+        for i, record in enumerate(records):
+            engine.add(f"{name}#{i}", {k: v for k, v in record.items() if v not in (None, "")})
+    merged = engine.merge()
+
+    tree, info = build_hierarchy(merged)
+    for record in merged:
+        code = record["child_code"]
+        if code not in tree.index:
+            continue
+        # 분류단계(cat:) 노드는 이름이라 코드로 쓰지 않음
+        parents = tree.ancestors(code, "code") or [key[len("cls:"):] for key in tree.ancestors(code, "class")]
+        record["상위코드"] = parents[0] if parents else None
+        record["행위명"] = info.get(code, {}).get("행위명")
+
+    misattributed = sum(1 for flag in engine.flags if flag["type"] != "field_conflict")
+    logger.info(f"수가코드 병합: 레코드 {engine.records_seen}개 → {len(merged)}개 (팝업 오귀속/재귀속 플래그 {misattributed}건)")
+    return merged
+
+
+def load_json_pages(json_dir=SCRAPED_JSON_DIR):
+    """json_pages 폴더의 모든 페이지 JSON 레코드 (page_N.json + page_N_hierarchical.json)"""
+    records = []
+    for name in sorted(os.listdir(json_dir)):
+        if name.startswith("page_") and name.endswith(".json"):
+            with open(os.path.join(json_dir, name), "r", encoding="utf-8") as f:
+                records.extend(json.load(f))
+    return records
+
+
+class CodeStore:
+    """KCD·형태분류·수가코드·매핑테이블 통합 SQLite 저장소"""
+
+    def __init__(self, path=STORE_FILE):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self._migrate()
+        self.conn.executescript(SCHEMA)
+        self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+        self.conn.commit()
+
+    def _migrate(self):
+        """이전 스키마 정리 - 버전 2에서 fee_codes의 상세_수가코드 컬럼 제거 (수가코드는 FEE_LOADER_VERSION으로 다시 적재)"""
+        if not self.conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'meta'").fetchone():
+            return
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        if row is not None and int(row[0]) < 2:
+            with self.conn:
+                self.conn.execute("DROP TABLE IF EXISTS fee_codes")
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---------- 적재 ----------
+
+    def source_digest(self, name):
+        row = self.conn.execute("SELECT digest FROM sources WHERE name = ?", (name,)).fetchone()
+        return row["digest"] if row else None
+
+    def _record_source(self, name, path, digest, rows):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?, ?)",
+            (name, os.path.abspath(path), digest, rows, datetime.now().isoformat(timespec="seconds"))
+        )
+
+    def _insert(self, table, columns, rows):
+        placeholders = ", ".join("?" * len(columns))
+        self.conn.executemany(f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", rows)
+
+    def load_kcd(self, columns, source=None):
+        """KCD 컬럼 데이터 일괄 적재 (기존 KCD 행 교체)"""
+        codes, terms = kcd_tables(columns)
+        with self.conn:
+            self.conn.execute("DELETE FROM kcd_codes")
+            self.conn.execute("DELETE FROM kcd_terms")
+            self._insert("kcd_codes", [
+                "질병분류코드", "분류기준", "계층깊이", "상위코드", "대분류코드", "한글명칭", "영문명칭",
+                "최하위코드", "국내세분화코드", "한의병명", "국내추가진단명",
+            ], codes)
+            self.conn.executemany("INSERT INTO kcd_terms VALUES (?, ?, ?, ?, ?)", terms)
+            if source:
+                self._record_source("kcd", *source, len(codes) + len(terms))
+        logger.info(f"KCD 적재: 표제어 {len(codes)}개, 주석/동의어 {len(terms)}개")
+
+    def load_morphology(self, rows, source=None):
+        """형태분류 행 일괄 적재 + 신생물코드 칸을 morphology_sites로 분해"""
+        rows = [row for row in rows if row.get("형태분류코드")]
+        sites = [(row["형태분류코드"], code) for row in rows for code in split_neoplasm_codes(row.get("신생물코드"))]
+        with self.conn:
+            self.conn.execute("DELETE FROM morphology")
+            self.conn.execute("DELETE FROM morphology_sites")
+            self._insert("morphology", ["형태분류코드", "한글명칭", "영문명칭", "신생물코드"],
+                         [(r["형태분류코드"], r.get("한글명칭"), r.get("영문명칭"), r.get("신생물코드")) for r in rows])
+            self._insert("morphology_sites", ["형태분류코드", "질병분류코드"], sites)
+            if source:
+                self._record_source("morphology", *source, len(rows))
+        logger.info(f"형태분류 적재: {len(rows)}개 (신생물코드 연결 {len(sites)}개)")
+
+    def load_mappings(self, chapter, rows, source=None):
+        """한 장의 매핑테이블 일괄 적재 (같은 장의 기존 행 교체)"""
+        columns = ["장", "번호", "수가코드", "수가분류번호", "한글명", "영문명", "절", "세분류", "관리진료과",
+                   "카디널리티", "매핑유형", "SCTID", "SNOMED_FSN", "계층", "비고"]
+        values = [
+            (chapter, int(r["NO"]) if (r.get("NO") or "").isdigit() else None, r["수가코드"],
+             *(r.get(column) for column in columns[3:]))
+            for r in rows if r.get("수가코드")
+        ]
+        with self.conn:
+            self.conn.execute("DELETE FROM fee_mappings WHERE 장 = ?", (chapter,))
+            self.conn.executemany(f"INSERT INTO fee_mappings VALUES ({', '.join('?' * len(columns))})", values)
+            if source:
+                self._record_source(f"mapping:{chapter}", *source, len(values))
+        logger.info(f"매핑테이블 적재 ({chapter}): {len(values)}개 행")
+
+    def load_fee_records(self, records, source=None, name="fee"):
+        """병합된 스크래핑 레코드 일괄 적재 - 수집일시 순으로 반영하되 값이 없는 칸은 기존 값 유지 (기본 정보만 있는 레코드가 상세 값을 지우지 않음)"""
+        rows = [fee_row(r) for r in records]
+        rows = sorted((r for r in rows if r["수가코드"]), key=lambda r: r["수집일시"] or "")
+        if not rows:
+            return
+        columns = list(rows[0])
+        updates = ", ".join(f"{c} = COALESCE(excluded.{c}, {c})" for c in columns if c != "수가코드")
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT INTO fee_codes ({', '.join(columns)}) VALUES ({', '.join(':' + c for c in columns)}) "
+                f"ON CONFLICT(수가코드) DO UPDATE SET {updates}",
+                rows
+            )
+            if source:
+                self._record_source(name, *source, len(rows))
+        logger.info(f"수가코드 적재: {len(rows)}개 레코드")
+
+    # ---------- 조회 ----------
+
+    def query(self, sql, params=()):
+        """임의 SQL 실행 → dict 리스트"""
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def _one(self, sql, params):
+        row = self.conn.execute(sql, params).fetchone()
+        return dict(row) if row else None
+
+    def counts(self):
+        tables = ["kcd_codes", "kcd_terms", "morphology", "morphology_sites", "fee_codes", "fee_mappings"]
+        return {table: self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in tables}
+
+    def kcd(self, code):
+        return self._one("SELECT * FROM kcd_codes WHERE 질병분류코드 = ?", (code,))
+
+    def kcd_children(self, code):
+        return self.query("SELECT * FROM kcd_codes WHERE 상위코드 = ? ORDER BY 질병분류코드", (code,))
+
+    def kcd_ancestors(self, code):
+        """상위 분류 경로 (대분류 → 바로 위)"""
+        return self.query("""
+            WITH RECURSIVE path(code, n) AS (
+                SELECT 상위코드, 1 FROM kcd_codes WHERE 질병분류코드 = ?
+                UNION ALL
+                SELECT k.상위코드, n + 1 FROM kcd_codes k JOIN path ON k.질병분류코드 = path.code
+                WHERE path.code IS NOT NULL
+            )
+            SELECT k.* FROM path JOIN kcd_codes k ON k.질병분류코드 = path.code ORDER BY n DESC
+        """, (code,))
+
+    def kcd_prefix(self, prefix, billable_only=False):
+        """코드 접두어 범위 조회 (PRIMARY KEY 인덱스 범위 검색)"""
+        sql = "SELECT * FROM kcd_codes WHERE 질병분류코드 >= ? AND 질병분류코드 < ?"
+        if billable_only:
+            sql += " AND 최하위코드 = 1"
+        return self.query(sql + " ORDER BY 질병분류코드", (prefix, prefix + "\uffff"))
+
+    def kcd_terms(self, code):
+        return self.query("SELECT * FROM kcd_terms WHERE 질병분류코드 = ?", (code,))
+
+    def morphologies_for_kcd(self, code):
+        """KCD 코드에 해당하는 형태분류 (소분류 단위 연결 'C18'도 'C18.7' 조회에 포함)"""
+        return self.query("""
+            SELECT m.*, s.질병분류코드 AS 연결코드 FROM morphology_sites s
+            JOIN morphology m ON m.형태분류코드 = s.형태분류코드
+            WHERE s.질병분류코드 IN (?, ?) ORDER BY m.형태분류코드
+        """, (code, code.split(".")[0]))
+
+    def fee(self, code):
+        return self._one("SELECT * FROM fee_codes WHERE 수가코드 = ?", (code,))
+
+    def fee_children(self, code):
+        return self.query("SELECT * FROM fee_codes WHERE 상위코드 = ? ORDER BY 수가코드", (code,))
+
+    def fees_in_category(self, category):
+        """분류단계(예: '의치과 급여>기본진료료') 접두어로 수가코드 조회"""
+        return self.query(
+            "SELECT * FROM fee_codes WHERE 분류단계 >= ? AND 분류단계 < ? ORDER BY 분류코드, 수가코드",
+            (category, category + "\uffff")
+        )
+
+    def mappings_for_fee(self, code):
+        return self.query("SELECT * FROM fee_mappings WHERE 수가코드 = ? ORDER BY 장, 번호", (code,))
+
+    def fees_for_snomed(self, sctid):
+        """SNOMED CT 개념에 매핑된 수가코드 (스크래핑 정보가 있으면 함께)"""
+        return self.query("""
+            SELECT m.수가코드, m.한글명, m.매핑유형, m.장, f.상대가치점수, f.분류단계
+            FROM fee_mappings m LEFT JOIN fee_codes f ON f.수가코드 = m.수가코드
+            WHERE m.SCTID = ? ORDER BY m.수가코드
+        """, (sctid,))
+
+    def fee_mapping_report(self, category=None):
+        """수가코드 × 매핑테이블 조인 - 매핑 누락/스크래핑 누락 확인용"""
+        sql = """
+            SELECT f.수가코드, f.행위명, f.분류코드, f.분류단계, f.상대가치점수,
+                   m.SCTID, m.SNOMED_FSN, m.매핑유형, m.장
+            FROM fee_codes f LEFT JOIN fee_mappings m ON m.수가코드 = f.수가코드
+        """
+        params = ()
+        if category:
+            sql += " WHERE f.분류단계 >= ? AND f.분류단계 < ?"
+            params = (category, category + "\uffff")
+        return self.query(sql + " ORDER BY f.수가코드, m.장, m.번호", params)
+
+
+def build_store(path=STORE_FILE, kcd_path=KCD_MASTER_FILE, fee_csv=SCRAPED_CSV, fee_json_dir=None,
+                mapping_files=MAPPING_FILES, force=False):
+    """원본별로 내용 해시가 바뀐 것만 다시 적재"""
+    with CodeStore(path) as store:
+        digest = file_digest(kcd_path)
+        if force or store.source_digest("kcd") != digest:
+            store.load_kcd(load_kcd_columns(kcd_path), (kcd_path, digest))
+            store.load_morphology(load_morphology_rows(kcd_path), (kcd_path, digest))
+        else:
+            logger.info("KCD 마스터파일 변경 없음 - 건너뜀")
+
+        for chapter, mapping_path in mapping_files.items():
+            digest = file_digest(mapping_path)
+            if force or store.source_digest(f"mapping:{chapter}") != digest:
+                store.load_mappings(chapter, load_mapping_table(mapping_path, chapter), (mapping_path, digest))
+            else:
+                logger.info(f"매핑테이블 {chapter} 변경 없음 - 건너뜀")
+
+        # 수가코드는 여러 원본을 함께 병합하므로 원본(또는 적재 규칙)이 바뀌면 전체를 다시 적재
+        fee_sources = []
+        if fee_csv and os.path.exists(fee_csv):
+            fee_sources.append(("fee:csv", fee_csv, f"{file_digest(fee_csv)}:v{FEE_LOADER_VERSION}"))
+        if fee_json_dir:
+            names = sorted(n for n in os.listdir(fee_json_dir) if n.endswith(".json"))
+            listing = "|".join(f"{n}:{os.path.getmtime(os.path.join(fee_json_dir, n))}" for n in names)
+            digest = hashlib.sha256(listing.encode("utf-8")).hexdigest()
+            fee_sources.append(("fee:json", fee_json_dir, f"{digest}:v{FEE_LOADER_VERSION}"))
+        if force or any(store.source_digest(name) != digest for name, _, digest in fee_sources):
+            loaded = [
+                (name, load_scraped_records(source_path) if name == "fee:csv" else load_json_pages(source_path))
+                for name, source_path, _ in fee_sources
+            ]
+            with store.conn:
+                store.conn.execute("DELETE FROM fee_codes")
+            store.load_fee_records(merge_fee_records(loaded))
+            with store.conn:
+                for (name, source_path, digest), (_, records) in zip(fee_sources, loaded):
+                    store._record_source(name, source_path, digest, len(records))
+        else:
+            logger.info("수가코드 원본 변경 없음 - 건너뜀")
+
+        with store.conn:
+            store.conn.execute("ANALYZE")
+        return store.counts()
+
+
+def print_rows(rows, limit=20):
+    for row in rows[:limit]:
+        print(json.dumps({k: v for k, v in row.items() if v not in (None, "")}, ensure_ascii=False))
+    if len(rows) > limit:
+        print(f"... 외 {len(rows) - limit}건")
+
+
+def main():
+    """통합 코드 저장소 생성/조회 실행"""
+    parser = argparse.ArgumentParser(description="KCD·형태분류·수가코드·매핑테이블 통합 저장소 (SQLite)")
+    parser.add_argument("--store", default=STORE_FILE, help="저장소 파일 경로")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="원본 파일에서 적재 (변경된 원본만)")
+    build.add_argument("--kcd", default=KCD_MASTER_FILE, help="KCD 마스터파일")
+    build.add_argument("--fee-csv", default=SCRAPED_CSV, help="스크래핑 수가코드 CSV")
+    build.add_argument("--fee-json-dir", help=f"페이지별 JSON 폴더도 병합 (예: {SCRAPED_JSON_DIR})")
+    build.add_argument("--force", action="store_true", help="변경 여부와 관계없이 전체 재적재")
+
+    sub.add_parser("stats", help="테이블별 행 수")
+
+    kcd = sub.add_parser("kcd", help="KCD 코드 조회 (상위 경로, 하위 코드, 동의어, 형태분류)")
+    kcd.add_argument("code")
+
+    fee = sub.add_parser("fee", help="수가코드 조회 (하위 코드, SNOMED CT 매핑)")
+    fee.add_argument("code")
+
+    sql = sub.add_parser("sql", help="임의 SQL 실행")
+    sql.add_argument("statement")
+    sql.add_argument("--limit", type=int, default=50)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.command == "build":
+        start = time.perf_counter()
+        counts = build_store(args.store, args.kcd, args.fee_csv, args.fee_json_dir, force=args.force)
+        logger.info(f"✅ 저장소 준비 완료 ({time.perf_counter() - start:.1f}초): {args.store}")
+        for table, count in counts.items():
+            logger.info(f"   └─ {table}: {count}개")
+        return
+
+    with CodeStore(args.store) as store:
+        start = time.perf_counter()
+        if args.command == "stats":
+            results = [{"table": table, "rows": count} for table, count in store.counts().items()]
+        elif args.command == "kcd":
+            results = {
+                "코드": [store.kcd(args.code)] if store.kcd(args.code) else [],
+                "상위 경로": store.kcd_ancestors(args.code),
+                "하위 코드": store.kcd_children(args.code),
+                "동의어/주석": store.kcd_terms(args.code),
+                "형태분류": store.morphologies_for_kcd(args.code),
+            }
+        elif args.command == "fee":
+            results = {
+                "수가코드": [store.fee(args.code)] if store.fee(args.code) else [],
+                "하위 코드": store.fee_children(args.code),
+                "SNOMED CT 매핑": store.mappings_for_fee(args.code),
+            }
+        else:
+            results = store.query(args.statement)
+        elapsed = (time.perf_counter() - start) * 1000
+
+        if isinstance(results, dict):
+            for title, rows in results.items():
+                print(f"## {title} ({len(rows)}건)")
+                print_rows(rows)
+        else:
+            print_rows(results, getattr(args, "limit", 50))
+        logger.info(f"조회 {elapsed:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+import os
+import json
+import argparse
+import logging
+from bisect import bisect_right
+from datetime import date, datetime
+
+from kcd_master import KCD_MASTER_FILE, load_kcd_rows, kcd_headings, snapshot_date
+from fee_schedule import SCRAPED_CSV, INSTITUTION_COLUMNS, load_scraped_records, parse_score, parse_won
+
+# 설정
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(BASE_DIR, "cache")
+STORE_FILE = os.path.join(CACHE_DIR, "code_versions.json")
+
+# 코드 체계
+SYSTEM_KCD = "kcd"
+SYSTEM_FEE = "fee"
+
+# 버전 비교에 사용하는 속성
+KCD_ATTRS = ["분류기준", "한글명칭", "영문명칭", "최하위코드"]
+
+logger = logging.getLogger(__name__)
+
+
+def to_iso_date(value):
+    """date/datetime/ISO 문자열을 'YYYY-MM-DD' 문자열로 통일 (문자열 비교 = 날짜 비교)"""
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return datetime.fromisoformat(str(value)).date().isoformat()
+
+
+class CodeVersionStore:
+    """스냅샷을 누적해 코드별 유효기간 [시작, 종료)을 관리하는 버전 저장소
+
+    intervals[system][code] = [[시작일, 종료일 또는 None, 속성], ...] (시작일 오름차순)
+    """
+
+    def __init__(self):
+        self.snapshots = {}
+        self.intervals = {}
+        # 조회용 인덱스 (ingest 시 무효화)
+        self._starts = {}
+        self._epoch_sets = {}
+
+    def ingest(self, system, effective, records):
+        """스냅샷 적재 - records: {코드: 속성 dict}, 기준일 순서대로만 적재 가능"""
+        effective = to_iso_date(effective)
+        dates = self.snapshots.setdefault(system, [])
+        if dates and effective <= dates[-1]:
+            raise ValueError(
+                f"{system} 스냅샷 기준일 {effective}이(가) 마지막 적재분 {dates[-1]} 이전임 - 저장소를 처음부터 다시 구성해야 함"
+            )
+
+        codes = self.intervals.setdefault(system, {})
+        stats = {"added": 0, "changed": 0, "removed": 0, "unchanged": 0}
+
+        for code, attrs in records.items():
+            history = codes.setdefault(code, [])
+            if history and history[-1][1] is None:
+                if history[-1][2] == attrs:
+                    stats["unchanged"] += 1
+                    continue
+                # 속성 변경: 기존 구간을 닫고 새 구간 시작
+                history[-1][1] = effective
+                stats["changed"] += 1
+            else:
+                stats["added"] += 1
+            history.append([effective, None, attrs])
+
+        # 새 스냅샷에 없는 코드는 유효기간 종료
+        for code, history in codes.items():
+            if history[-1][1] is None and code not in records:
+                history[-1][1] = effective
+                stats["removed"] += 1
+
+        dates.append(effective)
+        self._invalidate(system)
+        logger.info(f"{system} 스냅샷 {effective} 적재: {stats}")
+        return stats
+
+    def _invalidate(self, system):
+        self._starts.pop(system, None)
+        for key in [k for k in self._epoch_sets if k[0] == system]:
+            del self._epoch_sets[key]
+
+    def _start_index(self, system):
+        """코드별 구간 시작일 배열 (bisect 용)"""
+        if system not in self._starts:
+            self._starts[system] = {
+                code: [interval[0] for interval in history]
+                for code, history in self.intervals.get(system, {}).items()
+            }
+        return self._starts[system]
+
+    def lookup(self, system, code, on):
+        """기준일 시점의 코드 속성 반환 (유효하지 않으면 None) - O(log k)"""
+        on = to_iso_date(on)
+        starts = self._start_index(system).get(code)
+        if not starts:
+            return None
+
+        pos = bisect_right(starts, on) - 1
+        if pos < 0:
+            return None
+        start, end, attrs = self.intervals[system][code][pos]
+        if end is not None and on >= end:
+            return None
+        return attrs
+
+    def is_valid(self, system, code, on):
+        """기준일 시점에 코드가 유효한지 여부"""
+        return self.lookup(system, code, on) is not None
+
+    def valid_codes(self, system, on):
+        """기준일 시점의 유효 코드 집합
+
+        유효 코드 집합은 스냅샷 기준일에서만 바뀌므로 기준일을 구간(epoch) 번호로
+        이분 탐색한 뒤, 구간별로 한 번 계산한 집합을 재사용한다.
+        """
+        on = to_iso_date(on)
+        dates = self.snapshots.get(system, [])
+        epoch = bisect_right(dates, on) - 1
+        if epoch < 0:
+            return frozenset()
+
+        key = (system, epoch)
+        if key not in self._epoch_sets:
+            start_of_epoch = dates[epoch]
+            self._epoch_sets[key] = frozenset(
+                code for code, history in self.intervals[system].items()
+                if self.lookup(system, code, start_of_epoch) is not None
+            )
+        return self._epoch_sets[key]
+
+    def invalid_codes(self, system, codes, on):
+        """기준일 시점에 유효하지 않은 코드 목록 (청구 검증용)"""
+        valid = self.valid_codes(system, on)
+        return [code for code in codes if code not in valid]
+
+    def history(self, system, code):
+        """코드의 전체 버전 이력"""
+        return [
+            {"시작일": start, "종료일": end, "속성": attrs}
+            for start, end, attrs in self.intervals.get(system, {}).get(code, [])
+        ]
+
+    def save(self, path=STORE_FILE):
+        """JSON 파일로 저장"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"snapshots": self.snapshots, "intervals": self.intervals}, f, ensure_ascii=False)
+        logger.info(f"💾 버전 저장소 저장: {path}")
+
+    @classmethod
+    def load(cls, path=STORE_FILE):
+        """JSON 파일에서 로드 (파일이 없으면 빈 저장소)"""
+        store = cls()
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            store.snapshots = data["snapshots"]
+            store.intervals = data["intervals"]
+        return store
+
+
+def kcd_snapshot(path=KCD_MASTER_FILE):
+    """KCD 마스터파일 → (기준일, {질병분류코드: 속성})"""
+    headings = kcd_headings(load_kcd_rows(path))
+    records = {code: {attr: row.get(attr) for attr in KCD_ATTRS} for code, row in headings.items()}
+    return snapshot_date(path), records
+
+
+def fee_snapshot(csv_path=SCRAPED_CSV):
+    """스크래핑 결과 CSV → (수집 시작일, {수가코드: 상대가치점수/종별 단가})"""
+    rows = load_scraped_records(csv_path)
+    collected = [r["수집일시"] for r in rows if r.get("수집일시")]
+    if not collected:
+        raise ValueError(f"수집일시가 없어 기준일을 정할 수 없음: {csv_path}")
+
+    records = {}
+    for row in rows:
+        score = parse_score(row.get("상대가치점수"))
+        if score != score:  # nan - 상세정보 미수집 행
+            continue
+        attrs = {"상대가치점수": score}
+        for col in INSTITUTION_COLUMNS.values():
+            price = parse_won(row.get(col))
+            if price == price:
+                attrs[col] = price
+        records[row["수가코드"]] = attrs
+    return min(collected), records
+
+
+def main():
+    """버전 저장소 적재/조회 실행"""
+    parser = argparse.ArgumentParser(description="KCD/수가코드 버전 저장소")
+    parser.add_argument("--store", default=STORE_FILE, help="버전 저장소 JSON 경로")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    ingest_kcd = sub.add_parser("ingest-kcd", help="KCD 마스터파일 스냅샷 적재 (기준일 순)")
+    ingest_kcd.add_argument("paths", nargs="+")
+
+    ingest_fee = sub.add_parser("ingest-fee", help="스크래핑 CSV 스냅샷 적재 (수집일 순)")
+    ingest_fee.add_argument("paths", nargs="+")
+
+    lookup = sub.add_parser("lookup", help="기준일 시점 코드 조회")
+    lookup.add_argument("system", choices=[SYSTEM_KCD, SYSTEM_FEE])
+    lookup.add_argument("date")
+    lookup.add_argument("codes", nargs="+")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    store = CodeVersionStore.load(args.store)
+
+    if args.command == "ingest-kcd":
+        snapshots = sorted((kcd_snapshot(p) for p in args.paths), key=lambda s: s[0])
+        for effective, records in snapshots:
+            store.ingest(SYSTEM_KCD, effective, records)
+        store.save(args.store)
+
+    elif args.command == "ingest-fee":
+        snapshots = sorted((fee_snapshot(p) for p in args.paths), key=lambda s: s[0])
+        for effective, records in snapshots:
+            store.ingest(SYSTEM_FEE, effective, records)
+        store.save(args.store)
+
+    elif args.command == "lookup":
+        for code in args.codes:
+            attrs = store.lookup(args.system, code, args.date)
+            if attrs is None:
+                print(f"{code}\t❌ {args.date} 시점 유효하지 않음")
+            else:
+                print(f"{code}\t{json.dumps(attrs, ensure_ascii=False)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+import os
+import csv
+import json
+import math
+import time
+import argparse
+import logging
+from array import array
+
+# 설정
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRAPED_CSV = os.path.join(BASE_DIR, "..", "koicd", "koicd_scraping_results", "koicd_complete_data.csv")
+
+# 종별 단가 컬럼 (요양기관 종별 → 스크래핑 컬럼명)
+INSTITUTION_COLUMNS = {
+    "의원": "의원단가",
+    "병원급이상": "병원급이상단가",
+    "치과병의원": "치과병의원단가",
+    "보건기관": "보건기관단가",
+    "조산원": "조산원단가",
+    "한방병원": "한방병원단가",
+}
+
+# 수집 데이터(2025-08 수집분)의 단가 ÷ 상대가치점수로 역산한 환산지수
+# 조산원은 수집 범위 내 단가가 모두 0원이라 역산 불가
+DEFAULT_FACTORS = {
+    "의원": 83.4,
+    "병원급이상": 74.9,
+    "치과병의원": 84.8,
+    "보건기관": 81.5,
+    "한방병원": 84.8,
+}
+
+# 단가 검증 허용 오차 (원 단위 절사 1회분)
+PRICE_TOLERANCE = 10
+
+logger = logging.getLogger(__name__)
+
+
+def parse_won(value):
+    """'13,580원' 형태의 금액 문자열을 숫자로 변환 (빈 값은 nan)"""
+    if value is None:
+        return math.nan
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).replace(",", "").replace("원", "").strip()
+    if not text:
+        return math.nan
+    try:
+        return float(text)
+    except ValueError:
+        return math.nan
+
+
+def parse_score(value):
+    """상대가치점수 문자열을 숫자로 변환 (빈 값은 nan)"""
+    return parse_won(value)
+
+
+def round_won(amount):
+    """금액을 10원 단위로 사사오입 (심평원 단가 산정 방식)"""
+    return math.floor(amount / 10 + 0.5) * 10
+
+
+def load_scraped_records(csv_path=SCRAPED_CSV):
+    """스크래핑 결과 CSV를 레코드 리스트로 로드"""
+    with open(csv_path, "r", newline="", encoding="utf-8-sig") as f:
+        return list(csv.DictReader(f))
+
+
+def load_factor_table(path):
+    """연도별 환산지수 JSON 로드 ({"2025": {"의원": 94.1, ...}, ...})"""
+    with open(path, "r", encoding="utf-8") as f:
+        table = json.load(f)
+    return {str(year): {inst: float(v) for inst, v in factors.items()} for year, factors in table.items()}
+
+
+class FeeSchedule:
+    """수가코드별 상대가치점수와 종별 단가를 컬럼 배열로 보관하는 수가표"""
+
+    def __init__(self, codes, scores, prices):
+        self.codes = list(codes)
+        self.scores = array("d", scores)
+        # 종별 → 단가 배열 (0원 = 해당 종별 미적용, nan = 값 없음)
+        self.prices = {inst: array("d", values) for inst, values in prices.items()}
+
+        if any(len(values) != len(self.codes) for values in self.prices.values()):
+            raise ValueError("종별 단가 배열 길이가 수가코드 개수와 다름")
+        if len(self.scores) != len(self.codes):
+            raise ValueError("상대가치점수 배열 길이가 수가코드 개수와 다름")
+
+    @classmethod
+    def from_records(cls, records):
+        """스크래핑 레코드(dict) 리스트에서 수가표 생성 - 문자열 파싱은 여기서 한 번만 수행"""
+        # 상대가치점수가 없는 행(상세 팝업 미수집)은 제외
+        rows = [r for r in records if not math.isnan(parse_score(r.get("상대가치점수")))]
+
+        codes = [r.get("수가코드", "") for r in rows]
+        scores = [parse_score(r.get("상대가치점수")) for r in rows]
+        prices = {
+            inst: [parse_won(r.get(col)) for r in rows]
+            for inst, col in INSTITUTION_COLUMNS.items()
+        }
+        return cls(codes, scores, prices)
+
+    @classmethod
+    def from_csv(cls, csv_path=SCRAPED_CSV):
+        """스크래핑 결과 CSV에서 수가표 생성"""
+        return cls.from_records(load_scraped_records(csv_path))
+
+    def __len__(self):
+        return len(self.codes)
+
+    def applicable_mask(self, inst):
+        """해당 종별 단가가 존재하는 행 마스크 (0원/빈 값은 미적용)"""
+        return [not math.isnan(p) and p > 0 for p in self.prices[inst]]
+
+    def reprice(self, factors, only_applicable=True):
+        """환산지수 일괄 적용 → 종별 단가 배열 반환"""
+        scores = self.scores
+        result = {}
+        for inst, factor in factors.items():
+            if inst not in self.prices:
+                raise KeyError(f"알 수 없는 요양기관 종별: {inst}")
+
+            values = array("d", [round_won(s * factor) for s in scores])
+
+            # 원래 0원/미적용이던 종별은 그대로 0원 유지
+            if only_applicable:
+                for i, ok in enumerate(self.applicable_mask(inst)):
+                    if not ok:
+                        values[i] = 0.0
+
+            result[inst] = values
+        return result
+
+    def reprice_years(self, factor_table, only_applicable=True):
+        """연도별 환산지수 시나리오 일괄 재계산 → {연도: {종별: 단가 배열}}"""
+        return {
+            year: self.reprice(factors, only_applicable=only_applicable)
+            for year, factors in factor_table.items()
+        }
+
+    def infer_factors(self):
+        """수집 단가 ÷ 상대가치점수의 중앙값으로 종별 환산지수 역산"""
+        inferred = {}
+        for inst, prices in self.prices.items():
+            ratios = sorted(
+                p / s for p, s in zip(prices, self.scores)
+                if not math.isnan(p) and p > 0 and s > 0
+            )
+            if ratios:
+                inferred[inst] = round(ratios[len(ratios) // 2], 2)
+        return inferred
+
+    def validate(self, factors=None, tolerance=PRICE_TOLERANCE):
+        """재계산 단가와 수집 단가 비교 → 불일치 목록"""
+        factors = factors or DEFAULT_FACTORS
+        repriced = self.reprice(factors)
+
+        mismatches = []
+        for inst, computed in repriced.items():
+            scraped = self.prices[inst]
+            for i, (expected, actual) in enumerate(zip(computed, scraped)):
+                if math.isnan(actual) or actual <= 0:
+                    continue
+                if abs(expected - actual) > tolerance:
+                    mismatches.append({
+                        "수가코드": self.codes[i],
+                        "종별": inst,
+                        "상대가치점수": self.scores[i],
+                        "수집단가": actual,
+                        "계산단가": expected,
+                        "차이": expected - actual,
+                    })
+        return mismatches
+
+    def to_records(self, repriced):
+        """재계산 단가를 수가코드별 레코드로 변환 (CSV 출력용)"""
+        records = []
+        for i, code in enumerate(self.codes):
+            record = {"수가코드": code, "상대가치점수": self.scores[i]}
+            for inst, values in repriced.items():
+                record[INSTITUTION_COLUMNS[inst]] = int(values[i])
+            records.append(record)
+        return records
+
+
+def save_repriced_csv(schedule, repriced, path):
+    """재계산 단가를 CSV로 저장"""
+    records = schedule.to_records(repriced)
+    fieldnames = ["수가코드", "상대가치점수"] + [INSTITUTION_COLUMNS[inst] for inst in repriced]
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(records)
+
+
+def main():
+    """수가표 재계산/검증 실행"""
+    parser = argparse.ArgumentParser(description="상대가치점수 × 환산지수 수가 재계산")
+    parser.add_argument("--csv", default=SCRAPED_CSV, help="스크래핑 결과 CSV 경로")
+    parser.add_argument("--factors", help="연도별 환산지수 JSON 경로")
+    parser.add_argument("--output", help="재계산 단가 CSV 저장 경로 (연도별로 _연도 접미사 추가)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    schedule = FeeSchedule.from_csv(args.csv)
+    logger.info(f"수가표 로드: {len(schedule)}개 수가코드")
+
+    # 수집 단가 검증
+    inferred = schedule.infer_factors()
+    logger.info(f"역산 환산지수: {inferred}")
+    mismatches = schedule.validate()
+    if mismatches:
+        logger.warning(f"⚠️ 단가 불일치 {len(mismatches)}건")
+        for m in mismatches[:20]:
+            logger.warning(f"   {m['수가코드']} [{m['종별']}] 수집 {m['수집단가']:.0f}원 / 계산 {m['계산단가']:.0f}원")
+    else:
+        logger.info("✅ 수집 단가 검증 통과")
+
+    # 연도별 시나리오 재계산
+    if args.factors:
+        factor_table = load_factor_table(args.factors)
+        start = time.perf_counter()
+        scenarios = schedule.reprice_years(factor_table)
+        elapsed = (time.perf_counter() - start) * 1000
+        logger.info(f"{len(scenarios)}개 연도 시나리오 재계산: {elapsed:.2f}ms")
+
+        if args.output:
+            root, ext = os.path.splitext(args.output)
+            for year, repriced in scenarios.items():
+                path = f"{root}_{year}{ext or '.csv'}"
+                save_repriced_csv(schedule, repriced, path)
+                logger.info(f"💾 저장: {path}")
+
+
+if __name__ == "__main__":
+    main()
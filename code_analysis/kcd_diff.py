@@ -0,0 +1,148 @@
+import json
+import time
+import argparse
+import logging
+
+from kcd_master import load_kcd_columns, snapshot_date
+
+# 코드 단위 비교 대상 필드
+DIFF_FIELDS = ["분류기준", "검별", "한글명칭", "영문명칭", "최하위코드", "국내세분화코드", "한의병명", "국내추가진단명"]
+
+# 변경 유형 판정용 필드 그룹
+NAME_FIELDS = {"한글명칭", "영문명칭"}
+CLASS_FIELDS = {"분류기준", "최하위코드", "검별"}
+
+logger = logging.getLogger(__name__)
+
+
+def heading_table(columns):
+    """컬럼 스냅샷에서 표제어 행만 골라 (정렬된 코드 리스트, 행 번호 리스트) 반환"""
+    codes = columns["질병분류코드"]
+    headings = columns["표제어"]
+
+    # 같은 코드가 중분류/소분류로 두 번 나오면 뒤의 행을 사용
+    latest = {}
+    for i, (code, heading) in enumerate(zip(codes, headings)):
+        if heading and code:
+            latest[code] = i
+
+    ordered = sorted(latest)
+    return ordered, [latest[code] for code in ordered]
+
+
+def synonym_pairs(columns):
+    """표제어가 아닌 포함 용어 행의 (코드, 한글명칭) 집합"""
+    codes = columns["질병분류코드"]
+    return {
+        (code, name)
+        for code, name, heading in zip(codes, columns["한글명칭"], columns["표제어"])
+        if code and name and not heading
+    }
+
+
+def diff_snapshots(old, new):
+    """두 KCD 컬럼 스냅샷을 코드 기준 정렬 병합(sorted-merge)으로 비교"""
+    old_codes, old_rows = heading_table(old)
+    new_codes, new_rows = heading_table(new)
+
+    added, removed, renamed, reclassified, field_changes = [], [], [], [], []
+
+    i = j = 0
+    while i < len(old_codes) or j < len(new_codes):
+        if j >= len(new_codes) or (i < len(old_codes) and old_codes[i] < new_codes[j]):
+            removed.append(old_codes[i])
+            i += 1
+            continue
+        if i >= len(old_codes) or new_codes[j] < old_codes[i]:
+            added.append(new_codes[j])
+            j += 1
+            continue
+
+        # 양쪽에 모두 있는 코드 - 필드 비교
+        code, oi, ni = old_codes[i], old_rows[i], new_rows[j]
+        changed = []
+        for field in DIFF_FIELDS:
+            before, after = old[field][oi], new[field][ni]
+            if (before or "") != (after or ""):
+                changed.append(field)
+                field_changes.append({"코드": code, "필드": field, "이전": before, "이후": after})
+
+        if NAME_FIELDS.intersection(changed):
+            renamed.append(code)
+        if CLASS_FIELDS.intersection(changed):
+            reclassified.append(code)
+        i += 1
+        j += 1
+
+    # 삭제 코드와 같은 한글명칭으로 추가된 코드는 코드 변경(재부여)으로 추정
+    old_index = dict(zip(old_codes, old_rows))
+    new_index = dict(zip(new_codes, new_rows))
+    # 같은 명칭의 삭제 코드가 여럿이면 모두 후보로 유지 (일대다 재부여)
+    removed_names = {}
+    for code in removed:
+        removed_names.setdefault(old["한글명칭"][old_index[code]], []).append(code)
+    recoded = []
+    for code in added:
+        name = new["한글명칭"][new_index[code]]
+        for old_code in removed_names.get(name, []):
+            recoded.append({"이전코드": old_code, "신규코드": code, "한글명칭": name})
+
+    old_synonyms, new_synonyms = synonym_pairs(old), synonym_pairs(new)
+
+    return {
+        "summary": {
+            "이전_코드수": len(old_codes),
+            "신규_코드수": len(new_codes),
+            "추가": len(added),
+            "삭제": len(removed),
+            "명칭변경": len(renamed),
+            "분류변경": len(reclassified),
+            "코드재부여": len(recoded),
+            "필드변경": len(field_changes),
+        },
+        "added": added,
+        "removed": removed,
+        "renamed": renamed,
+        "reclassified": reclassified,
+        "recoded": recoded,
+        "field_changes": field_changes,
+        "synonyms_added": sorted(new_synonyms - old_synonyms),
+        "synonyms_removed": sorted(old_synonyms - new_synonyms),
+    }
+
+
+def main():
+    """KCD 마스터파일 릴리스 비교 실행"""
+    parser = argparse.ArgumentParser(description="KCD 마스터파일 릴리스 간 변경 비교")
+    parser.add_argument("old", help="이전 KCD 마스터파일 (xlsx)")
+    parser.add_argument("new", help="신규 KCD 마스터파일 (xlsx)")
+    parser.add_argument("--output", help="변경 보고서 JSON 저장 경로")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    # 엑셀 파싱은 캐시가 없을 때 한 번만 수행
+    old, new = load_kcd_columns(args.old), load_kcd_columns(args.new)
+
+    start = time.perf_counter()
+    report = diff_snapshots(old, new)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    try:
+        report["summary"]["이전_기준일"] = snapshot_date(args.old).isoformat()
+        report["summary"]["신규_기준일"] = snapshot_date(args.new).isoformat()
+    except ValueError:
+        pass
+
+    logger.info(f"비교 완료: {elapsed:.1f}ms")
+    for key, value in report["summary"].items():
+        logger.info(f"   └─ {key}: {value}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        logger.info(f"💾 변경 보고서 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import os
+import re
+import pickle
+import hashlib
+import logging
+from datetime import date
+
+from xlsx_reader import read_table
+
+# 설정
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RAW_DIR = os.path.join(BASE_DIR, "raw_data")
+CACHE_DIR = os.path.join(BASE_DIR, "cache")
+KCD_MASTER_FILE = os.path.join(RAW_DIR, "KCD-9 DB masterfile_250701_20250701010653.xlsx")
+KCD_SHEET = "KCD-8 DB Masterfile"
+KCD_HEADER_ROW = 3
+MORPHOLOGY_SHEET = "4편 신생물의 형태분류"
+MORPHOLOGY_HEADER_ROW = 3
+
+# 엑셀 헤더(줄바꿈 포함) → 컬럼명
+KCD_COLUMNS = {
+    "표제어": "표제어",
+    "분류\n기준": "분류기준",
+    "질병분류\n코드": "질병분류코드",
+    "검별": "검별",
+    "주석": "주석",
+    "한글명칭": "한글명칭",
+    "영문명칭": "영문명칭",
+    "최하위\n코드": "최하위코드",
+    "국내\n세분화\n코드": "국내세분화코드",
+    "한의\n병명": "한의병명",
+    "국내추가\n진단명": "국내추가진단명",
+}
+
+MORPHOLOGY_COLUMNS = {
+    "질병분류코드\n(형태분류)": "형태분류코드",
+    "한글명칭": "한글명칭",
+    "영문명칭": "영문명칭",
+    "신생물코드\n(C00-D48)": "신생물코드",
+}
+
+# 분류기준 → 계층 깊이
+KCD_LEVELS = {"대": 0, "중": 1, "소": 2, "세": 3, "세세": 4, "세세세": 5}
+
+SNAPSHOT_PATTERN = re.compile(r"masterfile_(\d{6})")
+
+logger = logging.getLogger(__name__)
+
+
+def snapshot_date(path):
+    """파일명의 masterfile_YYMMDD에서 기준일자 추출"""
+    match = SNAPSHOT_PATTERN.search(os.path.basename(path))
+    if not match:
+        raise ValueError(f"파일명에서 기준일자를 찾을 수 없음: {path}")
+    yymmdd = match.group(1)
+    return date(2000 + int(yymmdd[:2]), int(yymmdd[2:4]), int(yymmdd[4:]))
+
+
+def load_kcd_rows(path=KCD_MASTER_FILE):
+    """KCD 마스터파일 전체 행 로드 (표제어 + 동의어/주석 행)"""
+    rows = read_table(path, KCD_SHEET, header_row=KCD_HEADER_ROW, columns=KCD_COLUMNS)
+    for row in rows:
+        # 일부 셀에 앞뒤 공백이 섞여 있음 ('A01.0 ', ' +', '세 ')
+        for key, value in row.items():
+            if isinstance(value, str):
+                row[key] = value.strip()
+    logger.info(f"KCD 마스터파일 로드: {len(rows)}개 행")
+    return rows
+
+
+def load_morphology_rows(path=KCD_MASTER_FILE):
+    """신생물 형태분류(M코드) 시트 로드"""
+    rows = read_table(path, MORPHOLOGY_SHEET, header_row=MORPHOLOGY_HEADER_ROW, columns=MORPHOLOGY_COLUMNS)
+    for row in rows:
+        for key, value in row.items():
+            if isinstance(value, str):
+                row[key] = value.strip()
+    logger.info(f"형태분류 로드: {len(rows)}개 행")
+    return rows
+
+
+def split_neoplasm_codes(value):
+    """'C18.-, C19, D39.1-' 형태의 신생물코드 칸을 KCD 코드 리스트로 분리 ('.-', '-'는 해당 코드 하위 전체)"""
+    if not value:
+        return []
+    return [part.strip().replace(".-", "").rstrip("-") for part in value.split(",") if part.strip()]
+
+
+def is_heading(row):
+    """표제어 행(1: 표제어, 2: 한국고유코드 표제어) 여부"""
+    return bool(row.get("표제어")) and bool(row.get("질병분류코드"))
+
+
+def kcd_headings(rows):
+    """질병분류코드 → 표제어 행 매핑
+
+    B99, C50 등은 중분류와 소분류가 같은 코드를 쓰므로 뒤에 오는(더 세분화된) 행을 남긴다.
+    """
+    headings = {}
+    for row in rows:
+        if is_heading(row):
+            headings[row["질병분류코드"]] = row
+    return headings
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """파일 내용 SHA-256 해시 (캐시 키)"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_kcd_columns(path=KCD_MASTER_FILE, cache_dir=CACHE_DIR):
+    """KCD 마스터파일을 컬럼 단위({컬럼명: 값 리스트})로 로드 - 파일 해시 기준 캐시 사용"""
+    cache_path = os.path.join(cache_dir, f"kcd_columns_{file_digest(path)[:16]}.pickle")
+    if os.path.exists(cache_path):
+        with open(cache_path, "rb") as f:
+            return pickle.load(f)
+
+    rows = load_kcd_rows(path)
+    columns = {name: [row.get(name) for row in rows] for name in KCD_COLUMNS.values()}
+
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(cache_path, "wb") as f:
+        pickle.dump(columns, f, protocol=pickle.HIGHEST_PROTOCOL)
+    logger.info(f"💾 KCD 컬럼 캐시 저장: {cache_path}")
+    return columns
@@ -0,0 +1,47 @@
+import os
+import logging
+
+from xlsx_reader import read_table
+
+# 설정
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RAW_DIR = os.path.join(BASE_DIR, "raw_data")
+MAPPING_FILES = {
+    "1장": os.path.join(RAW_DIR, "1장 기본진료료 매핑테이블.xlsx"),
+    "2장": os.path.join(RAW_DIR, "2장 검사료 매핑테이블.xlsx"),
+}
+MAPPING_HEADER_ROW = 2
+
+# 엑셀 헤더 → 컬럼명 (두 장의 헤더 표기 차이 통일)
+MAPPING_COLUMNS = {
+    "수가 코드": "수가코드",
+    "SNOMED CT FSN": "SNOMED_FSN",
+    "Mapping type": "매핑유형",
+    "cardinality": "카디널리티",
+    "Hierarchy": "계층",
+}
+
+logger = logging.getLogger(__name__)
+
+
+def load_mapping_table(path, chapter=None):
+    """수가코드 → SNOMED CT 매핑테이블 로드 (매핑값 없는 행 포함)"""
+    rows = read_table(path, header_row=MAPPING_HEADER_ROW, columns=MAPPING_COLUMNS)
+    for row in rows:
+        for key, value in row.items():
+            if isinstance(value, str):
+                row[key] = value.strip()
+        # 'Broad'/'broad', 'Exact'/'exact' 표기 혼용
+        if row.get("매핑유형"):
+            row["매핑유형"] = row["매핑유형"].lower()
+        row["장"] = chapter
+    logger.info(f"매핑테이블 로드 ({chapter}): {len(rows)}개 행")
+    return rows
+
+
+def load_all_mappings(files=MAPPING_FILES):
+    """모든 장의 매핑테이블을 하나의 리스트로 로드"""
+    rows = []
+    for chapter, path in files.items():
+        rows.extend(load_mapping_table(path, chapter))
+    return rows
@@ -0,0 +1,302 @@
+import re
+import csv
+import time
+import argparse
+import logging
+from bisect import bisect_left
+
+from kcd_master import KCD_MASTER_FILE, load_morphology_rows, load_kcd_columns, split_neoplasm_codes
+from claim_validator import normalize_kcd
+
+# 설정
+DEFAULT_TOPOGRAPHY_COLUMN = "진단코드"
+DEFAULT_MORPHOLOGY_COLUMN = "형태분류코드"
+
+# 'M8140/3', '8140/3', 'm81403', 'M8140' (행동코드 생략) 허용
+MORPHOLOGY_PATTERN = re.compile(r"M?(\d{4})\s*/?\s*(\d)?")
+TOPOGRAPHY_PATTERN = re.compile(r"[A-Z]\d\d(\.\d{1,3})?")
+
+# 행동코드 (형태분류 '/' 뒤 한 자리)
+BEHAVIORS = {
+    "0": "양성",
+    "1": "양성 또는 악성 불확실",
+    "2": "제자리",
+    "3": "악성 (원발 부위)",
+    "6": "악성 (전이 부위)",
+    "9": "악성 (원발/전이 불명)",
+}
+
+# 행동코드 → 허용 KCD 3자리 분류 범위 (형태분류에 지정 부위가 없을 때 적용)
+BEHAVIOR_RANGES = {
+    "0": (("D10", "D36"),),
+    "1": (("D37", "D48"),),
+    "2": (("D00", "D09"),),
+    "3": (("C00", "C76"), ("C80", "C97")),
+    "6": (("C77", "C79"),),
+    "9": (("C00", "C97"),),
+}
+NEOPLASM_RANGE = ("C00", "D48")
+
+# 오류 사유
+MORPH_INVALID = "형태분류코드 형식 오류"
+MORPH_NO_BEHAVIOR = "행동코드(/n) 누락"
+MORPH_UNKNOWN = "형태분류 목록에 없는 코드"
+TOPO_INVALID = "신생물 KCD 코드(C00-D48) 아님"
+TOPO_UNKNOWN = "KCD에 없는 코드"
+BEHAVIOR_MISMATCH = "행동코드와 KCD 분류 불일치"
+SITE_MISMATCH = "형태분류 지정 부위가 아님"
+
+logger = logging.getLogger(__name__)
+
+
+def parse_morphology(code):
+    """형태분류코드 → (조직형 4자리, 행동코드 또는 None) - 형식이 틀리면 None"""
+    if not code:
+        return None
+    match = MORPHOLOGY_PATTERN.fullmatch(code.strip().upper())
+    if not match:
+        return None
+    return match.group(1), match.group(2)
+
+
+def format_morphology(histology, behavior=None):
+    """(조직형, 행동코드) → 'M8140/3' 표기"""
+    return f"M{histology}/{behavior}" if behavior is not None else f"M{histology}"
+
+
+def site_key(code):
+    """KCD 코드 비교 키 - 점 제거 ('C34.1' → 'C341', 'C34.10'도 'C341'로 시작)"""
+    return code.replace(".", "")
+
+
+class MorphologyIndex:
+    """신생물 형태분류(M코드) 색인 - 코드/접두어/행동코드 조회 + 부위(KCD)×형태분류 검증"""
+
+    def __init__(self, rows, kcd_names=None):
+        self.rows = {}            # 형태분류코드 → 행 (+ 조직형, 행동코드, 지정 부위)
+        self.by_behavior = {}     # 행동코드 → [형태분류코드]
+        self.by_histology = {}    # 조직형 → {행동코드: 형태분류코드}
+        self.site_index = {}      # 지정 부위 키 → [형태분류코드]
+        self.kcd_names = kcd_names  # KCD 코드 → 한글명칭 (없으면 KCD 존재 여부는 검사하지 않음)
+        self.cache = {}           # (부위 원문, 형태분류 원문) → 판정 결과
+
+        for row in rows:
+            parsed = parse_morphology(row.get("형태분류코드"))
+            if parsed is None:
+                logger.warning(f"⚠️ 형태분류코드 형식 오류 - 건너뜀: {row.get('형태분류코드')}")
+                continue
+            histology, behavior = parsed
+            code = format_morphology(histology, behavior)
+            sites = tuple(split_neoplasm_codes(row.get("신생물코드")))
+            self.rows[code] = dict(row, 형태분류코드=code, 조직형=histology, 행동코드=behavior, 지정부위=sites)
+            self.by_behavior.setdefault(behavior, []).append(code)
+            self.by_histology.setdefault(histology, {})[behavior] = code
+            for site in sites:
+                self.site_index.setdefault(site_key(site), []).append(code)
+
+        self.codes = sorted(self.rows)
+
+    @classmethod
+    def load(cls, path=KCD_MASTER_FILE, with_kcd=True):
+        """마스터파일 형태분류 시트 (+ KCD 표제어 이름) 로드"""
+        kcd_names = None
+        if with_kcd:
+            columns = load_kcd_columns(path)
+            kcd_names = {
+                code: name
+                for code, heading, name in zip(columns["질병분류코드"], columns["표제어"], columns["한글명칭"])
+                if heading and code
+            }
+        return cls(load_morphology_rows(path), kcd_names)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def get(self, code):
+        parsed = parse_morphology(code)
+        return self.rows.get(format_morphology(*parsed)) if parsed else None
+
+    def prefix(self, prefix, behavior=None):
+        """조직형 접두어 조회 ('M814', '814' → M8140/0 … M8149/3)"""
+        prefix = prefix.strip().upper()
+        if not prefix.startswith("M"):
+            prefix = "M" + prefix
+        start = bisect_left(self.codes, prefix)
+        end = bisect_left(self.codes, prefix + "\uffff")
+        return [self.rows[code] for code in self.codes[start:end]
+                if behavior is None or self.rows[code]["행동코드"] == behavior]
+
+    def with_behavior(self, behavior):
+        return [self.rows[code] for code in self.by_behavior.get(behavior, [])]
+
+    def behaviors_of(self, histology):
+        """같은 조직형의 행동코드별 형태분류코드"""
+        return dict(self.by_histology.get(histology.lstrip("Mm"), {}))
+
+    def morphologies_for_kcd(self, code):
+        """KCD 코드가 지정 부위에 포함되는 형태분류 ('C34.1' → 'C34', 'C34.1' 지정 항목)"""
+        key = site_key(normalize_kcd(code))
+        codes = []
+        for length in range(3, len(key) + 1):
+            codes.extend(self.site_index.get(key[:length], ()))
+        return [self.rows[c] for c in sorted(set(codes))]
+
+    def check(self, topography, morphology):
+        """(부위 KCD, 형태분류) → (정규화 부위, 정규화 형태분류, 오류 사유 튜플) - 원문 쌍 단위 캐시"""
+        key = (topography, morphology)
+        verdict = self.cache.get(key)
+        if verdict is None:
+            verdict = self.cache[key] = self._check(topography, morphology)
+        return verdict
+
+    def _check(self, topography, morphology):
+        topo = normalize_kcd(topography or "")
+        parsed = parse_morphology(morphology)
+        if parsed is None:
+            return topo, (morphology or "").strip(), (MORPH_INVALID,)
+        code = format_morphology(*parsed)
+        if parsed[1] is None:
+            return topo, code, (MORPH_NO_BEHAVIOR,)
+
+        reasons = []
+        row = self.rows.get(code)
+        if row is None:
+            reasons.append(MORPH_UNKNOWN)
+        if not TOPOGRAPHY_PATTERN.fullmatch(topo):
+            return topo, code, tuple(reasons) + (TOPO_INVALID,)
+        if self.kcd_names is not None and topo not in self.kcd_names:
+            reasons.append(TOPO_UNKNOWN)
+
+        # 지정 부위가 있는 형태분류는 부위 목록으로만 판정 (포상기태 O01 등 신생물 장 밖의 부위 포함)
+        sites = row["지정부위"] if row else ()
+        if sites:
+            key = site_key(topo)
+            if not any(key.startswith(site_key(site)) for site in sites):
+                reasons.append(SITE_MISMATCH)
+        else:
+            category = topo[:3]
+            if not NEOPLASM_RANGE[0] <= category <= NEOPLASM_RANGE[1]:
+                reasons.append(TOPO_INVALID)
+            elif not any(lo <= category <= hi for lo, hi in BEHAVIOR_RANGES.get(parsed[1], ())):
+                reasons.append(BEHAVIOR_MISMATCH)
+        return topo, code, tuple(reasons)
+
+    def join(self, topography, morphology):
+        """부위 + 형태분류 쌍 → 이름·행동코드·판정을 붙인 행"""
+        topo, code, reasons = self.check(topography, morphology)
+        row = self.rows.get(code) or {}
+        behavior = row.get("행동코드")
+        return {
+            "진단코드": topo,
+            "진단명": self.kcd_names.get(topo) if self.kcd_names else None,
+            "형태분류코드": code,
+            "형태분류명": row.get("한글명칭"),
+            "행동코드": behavior,
+            "행동": BEHAVIORS.get(behavior),
+            "오류": "; ".join(reasons),
+        }
+
+    def validate_file(self, path, topography_column=DEFAULT_TOPOGRAPHY_COLUMN,
+                      morphology_column=DEFAULT_MORPHOLOGY_COLUMN, writer=None):
+        """CSV의 부위/형태분류 쌍 일괄 검증 - 오류는 writer에 (라인, 진단코드, 형태분류코드, 사유)로 기록"""
+        start = time.perf_counter()
+        lines = invalid = 0
+        reason_counts = {}
+        with open(path, "r", newline="", encoding="utf-8-sig") as f:
+            reader = csv.DictReader(f)
+            missing = {topography_column, morphology_column} - set(reader.fieldnames or ())
+            if missing:
+                raise ValueError(f"CSV에 컬럼이 없습니다: {', '.join(sorted(missing))}")
+            for line_no, record in enumerate(reader, start=2):
+                lines += 1
+                topo, code, reasons = self.check(record[topography_column], record[morphology_column])
+                if reasons:
+                    invalid += 1
+                    for reason in reasons:
+                        reason_counts[reason] = reason_counts.get(reason, 0) + 1
+                        if writer is not None:
+                            writer.writerow([line_no, topo, code, reason])
+
+        elapsed = time.perf_counter() - start
+        return {
+            "라인 수": lines,
+            "오류 라인 수": invalid,
+            "사유별 건수": reason_counts,
+            "고유 쌍 수": len(self.cache),
+            "처리 시간": f"{elapsed:.2f}초 ({lines / max(elapsed, 1e-9):,.0f}라인/초)",
+        }
+
+
+def main():
+    """형태분류 조회/검증 실행"""
+    parser = argparse.ArgumentParser(description="신생물 형태분류(M코드) 색인 + 부위×형태분류 검증")
+    parser.add_argument("--kcd", default=KCD_MASTER_FILE, help="KCD 마스터파일")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    lookup = sub.add_parser("lookup", help="형태분류코드 조회 (예: lookup M8140/3)")
+    lookup.add_argument("codes", nargs="+")
+
+    prefix = sub.add_parser("prefix", help="조직형 접두어 조회 (예: prefix M814 --behavior 3)")
+    prefix.add_argument("prefix")
+    prefix.add_argument("--behavior", choices=sorted(BEHAVIORS))
+
+    site = sub.add_parser("site", help="KCD 코드에 지정된 형태분류 (예: site C34.1)")
+    site.add_argument("code")
+
+    check = sub.add_parser("check", help="부위×형태분류 쌍 검증 (예: check C34.1 M8140/3)")
+    check.add_argument("topography")
+    check.add_argument("morphology")
+
+    validate = sub.add_parser("validate", help="CSV 일괄 검증")
+    validate.add_argument("csv")
+    validate.add_argument("--topography-col", default=DEFAULT_TOPOGRAPHY_COLUMN)
+    validate.add_argument("--morphology-col", default=DEFAULT_MORPHOLOGY_COLUMN)
+    validate.add_argument("--errors", help="오류 라인 CSV 저장 경로")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    index = MorphologyIndex.load(args.kcd, with_kcd=args.command in ("check", "validate"))
+
+    if args.command == "lookup":
+        for code in args.codes:
+            row = index.get(code)
+            if row is None:
+                logger.info(f"{code}: 없음")
+            else:
+                logger.info(f"{row['형태분류코드']}: {row['한글명칭']} / {row['영문명칭']} "
+                            f"[{BEHAVIORS.get(row['행동코드'])}] 부위 {', '.join(row['지정부위']) or '-'}")
+
+    elif args.command == "prefix":
+        rows = index.prefix(args.prefix, args.behavior)
+        for row in rows:
+            logger.info(f"{row['형태분류코드']}: {row['한글명칭']}")
+        logger.info(f"{len(rows)}개")
+
+    elif args.command == "site":
+        for row in index.morphologies_for_kcd(args.code):
+            logger.info(f"{row['형태분류코드']}: {row['한글명칭']} (부위 {', '.join(row['지정부위'])})")
+
+    elif args.command == "check":
+        joined = index.join(args.topography, args.morphology)
+        for key, value in joined.items():
+            logger.info(f"{key}: {value}")
+
+    else:
+        error_file = open(args.errors, "w", newline="", encoding="utf-8-sig") if args.errors else None
+        try:
+            writer = None
+            if error_file:
+                writer = csv.writer(error_file)
+                writer.writerow(["라인", "진단코드", "형태분류코드", "사유"])
+            summary = index.validate_file(args.csv, args.topography_col, args.morphology_col, writer)
+        finally:
+            if error_file:
+                error_file.close()
+        logger.info(f"📄 {args.csv}")
+        for key, value in summary.items():
+            logger.info(f"   └─ {key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
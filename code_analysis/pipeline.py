@@ -0,0 +1,392 @@
+import os
+import csv
+import json
+import time
+import pickle
+import inspect
+import hashlib
+import argparse
+import logging
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from kcd_master import KCD_MASTER_FILE, KCD_LEVELS, load_kcd_columns, file_digest
+from fee_schedule import SCRAPED_CSV, load_scraped_records
+from mapping_tables import MAPPING_FILES, load_all_mappings
+from code_store import KOICD_SCRAPING_DIR, fee_row, merge_fee_records
+
+# 설정
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BASE_DIR)  # 이 아래의 모듈만 코드 버전에 포함 (표준 라이브러리/설치 패키지 제외)
+PIPELINE_DIR = os.path.join(BASE_DIR, "cache", "pipeline")
+STATE_FILE = os.path.join(PIPELINE_DIR, "state.json")
+REPORT_DIR = os.path.join(PIPELINE_DIR, "reports")
+PIPELINE_VERSION = 1  # 실행기/캐시 형식이 바뀌면 올림 (전체 단계 무효화)
+
+# 단계 상태
+STATUS_RAN = "실행"
+STATUS_CACHED = "캐시"
+STATUS_FAILED = "실패"
+STATUS_BLOCKED = "상위 단계 실패"
+
+logger = logging.getLogger(__name__)
+
+# 단계명 → Stage (선언 순서 = 실행 가능한 순서)
+STAGES = {}
+
+
+class Stage:
+    """파이프라인 단계 - 입력 단계 출력 + 원본 파일 → 출력 (캐시 키: 입력 해시 + 코드 버전)"""
+
+    def __init__(self, name, func, inputs=(), sources=(), version=0):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.sources = tuple(sources)
+        self.version = version  # 코드 해시로 잡히지 않는 변경(외부 데이터 규칙 등)을 반영해야 할 때 수동으로 올림
+
+    def code_version(self):
+        """단계 함수 소스 + 함수가 참조하는 저장소 모듈 파일 해시 - 규칙을 고치면 이 단계와 하위 단계만 다시 실행"""
+        modules = {os.path.relpath(path, REPO_DIR): file_digest(path) for path in module_files(self.func)}
+        text = f"{PIPELINE_VERSION}:{self.version}:{inspect.getsource(self.func)}:{json.dumps(modules, sort_keys=True)}"
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def cache_key(self, input_digests):
+        sources = {path: file_digest(path) if os.path.exists(path) else None for path in self.sources}
+        payload = {"code": self.code_version(), "sources": sources, "inputs": input_digests}
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def module_files(func):
+    """함수가 참조하는 저장소 내 모듈 파일 목록 - 그 모듈이 전역으로 가져온 모듈까지 따라감 (이 파일 제외)
+
+    함수 안에서 지연 import하는 모듈은 잡히지 않으므로 단계의 sources에 직접 적는다.
+    """
+    names, codes = [], [func.__code__]
+    while codes:
+        code = codes.pop()
+        names.extend(code.co_names)
+        codes.extend(const for const in code.co_consts if inspect.iscode(const))
+
+    files = set()
+    pending = [func.__globals__.get(name) for name in names]
+    while pending:
+        module = inspect.getmodule(pending.pop())
+        path = os.path.abspath(getattr(module, "__file__", None) or "")
+        if (not path.startswith(REPO_DIR + os.sep) or path in files
+                or path == os.path.abspath(__file__) or not path.endswith(".py")):
+            continue
+        files.add(path)
+        pending.extend(vars(module).values())
+    return sorted(files)
+
+
+def stage(inputs=(), sources=(), version=0):
+    """단계 등록 데코레이터 - 함수는 입력 단계 출력을 단계명 키워드 인자로 받음"""
+    def register(func):
+        STAGES[func.__name__] = Stage(func.__name__, func, inputs, sources, version)
+        return func
+    return register
+
+
+# ---------- 단계 ----------
+
+@stage(sources=(KCD_MASTER_FILE,))
+def kcd():
+    """KCD 표제어 → {질병분류코드: 분류기준·이름·최하위 여부}"""
+    columns = load_kcd_columns(KCD_MASTER_FILE)
+    headings = {}
+    for i, code in enumerate(columns["질병분류코드"]):
+        if columns["표제어"][i] and code:
+            headings[code] = {
+                "분류기준": columns["분류기준"][i],
+                "계층깊이": KCD_LEVELS.get(columns["분류기준"][i]),
+                "한글명칭": columns["한글명칭"][i],
+                "영문명칭": columns["영문명칭"][i],
+                "최하위코드": columns["최하위코드"][i] == "1",
+            }
+    return headings
+
+
+@stage(sources=tuple(MAPPING_FILES.values()))
+def mappings():
+    """매핑테이블 1장/2장 → 수가코드 정규화된 행 목록"""
+    rows = []
+    for row in load_all_mappings(MAPPING_FILES):
+        code = (row.get("수가코드") or "").strip().upper()
+        if not code:
+            continue
+        rows.append(dict(row, 수가코드=code, SCTID=str(row["SCTID"]).strip() if row.get("SCTID") else None))
+    return rows
+
+
+# koicd_merge/koicd_hierarchy는 merge_fee_records 안에서 지연 import하므로 sources에 직접 포함
+@stage(sources=(SCRAPED_CSV, os.path.join(KOICD_SCRAPING_DIR, "koicd_merge.py"),
+                os.path.join(KOICD_SCRAPING_DIR, "koicd_hierarchy.py")))
+def scraped_codes():
+    """스크래핑 CSV → {수가코드: fee_codes 형식 행} (밀린 팝업 상세 값은 koicd_merge로 행위명이 일치하는 코드에 귀속)"""
+    if not os.path.exists(SCRAPED_CSV):
+        return {}
+    codes = {}
+    for record in merge_fee_records([("fee:csv", load_scraped_records(SCRAPED_CSV))]):
+        row = fee_row(record)
+        code = row["수가코드"].upper()
+        if code:
+            codes[code] = dict(row, 수가코드=code)
+    return codes
+
+
+@stage(inputs=("scraped_codes", "mappings"))
+def fee_mapping_join(scraped_codes, mappings):
+    """스크래핑 수가코드 × 매핑테이블 (매핑이 없는 코드도 한 행)"""
+    by_code = {}
+    for row in mappings:
+        by_code.setdefault(row["수가코드"], []).append(row)
+
+    joined = []
+    for code, fee in sorted(scraped_codes.items()):
+        for mapping in by_code.get(code) or [{}]:
+            joined.append({
+                "수가코드": code,
+                "행위명": fee.get("행위명_한글") or fee.get("행위명"),
+                "분류단계": fee.get("분류단계"),
+                "상대가치점수": fee.get("상대가치점수"),
+                "장": mapping.get("장"),
+                "SCTID": mapping.get("SCTID"),
+                "SNOMED_FSN": mapping.get("SNOMED_FSN"),
+                "매핑유형": mapping.get("매핑유형"),
+            })
+    return joined
+
+
+@stage(inputs=("kcd", "mappings", "fee_mapping_join"))
+def reports(kcd, mappings, fee_mapping_join):
+    """보고서 표 → {보고서명: 행 목록}"""
+    chapters = {}
+    for code, row in kcd.items():
+        counts = chapters.setdefault(code[0], {"코드첫글자": code[0], "표제어": 0, "최하위코드": 0})
+        counts["표제어"] += 1
+        counts["최하위코드"] += row["최하위코드"]
+
+    coverage = {}
+    for row in mappings:
+        key = (row.get("장"), row.get("매핑유형") or "(매핑 없음)")
+        coverage[key] = coverage.get(key, 0) + 1
+
+    return {
+        "kcd_by_letter": [chapters[letter] for letter in sorted(chapters)],
+        "mapping_coverage": [{"장": chapter, "매핑유형": kind, "행 수": count}
+                             for (chapter, kind), count in sorted(coverage.items())],
+        "scraped_unmapped": [row for row in fee_mapping_join if not row["SCTID"]],
+        "scraped_mapped": [row for row in fee_mapping_join if row["SCTID"]],
+    }
+
+
+# ---------- 실행 ----------
+
+def _run_stage(name, input_paths, output_path):
+    """단계 하나 실행 (워커 프로세스) - 출력은 파일로 쓰고 (해시, 시간)만 반환"""
+    start = time.perf_counter()
+    inputs = {}
+    for input_name, path in input_paths.items():
+        with open(path, "rb") as f:
+            inputs[input_name] = pickle.load(f)
+    output = STAGES[name].func(**inputs)
+
+    data = pickle.dumps(output, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, output_path)
+    return hashlib.sha256(data).hexdigest(), time.perf_counter() - start
+
+
+class Pipeline:
+    """단계 DAG 실행기 - 캐시 키가 같은 단계는 건너뛰고, 입력이 준비된 단계는 병렬 실행"""
+
+    def __init__(self, stages=STAGES, cache_dir=PIPELINE_DIR):
+        self.stages = stages
+        self.cache_dir = cache_dir
+        self.state_path = os.path.join(cache_dir, "state.json")
+        self.state = {}
+        if os.path.exists(self.state_path):
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                self.state = json.load(f)
+
+    def output_path(self, name):
+        return os.path.join(self.cache_dir, f"{name}.pickle")
+
+    def save_state(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def load(self, name):
+        """단계 출력 (캐시 파일)"""
+        with open(self.output_path(name), "rb") as f:
+            return pickle.load(f)
+
+    def required(self, targets=None):
+        """대상 단계 + 모든 상위 단계 (선언 순서)"""
+        if not targets:
+            return list(self.stages)
+        for name in targets:
+            if name not in self.stages:
+                raise KeyError(f"없는 단계: {name}")
+        needed = set()
+        stack = list(targets)
+        while stack:
+            name = stack.pop()
+            if name not in needed:
+                needed.add(name)
+                stack.extend(self.stages[name].inputs)
+        return [name for name in self.stages if name in needed]
+
+    def _cached(self, name, key):
+        entry = self.state.get(name)
+        return entry is not None and entry["key"] == key and os.path.exists(self.output_path(name))
+
+    def run(self, targets=None, force=(), workers=None):
+        """단계 실행 → {단계명: {상태, 시간}}"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        pending = self.required(targets)
+        digests = {}   # 단계명 → 출력 해시 (완료된 단계)
+        results = {}
+        running = {}   # future → (단계명, 캐시 키)
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            while pending or running:
+                # 입력이 모두 준비된 단계: 캐시가 유효하면 바로 완료, 아니면 제출 (캐시 완료가 다른 단계를 풀 수 있어 반복)
+                progressed = True
+                while progressed:
+                    progressed = False
+                    for name in list(pending):
+                        stage = self.stages[name]
+                        if any(i in results and results[i]["status"] in (STATUS_FAILED, STATUS_BLOCKED)
+                               for i in stage.inputs):
+                            results[name] = {"status": STATUS_BLOCKED, "elapsed": 0.0}
+                            pending.remove(name)
+                            progressed = True
+                            continue
+                        if not all(i in digests for i in stage.inputs):
+                            continue
+                        pending.remove(name)
+                        progressed = True
+                        key = stage.cache_key({i: digests[i] for i in stage.inputs})
+                        if name not in force and self._cached(name, key):
+                            digests[name] = self.state[name]["digest"]
+                            results[name] = {"status": STATUS_CACHED, "elapsed": 0.0}
+                            logger.info(f"⏭️  {name}: 캐시 사용")
+                            continue
+                        input_paths = {i: self.output_path(i) for i in stage.inputs}
+                        future = pool.submit(_run_stage, name, input_paths, self.output_path(name))
+                        running[future] = (name, key)
+                        logger.info(f"▶️  {name}: 실행")
+
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name, key = running.pop(future)
+                    try:
+                        digest, elapsed = future.result()
+                    except Exception as e:
+                        logger.error(f"⚠️ {name}: 실패 - {e}")
+                        results[name] = {"status": STATUS_FAILED, "elapsed": 0.0, "error": str(e)}
+                        continue
+                    unchanged = self.state.get(name, {}).get("digest") == digest
+                    self.state[name] = {"key": key, "digest": digest, "elapsed": round(elapsed, 3),
+                                        "built_at": datetime.now().isoformat(timespec="seconds")}
+                    self.save_state()
+                    digests[name] = digest
+                    results[name] = {"status": STATUS_RAN, "elapsed": elapsed}
+                    logger.info(f"✅ {name}: {elapsed:.2f}초" + (" (출력 동일 - 하위 단계 캐시 유지)" if unchanged else ""))
+
+        return {name: results[name] for name in self.stages if name in results}
+
+    def status(self):
+        """단계별 캐시 유효 여부 (상위 단계가 무효면 하위는 판단 보류)"""
+        statuses = {}
+        digests = {}
+        for name, stage in self.stages.items():
+            if not all(i in digests for i in stage.inputs):
+                statuses[name] = "상위 단계 재실행 필요"
+                continue
+            key = stage.cache_key({i: digests[i] for i in stage.inputs})
+            if self._cached(name, key):
+                digests[name] = self.state[name]["digest"]
+                statuses[name] = f"최신 ({self.state[name]['built_at']})"
+            else:
+                statuses[name] = "재실행 필요"
+        return statuses
+
+
+def write_reports(tables, report_dir=REPORT_DIR):
+    """보고서 표를 CSV로 저장 → 저장 경로 목록"""
+    os.makedirs(report_dir, exist_ok=True)
+    paths = []
+    for name, rows in tables.items():
+        path = os.path.join(report_dir, f"{name}.csv")
+        fieldnames = list(rows[0]) if rows else []
+        with open(path, "w", newline="", encoding="utf-8-sig") as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(rows)
+        paths.append(path)
+    return paths
+
+
+def main():
+    """분석 파이프라인 실행 (KCD → 매핑테이블 → 스크래핑 수가코드 정규화 → 조인 → 보고서)"""
+    parser = argparse.ArgumentParser(description="원본 적재 → 정규화 → 조인 → 보고서 증분 파이프라인")
+    parser.add_argument("--cache-dir", default=PIPELINE_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="변경된 단계만 실행")
+    run.add_argument("stages", nargs="*", help="실행할 단계 (기본: 전체, 상위 단계 포함)")
+    run.add_argument("--force", nargs="+", default=[], metavar="STAGE", help="캐시와 상관없이 다시 실행할 단계")
+    run.add_argument("--workers", type=int, help="프로세스 수 (기본: CPU 수)")
+    run.add_argument("--report-dir", default=REPORT_DIR)
+
+    sub.add_parser("status", help="단계별 캐시 상태")
+
+    show = sub.add_parser("show", help="단계 출력 요약")
+    show.add_argument("stage", choices=list(STAGES))
+    show.add_argument("--limit", type=int, default=5)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    pipeline = Pipeline(cache_dir=args.cache_dir)
+
+    if args.command == "run":
+        start = time.perf_counter()
+        results = pipeline.run(args.stages, set(args.force), args.workers)
+        wall = time.perf_counter() - start
+        logger.info("=" * 60)
+        for name, result in results.items():
+            logger.info(f"{name:<18} {result['status']:<8} {result['elapsed']:>6.2f}초")
+        logger.info(f"전체 {wall:.2f}초 (실행 {sum(r['status'] == STATUS_RAN for r in results.values())}개, "
+                    f"캐시 {sum(r['status'] == STATUS_CACHED for r in results.values())}개)")
+        if results.get("reports", {}).get("status") in (STATUS_RAN, STATUS_CACHED):
+            paths = write_reports(pipeline.load("reports"), args.report_dir)
+            logger.info(f"💾 보고서 {len(paths)}개: {args.report_dir}")
+        logger.info("=" * 60)
+
+    elif args.command == "status":
+        for name, status in pipeline.status().items():
+            logger.info(f"{name:<18} {status}")
+
+    else:
+        output = pipeline.load(args.stage)
+        items = list(output.items()) if isinstance(output, dict) else list(enumerate(output))
+        logger.info(f"{args.stage}: {type(output).__name__} {len(output)}개")
+        for key, value in items[:args.limit]:
+            text = json.dumps(value, ensure_ascii=False, default=str)
+            logger.info(f"   {key}: {text[:200]}")
+
+
+if __name__ == "__main__":
+    main()
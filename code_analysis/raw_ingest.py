@@ -0,0 +1,268 @@
+import os
+import re
+import json
+import time
+import pickle
+import argparse
+import logging
+import importlib.util
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from xlsx_reader import read_table, sheet_names
+from kcd_master import (KCD_MASTER_FILE, KCD_SHEET, MORPHOLOGY_SHEET, load_kcd_rows, load_morphology_rows,
+                        file_digest)
+from mapping_tables import MAPPING_FILES, load_mapping_table
+
+# 설정
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RAW_DIR = os.path.join(BASE_DIR, "raw_data")
+INGEST_DIR = os.path.join(BASE_DIR, "cache", "ingest")
+MANIFEST_FILE = os.path.join(INGEST_DIR, "manifest.json")
+INGEST_VERSION = 2  # 로더/타입 변환 규칙이 바뀌면 올림 (기존 캐시 무효화)
+
+SOURCE_EXTENSIONS = (".xlsx", ".pdf")
+STRING_COLUMNS = {"질병분류코드", "형태분류코드", "수가코드", "SCTID"}  # 숫자로만 된 값도 식별자로 유지
+NAME_WIDTH = 40  # 시간 표의 원본명 최대 폭
+
+# 상태
+STATUS_LOADED = "적재"
+STATUS_UNCHANGED = "변경 없음"
+STATUS_FAILED = "실패"
+STATUS_SKIPPED = "건너뜀"  # 선택 의존성 미설치 (설치 후 다시 실행하면 적재)
+
+logger = logging.getLogger(__name__)
+
+
+def output_name(file_name, sheet=None):
+    """원본(+시트) → 캐시 파일명 (경로 구분자 등 제거)"""
+    stem = os.path.splitext(file_name)[0]
+    name = f"{stem}__{sheet}" if sheet else stem
+    return re.sub(r'[\\/:*?"<>|\s]+', "_", name) + ".pickle"
+
+
+def discover_tasks(raw_dir=RAW_DIR):
+    """raw_data의 원본을 (원본 경로, 시트) 작업 단위로 분할 - 워크북은 시트마다 하나"""
+    tasks = []
+    for name in sorted(os.listdir(raw_dir)):
+        path = os.path.join(raw_dir, name)
+        if not name.lower().endswith(SOURCE_EXTENSIONS) or name.startswith("~$"):
+            continue
+        if name.lower().endswith(".xlsx"):
+            tasks.extend((path, sheet) for sheet in sheet_names(path))
+        else:
+            tasks.append((path, None))
+    return tasks
+
+
+def _load_sheet(path, sheet):
+    """시트 → dict 레코드 (알려진 시트는 전용 로더로 컬럼명 정리)"""
+    chapters = {os.path.abspath(p): chapter for chapter, p in MAPPING_FILES.items()}
+    if os.path.basename(path) == os.path.basename(KCD_MASTER_FILE):
+        if sheet == KCD_SHEET:
+            return load_kcd_rows(path)
+        if sheet == MORPHOLOGY_SHEET:
+            return load_morphology_rows(path)
+    chapter = chapters.get(os.path.abspath(path))
+    if chapter:
+        return load_mapping_table(path, chapter)
+    return read_table(path, sheet)
+
+
+def pdf_supported():
+    """PDF 적재 가능 여부 (pypdf는 선택 의존성)"""
+    return importlib.util.find_spec("pypdf") is not None
+
+
+def _load_pdf(path):
+    """PDF → 페이지/줄 단위 텍스트 레코드"""
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        raise RuntimeError("PDF 적재에는 pypdf가 필요합니다 (pip install pypdf)")
+
+    records = []
+    for page_no, page in enumerate(PdfReader(path).pages, start=1):
+        for line_no, line in enumerate((page.extract_text() or "").splitlines(), start=1):
+            if line.strip():
+                records.append({"페이지": page_no, "줄": line_no, "텍스트": line.strip()})
+    return records
+
+
+def infer_type(values):
+    """컬럼 타입 추론 - 모든 값이 정수/실수 표기이면 숫자 (앞자리 0이 있는 코드 값은 문자열 유지)"""
+    kind = None
+    for value in values:
+        if value is None or value == "":
+            continue
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            current = "int" if isinstance(value, int) else "float"
+        elif isinstance(value, str):
+            try:
+                number = int(value)
+                current = "int" if str(number) == value else "str"
+            except ValueError:
+                try:
+                    float(value)
+                    current = "float" if value.lower() not in ("nan", "inf", "-inf", "infinity") else "str"
+                except ValueError:
+                    current = "str"
+        else:
+            current = "str"
+
+        if current == "str":
+            return "str"
+        if kind is None or (kind == "int" and current == "float"):
+            kind = current
+    return kind or "str"
+
+
+def to_columns(records):
+    """dict 레코드 → ({컬럼명: 타입 변환된 값 리스트}, {컬럼명: 타입}) - 빈 값은 모두 None"""
+    names = {}
+    for record in records:
+        for key in record:
+            names.setdefault(key, None)
+
+    columns, types = {}, {}
+    for name in names:
+        values = [record.get(name) for record in records]
+        kind = "str" if name in STRING_COLUMNS else infer_type(values)
+        if kind == "str":
+            values = [None if v is None or (isinstance(v, str) and not v.strip()) else v for v in values]
+        else:
+            cast = int if kind == "int" else float
+            values = [None if v is None or v == "" else cast(v) for v in values]
+        columns[name] = values
+        types[name] = kind
+    return columns, types
+
+
+def ingest_source(path, sheet, output_path):
+    """작업 하나 적재 (워커 프로세스에서 실행) - 결과는 파일로 쓰고 메타데이터만 반환"""
+    start = time.perf_counter()
+    records = _load_pdf(path) if sheet is None else _load_sheet(path, sheet)
+    columns, types = to_columns(records)
+
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump({"columns": columns, "types": types}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, output_path)
+    return {"rows": len(records), "types": types, "elapsed": time.perf_counter() - start}
+
+
+def load_manifest(path=MANIFEST_FILE):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, path=MANIFEST_FILE):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def load_ingested(file_name, sheet=None, ingest_dir=INGEST_DIR):
+    """적재 결과 로드 → {컬럼명: 값 리스트}"""
+    with open(os.path.join(ingest_dir, output_name(file_name, sheet)), "rb") as f:
+        return pickle.load(f)["columns"]
+
+
+def ingest_all(raw_dir=RAW_DIR, ingest_dir=INGEST_DIR, workers=None, force=False):
+    """전체 원본 병렬 적재 - 내용 해시가 같은 원본은 건너뜀. 작업별 결과 리스트 반환"""
+    os.makedirs(ingest_dir, exist_ok=True)
+    manifest_path = os.path.join(ingest_dir, "manifest.json")
+    manifest = load_manifest(manifest_path)
+
+    digests = {}
+    results = []
+    pending = []
+    for path, sheet in discover_tasks(raw_dir):
+        name = os.path.basename(path)
+        if path not in digests:
+            digests[path] = file_digest(path)
+        key = output_name(name, sheet)
+        output_path = os.path.join(ingest_dir, key)
+        entry = manifest.get(key)
+        unchanged = (entry is not None and entry["digest"] == digests[path]
+                     and entry["version"] == INGEST_VERSION and os.path.exists(output_path))
+        result = {"key": key, "source": name, "sheet": sheet, "digest": digests[path], "size": os.path.getsize(path)}
+        if unchanged and not force:
+            results.append(dict(result, status=STATUS_UNCHANGED, rows=entry["rows"], elapsed=0.0))
+        elif sheet is None and not pdf_supported():
+            # 실패가 아니라 건너뜀 - 캐시하지 않으므로 pypdf 설치 후 실행하면 적재됨
+            logger.warning(f"⚠️ pypdf 미설치로 PDF 건너뜀: {name} (pip install pypdf)")
+            results.append(dict(result, status=STATUS_SKIPPED, rows=0, elapsed=0.0, error="pypdf 미설치"))
+        else:
+            pending.append((result, path, sheet, output_path))
+
+    start = time.perf_counter()
+    if pending:
+        # 큰 원본부터 제출 (가장 오래 걸리는 작업이 먼저 시작되어야 전체 시간이 최소)
+        pending.sort(key=lambda task: task[0]["size"], reverse=True)
+        workers = workers or min(len(pending), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(ingest_source, path, sheet, output_path): result
+                       for result, path, sheet, output_path in pending}
+            for future in as_completed(futures):
+                result = futures[future]
+                try:
+                    meta = future.result()
+                except Exception as e:
+                    logger.error(f"⚠️ 적재 실패 {result['source']} [{result['sheet'] or '-'}]: {e}")
+                    results.append(dict(result, status=STATUS_FAILED, rows=0, elapsed=0.0, error=str(e)))
+                    continue
+                manifest[result["key"]] = {
+                    "source": result["source"], "sheet": result["sheet"], "digest": result["digest"],
+                    "version": INGEST_VERSION, "rows": meta["rows"], "types": meta["types"],
+                }
+                results.append(dict(result, status=STATUS_LOADED, rows=meta["rows"], elapsed=meta["elapsed"]))
+        save_manifest(manifest, manifest_path)
+    wall = time.perf_counter() - start
+
+    results.sort(key=lambda r: (r["source"], r["sheet"] or ""))
+    return results, wall
+
+
+def print_timing_table(results, wall):
+    """원본/시트별 상태·행 수·시간 표 출력"""
+    def shorten(name):
+        return name if len(name) <= NAME_WIDTH else name[:NAME_WIDTH - 1] + "…"
+
+    width = min(NAME_WIDTH, max([len(r["source"]) for r in results] + [4]))
+    sheet_width = max([len(r["sheet"] or "-") for r in results] + [4])
+    logger.info("=" * 60)
+    logger.info(f"{'원본':<{width}}  {'시트':<{sheet_width}}  {'상태':<6}  {'행 수':>8}  {'시간':>8}")
+    for r in results:
+        logger.info(f"{shorten(r['source']):<{width}}  {r['sheet'] or '-':<{sheet_width}}  {r['status']:<6}  "
+                    f"{r['rows']:>8}  {r['elapsed']:>7.2f}초")
+    loaded = [r for r in results if r["status"] == STATUS_LOADED]
+    total = sum(r["elapsed"] for r in loaded)
+    slowest = max((r["elapsed"] for r in loaded), default=0.0)
+    logger.info("-" * 60)
+    logger.info(f"적재 {len(loaded)}개 / 변경 없음 {sum(r['status'] == STATUS_UNCHANGED for r in results)}개 / "
+                f"건너뜀 {sum(r['status'] == STATUS_SKIPPED for r in results)}개 / "
+                f"실패 {sum(r['status'] == STATUS_FAILED for r in results)}개")
+    logger.info(f"전체 {wall:.2f}초 (작업 합계 {total:.2f}초, 가장 느린 작업 {slowest:.2f}초)")
+    logger.info("=" * 60)
+
+
+def main():
+    """raw_data 원본 병렬 적재 실행"""
+    parser = argparse.ArgumentParser(description="raw_data 워크북(시트별)·PDF 병렬 적재 + 타입 변환 캐시")
+    parser.add_argument("--raw-dir", default=RAW_DIR)
+    parser.add_argument("--output-dir", default=INGEST_DIR, help="적재 결과 폴더")
+    parser.add_argument("--workers", type=int, help="프로세스 수 (기본: 작업 수와 CPU 수 중 작은 값)")
+    parser.add_argument("--force", action="store_true", help="내용 해시가 같아도 다시 적재")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    results, wall = ingest_all(args.raw_dir, args.output_dir, args.workers, args.force)
+    print_timing_table(results, wall)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+import os
+import sys
+import time
+import argparse
+import logging
+from array import array
+from collections.abc import Mapping
+
+from fee_schedule import SCRAPED_CSV, load_scraped_records
+from kcd_master import KCD_MASTER_FILE, load_kcd_columns
+
+# 설정
+CATEGORICAL_RATIO = 0.5    # 고유값 수 / 행 수가 이 값 이하이면 사전 인코딩
+INTERN_MAX_LENGTH = 32     # 이 길이 이하의 문자열은 sys.intern (코드·플래그 값 공유)
+
+# 사전 번호 배열 typecode (고유값 수에 따라 1/2/4바이트)
+INDEX_TYPECODES = (("B", 1 << 8), ("H", 1 << 16), ("I", 1 << 32))
+
+logger = logging.getLogger(__name__)
+
+# 레코드에 키가 없음 (dict에서 키가 빠진 것과 같게 취급 - None/빈 문자열과 구분)
+MISSING = type("Missing", (), {"__repr__": lambda self: "MISSING", "__slots__": ()})()
+
+
+def _intern(value):
+    if type(value) is str and len(value) <= INTERN_MAX_LENGTH:
+        return sys.intern(value)
+    return value
+
+
+def _index_typecode(size):
+    for typecode, limit in INDEX_TYPECODES:
+        if size <= limit:
+            return typecode
+    raise OverflowError(f"사전 크기 초과: {size}")
+
+
+class DictColumn:
+    """사전 인코딩 컬럼 - 고유값 목록 + 행별 번호 배열"""
+
+    __slots__ = ("values", "lookup", "codes")
+
+    def __init__(self, items=()):
+        self.values = []
+        self.lookup = {}
+        self.codes = array("B")
+        for value in items:
+            self.append(value)
+
+    def encode(self, value):
+        index = self.lookup.get(value)
+        if index is None:
+            index = len(self.values)
+            self.values.append(_intern(value))
+            self.lookup[value] = index
+            typecode = _index_typecode(len(self.values))
+            if typecode != self.codes.typecode:
+                self.codes = array(typecode, self.codes)
+        return index
+
+    def append(self, value):
+        index = self.encode(value)  # 배열 typecode가 바뀔 수 있으므로 먼저 인코딩
+        self.codes.append(index)
+
+    def __getitem__(self, i):
+        return self.values[self.codes[i]]
+
+    def __setitem__(self, i, value):
+        index = self.encode(value)
+        self.codes[i] = index  # encode 후에 배열 참조
+
+    def __len__(self):
+        return len(self.codes)
+
+
+class PlainColumn(list):
+    """고유값이 많은 컬럼 - 짧은 문자열(코드)은 intern해서 보관"""
+
+    __slots__ = ()
+
+    def append(self, value):
+        super().append(_intern(value))
+
+    def __setitem__(self, i, value):
+        super().__setitem__(i, _intern(value))
+
+
+class RecordView(Mapping):
+    """테이블의 한 행을 dict처럼 읽고 쓰는 뷰 (행마다 dict를 만들지 않음)"""
+
+    __slots__ = ("table", "index")
+
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+
+    def __getitem__(self, key):
+        column = self.table.columns[key]
+        value = column[self.index]
+        if value is MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self.table.set(self.index, key, value)
+
+    def __iter__(self):
+        i = self.index
+        return (name for name, column in self.table.columns.items() if column[i] is not MISSING)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"RecordView({dict(self)!r})"
+
+
+class RecordTable:
+    """레코드 리스트를 컬럼 배열(struct-of-arrays)로 보관 - 반복 값이 많은 컬럼은 사전 인코딩"""
+
+    def __init__(self, columns=None):
+        self.columns = columns or {}
+        self.length = len(next(iter(self.columns.values()))) if self.columns else 0
+
+    @classmethod
+    def from_records(cls, records, categorical=None):
+        """dict 레코드 리스트에서 생성 (categorical 미지정 시 고유값 비율로 자동 선택)"""
+        records = list(records)
+        names = {}
+        for record in records:
+            for key in record:
+                names.setdefault(key, None)
+
+        columns = {}
+        for name in names:
+            values = [record.get(name, MISSING) for record in records]
+            columns[name] = cls._column(name, values, categorical)
+        return cls(columns)
+
+    @classmethod
+    def from_columns(cls, columns, categorical=None):
+        """{컬럼명: 값 리스트} (load_kcd_columns 결과 등)에서 생성"""
+        return cls({name: cls._column(name, values, categorical) for name, values in columns.items()})
+
+    @staticmethod
+    def _column(name, values, categorical):
+        if categorical is not None:
+            encode = name in categorical
+        else:
+            distinct = len(set(values))
+            encode = distinct <= max(1, len(values) * CATEGORICAL_RATIO)
+        return DictColumn(values) if encode else PlainColumn(_intern(v) for v in values)
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.length
+        if not 0 <= i < self.length:
+            raise IndexError(i)
+        return RecordView(self, i)
+
+    def __iter__(self):
+        return (RecordView(self, i) for i in range(self.length))
+
+    def column(self, name):
+        """컬럼 전체 값 리스트 (키가 없는 행은 None)"""
+        column = self.columns[name]
+        if isinstance(column, DictColumn):
+            values = [None if v is MISSING else v for v in column.values]
+            return [values[c] for c in column.codes]
+        return [None if v is MISSING else v for v in column]
+
+    def set(self, i, key, value):
+        if key not in self.columns:
+            self.columns[key] = PlainColumn([MISSING] * self.length)
+        self.columns[key][i] = value
+
+    def append(self, record):
+        for name in record:
+            if name not in self.columns:
+                self.columns[name] = PlainColumn([MISSING] * self.length)
+        for name, column in self.columns.items():
+            column.append(record.get(name, MISSING))
+        self.length += 1
+
+    def to_dicts(self):
+        return [dict(view) for view in self]
+
+    def encoding(self):
+        """컬럼별 저장 방식 (사전 인코딩이면 고유값 수)"""
+        return {
+            name: f"dict[{len(column.values)}]/{column.codes.typecode}" if isinstance(column, DictColumn) else "plain"
+            for name, column in self.columns.items()
+        }
+
+
+def deep_size(obj, seen=None):
+    """객체가 참조하는 전체 메모리 (공유 객체는 한 번만 계산)"""
+    seen = set() if seen is None else seen
+    total = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen or item is MISSING:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        elif isinstance(item, (RecordTable, DictColumn)):
+            stack.extend(getattr(item, slot) for slot in ("columns", "values", "lookup", "codes") if hasattr(item, slot))
+    return total
+
+
+def memory_report(name, records, table):
+    """레코드당 메모리 비교 (dict 리스트 vs 컬럼 테이블)"""
+    before = deep_size(records)
+    after = deep_size(table)
+    count = max(1, len(table))
+    logger.info(f"📦 {name}: {len(table)}개 레코드, 컬럼 {len(table.columns)}개")
+    logger.info(f"   └─ dict 리스트: {before / 1024:.0f}KB (레코드당 {before / count:.0f}B)")
+    logger.info(f"   └─ 컬럼 테이블: {after / 1024:.0f}KB (레코드당 {after / count:.0f}B, {before / max(1, after):.1f}배 절감)")
+    return {"records": len(table), "before": before, "after": after}
+
+
+def main():
+    """수가코드/KCD 레코드 메모리 사용량 비교 실행"""
+    parser = argparse.ArgumentParser(description="레코드 컬럼 테이블 (사전 인코딩 + intern) 메모리 비교")
+    parser.add_argument("--csv", default=SCRAPED_CSV, help="스크래핑 결과 CSV")
+    parser.add_argument("--kcd", default=KCD_MASTER_FILE, help="KCD 마스터파일")
+    parser.add_argument("--show-encoding", action="store_true", help="컬럼별 저장 방식 출력")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    sources = []
+    if os.path.exists(args.csv):
+        sources.append(("수가코드 (스크래핑 CSV)", load_scraped_records(args.csv)))
+    columns = load_kcd_columns(args.kcd)
+    names = list(columns)
+    sources.append(("KCD 마스터파일", [dict(zip(names, row)) for row in zip(*columns.values())]))
+
+    for name, records in sources:
+        start = time.perf_counter()
+        table = RecordTable.from_records(records)
+        elapsed = (time.perf_counter() - start) * 1000
+        memory_report(name, records, table)
+        logger.info(f"   └─ 변환 {elapsed:.0f}ms, 첫 레코드 일치: {dict(table[0]) == records[0]}")
+        if args.show_encoding:
+            for column, encoding in table.encoding().items():
+                logger.info(f"      {column}: {encoding}")
+
+
+if __name__ == "__main__":
+    main()
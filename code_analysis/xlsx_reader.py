@@ -0,0 +1,114 @@
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+
+# 외부 패키지 없이 xlsx(OOXML)를 행 단위로 스트리밍 읽기
+NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+NS_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+NS_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+CELL_REF = re.compile(r"([A-Z]+)(\d+)")
+
+
+def column_index(ref):
+    """셀 참조('C12')의 열 번호(0부터) 반환"""
+    letters = CELL_REF.match(ref).group(1)
+    index = 0
+    for ch in letters:
+        index = index * 26 + (ord(ch) - 64)
+    return index - 1
+
+
+def _text(element):
+    """<si>/<is> 요소 내부의 모든 <t> 텍스트 결합 (서식 run 포함)"""
+    return "".join(t.text or "" for t in element.iter(NS_MAIN + "t"))
+
+
+def load_shared_strings(archive):
+    """공유 문자열 테이블 로드"""
+    if "xl/sharedStrings.xml" not in archive.namelist():
+        return []
+
+    strings = []
+    with archive.open("xl/sharedStrings.xml") as f:
+        for _, element in ET.iterparse(f):
+            if element.tag == NS_MAIN + "si":
+                strings.append(_text(element))
+                element.clear()
+    return strings
+
+
+def sheet_paths(archive):
+    """시트명 → 워크시트 XML 경로 매핑"""
+    workbook = ET.fromstring(archive.read("xl/workbook.xml"))
+    rels = ET.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+    targets = {rel.get("Id"): rel.get("Target") for rel in rels.iter(NS_PKG_REL + "Relationship")}
+
+    paths = {}
+    for sheet in workbook.iter(NS_MAIN + "sheet"):
+        target = targets[sheet.get(NS_REL + "id")].lstrip("/")
+        paths[sheet.get("name")] = target if target.startswith("xl/") else "xl/" + target
+    return paths
+
+
+def sheet_names(path):
+    """워크북의 시트명 목록"""
+    with zipfile.ZipFile(path) as archive:
+        return list(sheet_paths(archive))
+
+
+def iter_rows(path, sheet_name=None, shared_strings=None):
+    """시트의 각 행을 (행번호, 값 리스트)로 순차 반환 - 빈 셀은 None"""
+    with zipfile.ZipFile(path) as archive:
+        paths = sheet_paths(archive)
+        target = paths[sheet_name] if sheet_name else next(iter(paths.values()))
+        strings = shared_strings if shared_strings is not None else load_shared_strings(archive)
+
+        with archive.open(target) as f:
+            for _, element in ET.iterparse(f):
+                if element.tag != NS_MAIN + "row":
+                    continue
+
+                values = []
+                for cell in element.iter(NS_MAIN + "c"):
+                    idx = column_index(cell.get("r"))
+                    if idx >= len(values):
+                        values.extend([None] * (idx + 1 - len(values)))
+
+                    kind = cell.get("t")
+                    if kind == "inlineStr":
+                        values[idx] = _text(cell)
+                        continue
+
+                    v = cell.find(NS_MAIN + "v")
+                    if v is None or v.text is None:
+                        continue
+                    if kind == "s":
+                        values[idx] = strings[int(v.text)]
+                    else:
+                        values[idx] = v.text
+
+                yield int(element.get("r")), values
+                element.clear()
+
+
+def read_table(path, sheet_name=None, header_row=1, columns=None):
+    """헤더 행 기준으로 시트를 dict 레코드 리스트로 변환
+
+    columns: 헤더 원문 → 사용할 컬럼명 매핑 (줄바꿈 포함 헤더 정리용)
+    """
+    header = None
+    records = []
+    for row_num, values in iter_rows(path, sheet_name):
+        if row_num < header_row:
+            continue
+        if row_num == header_row:
+            header = [(v or "").strip() for v in values]
+            if columns:
+                header = [columns.get(h, h) for h in header]
+            continue
+        if not any(v not in (None, "") for v in values):
+            continue
+        record = {name: (values[i] if i < len(values) else None) for i, name in enumerate(header) if name}
+        records.append(record)
+    return records
@@ -0,0 +1,25 @@
+import os
+import sys
+import importlib
+
+# 모듈끼리 파일 이름으로 import하므로 (python koicd_complete_scraper.py 실행 방식 유지) 패키지 폴더를 경로에 추가
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+if PACKAGE_DIR not in sys.path:
+    sys.path.append(PACKAGE_DIR)
+
+# 공개 이름 → 모듈 (처음 접근할 때 import - 패키지 import 시 Playwright/파일 시스템 부작용 없음)
+EXPORTS = {
+    "ScraperConfig": "scraper_config",
+    "setup_logging": "scraper_config",
+    "KOICDScraper": "koicd_complete_scraper",
+    "main": "koicd_cli",
+}
+
+__all__ = list(EXPORTS)
+
+
+def __getattr__(name):
+    module = EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module), name)
@@ -0,0 +1,3 @@
+from koicd_scraping import main
+
+main()
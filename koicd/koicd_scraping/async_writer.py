@@ -0,0 +1,144 @@
+import os
+import json
+import time
+import queue
+import asyncio
+import logging
+import threading
+
+from koicd_records import write_records_csv
+
+try:
+    import orjson
+except ImportError:  # orjson 미설치 시 표준 json 사용
+    orjson = None
+
+# 설정
+MAX_QUEUE = 64  # 쓰기 큐 최대 길이 (가득 차면 이벤트 루프를 막지 않고 executor에서 대기)
+
+KIND_JSON = "json"
+KIND_CSV = "csv"
+KIND_CALL = "call"  # 임의의 디스크 작업 (원본 아카이브 등) - 저장 스레드에서 순서대로 실행
+
+logger = logging.getLogger(__name__)
+
+
+def dumps_json(records):
+    """레코드 → 들여쓰기된 UTF-8 JSON bytes (orjson 우선)"""
+    if orjson is not None:
+        return orjson.dumps(records, option=orjson.OPT_INDENT_2)
+    return json.dumps(records, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def fsync_file(path):
+    """파일 내용을 디스크에 강제 기록"""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class AsyncWriter:
+    """JSON/CSV 저장을 전용 스레드에서 처리하는 비동기 쓰기 큐"""
+
+    def __init__(self, max_queue=MAX_QUEUE):
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.csv_versions = {}  # 경로 → 마지막으로 요청된 CSV 버전 (이전 버전 쓰기는 생략)
+        self.stats = {"written": 0, "coalesced": 0, "fsyncs": 0, "errors": 0, "backpressure": 0,
+                      "bytes": 0, "max_depth": 0}
+        self.latency = {}  # 종류 → [횟수, 쓰기 시간 합계, 최대 쓰기 시간, 대기 시간 합계]
+        self.thread = threading.Thread(target=self._run, name="koicd-writer", daemon=True)
+        self.thread.start()
+
+    async def _submit(self, job):
+        try:
+            self.queue.put_nowait(job)
+        except queue.Full:
+            # 큐가 가득 차면 executor 스레드에서 대기 - 이벤트 루프는 계속 진행
+            self.stats["backpressure"] += 1
+            await asyncio.get_running_loop().run_in_executor(None, self.queue.put, job)
+        self.stats["max_depth"] = max(self.stats["max_depth"], self.queue.qsize())
+
+    async def write_json(self, path, records, checkpoint=True):
+        """페이지 JSON 저장 요청 (기본적으로 체크포인트 - fsync)"""
+        await self._submit((KIND_JSON, path, records, checkpoint, None, time.perf_counter()))
+
+    async def write_csv(self, path, records, checkpoint=False):
+        """전체 CSV 재작성 요청 - 큐에 더 최신 요청이 있으면 이전 요청은 건너뜀"""
+        version = self.csv_versions.get(path, 0) + 1
+        self.csv_versions[path] = version
+        await self._submit((KIND_CSV, path, list(records), checkpoint, version, time.perf_counter()))
+
+    async def call(self, label, func, *args, **kwargs):
+        """디스크 작업을 저장 스레드에서 실행하도록 요청 (label은 통계/오류 표시용)"""
+        await self._submit((KIND_CALL, label, (func, args, kwargs), False, None, time.perf_counter()))
+
+    def depth(self):
+        """현재 쓰기 큐 길이"""
+        return self.queue.qsize()
+
+    def _write(self, kind, path, payload, checkpoint):
+        # 임시 파일에 쓰고 교체 - 중간에 중단돼도 이전 파일이 남음
+        tmp_path = path + ".tmp"
+        if kind == KIND_JSON:
+            with open(tmp_path, "wb") as f:
+                f.write(dumps_json(payload))
+        else:
+            write_records_csv(payload, tmp_path)
+
+        if checkpoint:
+            fsync_file(tmp_path)
+            self.stats["fsyncs"] += 1
+        self.stats["bytes"] += os.path.getsize(tmp_path)
+        os.replace(tmp_path, path)
+
+    def _run(self):
+        while True:
+            job = self.queue.get()
+            try:
+                if job is None:
+                    break
+
+                kind, path, payload, checkpoint, version, queued_at = job
+                if version is not None and version < self.csv_versions.get(path, 0) and not checkpoint:
+                    self.stats["coalesced"] += 1
+                    continue
+
+                start = time.perf_counter()
+                try:
+                    if kind == KIND_CALL:
+                        func, args, kwargs = payload
+                        func(*args, **kwargs)
+                        kind = path  # 통계는 작업 이름별로
+                    else:
+                        self._write(kind, path, payload, checkpoint)
+                    self.stats["written"] += 1
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    logger.error(f"❌ 파일 저장 오류 ({path}): {e}")
+                    continue
+
+                elapsed = time.perf_counter() - start
+                stat = self.latency.setdefault(kind, [0, 0.0, 0.0, 0.0])
+                stat[0] += 1
+                stat[1] += elapsed
+                stat[2] = max(stat[2], elapsed)
+                stat[3] += start - queued_at
+            finally:
+                self.queue.task_done()
+
+    async def close(self):
+        """남은 쓰기 작업을 모두 처리하고 스레드 종료"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.queue.put, None)
+        await loop.run_in_executor(None, self.thread.join)
+
+    def log_summary(self):
+        stats = self.stats
+        logger.info(f"💾 비동기 저장: {stats['written']}회 기록 ({stats['bytes'] / 1024:.0f}KB), "
+                    f"fsync {stats['fsyncs']}회, 생략 {stats['coalesced']}회, 오류 {stats['errors']}회")
+        logger.info(f"   └─ 큐 최대 길이: {stats['max_depth']}/{self.queue.maxsize}, 대기 발생: {stats['backpressure']}회")
+        for kind, (count, total, worst, waited) in sorted(self.latency.items()):
+            logger.info(f"   └─ {kind}: 평균 {total / count * 1000:.1f}ms, 최대 {worst * 1000:.1f}ms, "
+                        f"큐 대기 평균 {waited / count * 1000:.1f}ms")
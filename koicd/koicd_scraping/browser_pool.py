@@ -0,0 +1,167 @@
+import time
+import logging
+import statistics
+from collections import deque
+from contextlib import asynccontextmanager
+
+# 설정
+MAX_HEAP_MB = 512             # 렌더러 JS 힙 사용량 상한
+LATENCY_WINDOW = 50           # 작업 지연 이동 창 크기
+BASELINE_SAMPLES = 20         # 컨텍스트 시작 직후 기준 지연 측정 샘플 수
+LATENCY_FACTOR = 3.0          # 최근 지연 중앙값이 기준의 이 배수를 넘으면 재시작
+MAX_OPS_PER_CONTEXT = 5000    # 컨텍스트당 최대 작업 수 (핸들 누적 방지)
+MAX_STUCK_POPUPS = 2          # 열린 채 남은 팝업 수 상한
+
+logger = logging.getLogger(__name__)
+
+
+class BrowserPool:
+    """브라우저 컨텍스트 상태(메모리/지연) 감시 및 임계값 초과 시 재시작"""
+
+    def __init__(self, setup=None, headless=False, slow_mo=100, stuck_selector=None,
+                 max_heap_mb=MAX_HEAP_MB, latency_factor=LATENCY_FACTOR, max_ops=MAX_OPS_PER_CONTEXT):
+        self.setup = setup  # 새 페이지마다 호출되는 async 콜백 (뷰포트, 캐시 등 설정)
+        self.headless = headless
+        self.slow_mo = slow_mo
+        self.stuck_selector = stuck_selector
+        self.max_heap_mb = max_heap_mb
+        self.latency_factor = latency_factor
+        self.max_ops = max_ops
+
+        self.playwright = None
+        self.browser = None
+        self.context = None
+        self.page = None
+        self.cdp = None
+
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.baseline = None
+        self.ops = 0
+        self.generation = 0
+        self.recycles = []  # (시각, 원인, 컨텍스트 작업 수)
+
+    async def start(self):
+        """브라우저 실행 후 첫 컨텍스트 생성"""
+        # Playwright는 실제로 브라우저를 띄울 때만 불러옴 (모듈 import를 가볍게 유지)
+        from playwright.async_api import async_playwright
+
+        self.playwright = await async_playwright().start()
+        await self._launch()
+        await self._new_context()
+        return self.page
+
+    async def _launch(self):
+        self.browser = await self.playwright.chromium.launch(headless=self.headless, slow_mo=self.slow_mo)
+
+    async def _new_context(self):
+        self.context = await self.browser.new_context()
+        self.page = await self.context.new_page()
+        try:
+            self.cdp = await self.context.new_cdp_session(self.page)
+            await self.cdp.send("Performance.enable")
+        except Exception as e:
+            logger.debug(f"CDP 세션 사용 불가 - performance.memory로 대체: {e}")
+            self.cdp = None
+
+        self.latencies.clear()
+        self.baseline = None
+        self.ops = 0
+        self.generation += 1
+        if self.setup:
+            await self.setup(self.page)
+
+    @asynccontextmanager
+    async def measure(self, name):
+        """작업 지연 측정 (컨텍스트 재시작 판단에 사용)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name, elapsed):
+        self.ops += 1
+        self.latencies.append(elapsed)
+        if self.baseline is None and len(self.latencies) >= BASELINE_SAMPLES:
+            self.baseline = statistics.median(self.latencies)
+            logger.debug(f"기준 지연 설정 ({name}): {self.baseline * 1000:.0f}ms")
+
+    async def heap_mb(self):
+        """렌더러 JS 힙 사용량 (MB) - 측정 불가 시 None"""
+        try:
+            if self.cdp is not None:
+                metrics = await self.cdp.send("Performance.getMetrics")
+                for metric in metrics["metrics"]:
+                    if metric["name"] == "JSHeapUsedSize":
+                        return metric["value"] / (1024 * 1024)
+            used = await self.page.evaluate("() => performance.memory ? performance.memory.usedJSHeapSize : null")
+            return used / (1024 * 1024) if used else None
+        except Exception:
+            return None
+
+    async def check_health(self):
+        """재시작이 필요하면 원인 문자열, 정상이면 None"""
+        if not self.browser.is_connected():
+            return "브라우저 연결 끊김"
+        if self.page.is_closed():
+            return "페이지 닫힘"
+
+        heap = await self.heap_mb()
+        if heap is not None and heap > self.max_heap_mb:
+            return f"메모리 {heap:.0f}MB > {self.max_heap_mb}MB"
+
+        if self.baseline and len(self.latencies) == self.latencies.maxlen:
+            recent = statistics.median(self.latencies)
+            if recent > self.baseline * self.latency_factor:
+                return f"지연 중앙값 {recent * 1000:.0f}ms > 기준 {self.baseline * 1000:.0f}ms x {self.latency_factor}"
+
+        if self.ops >= self.max_ops:
+            return f"작업 수 {self.ops}회 초과"
+
+        if self.stuck_selector:
+            try:
+                stuck = await self.page.locator(f"{self.stuck_selector}:visible").count()
+            except Exception:
+                stuck = 0
+            if stuck > MAX_STUCK_POPUPS:
+                return f"열린 팝업 {stuck}개 남음"
+
+        return None
+
+    async def recycle(self, cause, resume=None):
+        """컨텍스트 교체 후 resume 콜백으로 작업 위치 복구"""
+        logger.warning(f"♻️  브라우저 컨텍스트 재시작 (#{self.generation}, 작업 {self.ops}회): {cause}")
+        self.recycles.append((time.time(), cause, self.ops))
+
+        try:
+            if self.context:
+                await self.context.close()
+        except Exception as e:
+            logger.debug(f"컨텍스트 종료 오류: {e}")
+
+        if not self.browser.is_connected():
+            await self._launch()
+        await self._new_context()
+
+        if resume:
+            await resume(self.page)
+        return self.page
+
+    async def ensure_healthy(self, resume=None):
+        """상태 확인 후 필요하면 재시작 - 재시작했으면 True"""
+        cause = await self.check_health()
+        if cause is None:
+            return False
+        await self.recycle(cause, resume)
+        return True
+
+    async def close(self):
+        if self.browser:
+            await self.browser.close()
+        if self.playwright:
+            await self.playwright.stop()
+
+    def log_summary(self):
+        logger.info(f"♻️  컨텍스트 재시작: {len(self.recycles)}회")
+        for _, cause, ops in self.recycles:
+            logger.info(f"   └─ {cause} (작업 {ops}회 후)")
@@ -0,0 +1,226 @@
+import os
+import json
+import zlib
+import hashlib
+import argparse
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+from koicd_records import parse_table_rows, parse_popup, row_basic_info, rows_to_records, write_records_csv
+
+try:
+    import zstandard
+except ImportError:  # zstandard 미설치 시 zlib으로 압축
+    zstandard = None
+
+# 설정
+BASE_DIR = os.path.abspath("koicd_scraping_results")
+ARCHIVE_DIR = os.path.join(BASE_DIR, "raw_archive")
+JSON_DIR = os.path.join(BASE_DIR, "json_pages")
+CSV_FILE = os.path.join(BASE_DIR, "koicd_complete_data.csv")
+
+MANIFEST_NAME = "manifest.jsonl"
+CODEC_EXTENSIONS = {"zstd": ".zst", "zlib": ".zz"}
+
+# 아카이브 항목 종류
+KIND_LISTING = "listing"  # 페이지 목록 표 (일괄 펼치기 모드는 펼친 뒤의 표)
+KIND_ROW = "row"          # 개별 행 (행 단위 수집 모드)
+KIND_POPUP = "popup"      # 상세 팝업
+
+logger = logging.getLogger(__name__)
+
+
+def compress(data, codec):
+    """codec으로 압축"""
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return zlib.compress(data, 9)
+
+
+def decompress(data, codec):
+    """codec으로 압축 해제"""
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstd로 압축된 아카이브를 읽으려면 zstandard 패키지가 필요합니다 (pip install zstandard)")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+class HtmlArchive:
+    """원본 HTML 조각을 내용 해시(sha256)로 저장하는 아카이브 + (페이지, 코드) → blob manifest"""
+
+    def __init__(self, root=ARCHIVE_DIR, run_id=None):
+        self.root = root
+        self.blob_dir = os.path.join(root, "blobs")
+        self.manifest_path = os.path.join(root, MANIFEST_NAME)
+        self.codec = "zstd" if zstandard is not None else "zlib"
+        self.run_id = run_id
+        self.stored = 0
+        self.deduplicated = 0
+        os.makedirs(self.blob_dir, exist_ok=True)
+
+    def blob_path(self, digest, codec):
+        return os.path.join(self.blob_dir, digest[:2], digest + CODEC_EXTENSIONS[codec])
+
+    def find_blob(self, digest):
+        """저장된 blob의 (경로, codec) - 없으면 (None, None)"""
+        for codec in CODEC_EXTENSIONS:
+            path = self.blob_path(digest, codec)
+            if os.path.exists(path):
+                return path, codec
+        return None, None
+
+    def put(self, html, kind, page, code=None, **meta):
+        """HTML 저장 후 manifest에 항목 추가 - 같은 내용은 blob 하나만 저장"""
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+
+        if self.find_blob(digest)[0]:
+            self.deduplicated += 1
+        else:
+            path = self.blob_path(digest, self.codec)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(compress(data, self.codec))
+            os.replace(tmp_path, path)
+            self.stored += 1
+
+        entry = {"run": self.run_id, "kind": kind, "page": page, "code": code, "hash": digest, **meta}
+        with open(self.manifest_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return digest
+
+    def get(self, digest):
+        """해시로 원본 HTML 조회"""
+        path, codec = self.find_blob(digest)
+        if path is None:
+            raise KeyError(digest)
+        with open(path, "rb") as f:
+            return decompress(f.read(), codec).decode("utf-8")
+
+    def manifest(self):
+        """manifest 항목 전체 (기록 순서)"""
+        if not os.path.exists(self.manifest_path):
+            return []
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def latest_pages(self):
+        """페이지 번호 → 해당 페이지를 마지막으로 수집한 실행의 항목 목록"""
+        pages = {}
+        for entry in self.manifest():
+            entries = pages.get(entry["page"])
+            if entries is None or entries[0]["run"] != entry["run"]:
+                pages[entry["page"]] = entries = []
+            entries.append(entry)
+        return pages
+
+
+def reparse_page(root, page, entries):
+    """아카이브 항목으로 한 페이지의 레코드 재구성 (프로세스 풀 작업 단위)"""
+    archive = HtmlArchive(root)
+    popups = {}
+    for entry in entries:
+        if entry["kind"] == KIND_POPUP:
+            popups[entry["code"]] = parse_popup(archive.get(entry["hash"]))
+
+    row_entries = [entry for entry in entries if entry["kind"] == KIND_ROW]
+    if row_entries:
+        # 행 단위 수집: 행 HTML + 같은 코드의 팝업
+        records = []
+        for entry in row_entries:
+            rows = parse_table_rows(archive.get(entry["hash"]))
+            basic_info = row_basic_info(rows[0]["cells"]) if rows else None
+            if not basic_info:
+                continue
+            code = basic_info["수가코드"]
+            records.append({
+                **basic_info,
+                **popups.get(code, {}),
+                "parent_code": entry.get("parent_code") or code,
+                "child_code": code,
+                "hierarchy_level": entry.get("hierarchy_level", 0),
+                "is_parent": entry.get("hierarchy_level", 0) == 0,
+                "페이지": page,
+                "수집일시": entry.get("수집일시"),
+            })
+        return page, records
+
+    # 일괄 펼치기 수집: 마지막 목록 표에서 행 순서로 계층 재구성
+    listings = [entry for entry in entries if entry["kind"] == KIND_LISTING]
+    if not listings:
+        return page, []
+    listing = listings[-1]
+    records = rows_to_records(parse_table_rows(archive.get(listing["hash"])), page, listing.get("수집일시"))
+    for record in records:
+        record.update(popups.get(record["child_code"], {}))
+    return page, records
+
+
+def reparse(root=ARCHIVE_DIR, json_dir=JSON_DIR, csv_path=CSV_FILE, workers=None):
+    """아카이브에서 json_pages와 CSV 재생성 (재수집 없이 파싱 로직만 다시 적용)"""
+    archive = HtmlArchive(root)
+    pages = archive.latest_pages()
+    if not pages:
+        logger.warning(f"⚠️ 아카이브 항목 없음: {archive.manifest_path}")
+        return []
+
+    os.makedirs(json_dir, exist_ok=True)
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(reparse_page, root, page, entries) for page, entries in pages.items()]
+        for future in futures:
+            page, records = future.result()
+            results[page] = records
+
+    all_records = []
+    for page in sorted(results):
+        records = results[page]
+        if not records:
+            continue
+        json_path = os.path.join(json_dir, f"page_{page}_hierarchical.json")
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(records, f, ensure_ascii=False, indent=2)
+        all_records.extend(records)
+
+    write_records_csv(all_records, csv_path)
+    logger.info(f"✅ 재파싱 완료: {len(results)}개 페이지, {len(all_records)}개 항목")
+    logger.info(f"💾 저장 위치: {csv_path}")
+    return all_records
+
+
+def main():
+    """원본 HTML 아카이브 관리 실행"""
+    parser = argparse.ArgumentParser(description="수집 원본 HTML 아카이브 (재수집 없이 재파싱)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_reparse = sub.add_parser("reparse", help="아카이브에서 CSV/json_pages 재생성")
+    p_reparse.add_argument("--archive-dir", default=ARCHIVE_DIR)
+    p_reparse.add_argument("--json-dir", default=JSON_DIR)
+    p_reparse.add_argument("--csv", default=CSV_FILE)
+    p_reparse.add_argument("--workers", type=int, help="프로세스 수 (기본: CPU 수)")
+
+    p_stats = sub.add_parser("stats", help="아카이브 통계 출력")
+    p_stats.add_argument("--archive-dir", default=ARCHIVE_DIR)
+
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.command == "reparse":
+        reparse(args.archive_dir, args.json_dir, args.csv, args.workers)
+    else:
+        archive = HtmlArchive(args.archive_dir)
+        entries = archive.manifest()
+        hashes = {entry["hash"] for entry in entries}
+        kinds = {}
+        for entry in entries:
+            kinds[entry["kind"]] = kinds.get(entry["kind"], 0) + 1
+        logger.info(f"manifest 항목 {len(entries)}개, 고유 blob {len(hashes)}개, 페이지 {len(archive.latest_pages())}개")
+        for kind, count in sorted(kinds.items()):
+            logger.info(f"   └─ {kind}: {count}개")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import argparse
+import logging
+import threading
+import urllib.error
+import urllib.request
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 설정
+BASE_DIR = os.path.abspath("koicd_scraping_results")
+CACHE_DIR = os.path.join(BASE_DIR, "http_cache")
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024  # 200MB
+DEFAULT_TTL = 24 * 60 * 60             # 이 시간 안의 응답은 서버 확인 없이 재사용
+
+# 캐시 대상 요청 종류 (Playwright resource_type)
+CACHEABLE_TYPES = {"document", "xhr", "fetch"}
+
+# 캐시 응답을 그대로 돌려줄 때 제외하는 헤더 (본문은 압축 해제된 상태로 저장)
+DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive"}
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(method, url, post_data=None):
+    """요청 식별 키 (POST 팝업 요청은 본문까지 포함)"""
+    key = f"{method.upper()} {url}"
+    if post_data:
+        key += "\n" + hashlib.sha256(post_data.encode("utf-8") if isinstance(post_data, str) else post_data).hexdigest()
+    return key
+
+
+class HttpCache:
+    """ETag/Last-Modified 조건부 요청 기반 영속 HTTP 캐시 (LRU 용량 제한 + TTL)"""
+
+    def __init__(self, root=CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, ttl=DEFAULT_TTL, url_prefix=None):
+        self.root = root
+        self.body_dir = os.path.join(root, "bodies")
+        self.index_path = os.path.join(root, "index.json")
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.url_prefix = url_prefix
+        self.entries = OrderedDict()  # 키 → 항목 (앞쪽이 가장 오래 사용하지 않은 항목)
+        self.body_refs = {}
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "fresh": 0, "revalidated": 0, "unchanged": 0, "changed": 0,
+                      "misses": 0, "bytes_saved": 0, "evicted": 0}
+        os.makedirs(self.body_dir, exist_ok=True)
+        self.load()
+
+    # ---------- 저장소 ----------
+
+    def load(self):
+        """이전 실행의 인덱스 로드"""
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            for key, entry in json.load(f):
+                if os.path.exists(self.body_path(entry["body_hash"])):
+                    self._add(key, entry)
+        logger.info(f"HTTP 캐시 로드: {len(self.entries)}개 항목 ({self.total_bytes / 1024:.0f}KB)")
+
+    def save(self):
+        """인덱스 저장 (LRU 순서 유지)"""
+        with self.lock:
+            items = list(self.entries.items())
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(items, f, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+
+    def body_path(self, body_hash):
+        return os.path.join(self.body_dir, body_hash)
+
+    def read_body(self, entry):
+        with open(self.body_path(entry["body_hash"]), "rb") as f:
+            return f.read()
+
+    def read_cached_body(self, entry):
+        """본문 읽기 - 파일이 이미 제거됐으면 None"""
+        try:
+            return self.read_body(entry)
+        except FileNotFoundError:
+            return None
+
+    def _add(self, key, entry):
+        self.entries[key] = entry
+        self.body_refs[entry["body_hash"]] = self.body_refs.get(entry["body_hash"], 0) + 1
+        self.total_bytes += entry["size"]
+
+    def _remove(self, key):
+        entry = self.entries.pop(key)
+        self.total_bytes -= entry["size"]
+        body_hash = entry["body_hash"]
+        self.body_refs[body_hash] -= 1
+        if not self.body_refs[body_hash]:
+            del self.body_refs[body_hash]
+            try:
+                os.remove(self.body_path(body_hash))
+            except FileNotFoundError:
+                pass
+
+    def _evict(self):
+        """용량 초과 시 가장 오래 사용하지 않은 항목부터 제거"""
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            self._remove(next(iter(self.entries)))
+            self.stats["evicted"] += 1
+
+    # ---------- 캐시 판단 ----------
+
+    def lookup(self, key):
+        """항목 조회 (LRU 순서 갱신)"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    def is_fresh(self, entry):
+        return entry is not None and time.time() - entry["stored_at"] < self.ttl
+
+    def conditional_headers(self, entry):
+        """조건부 요청 헤더 (서버가 ETag/Last-Modified를 주지 않았으면 빈 dict)"""
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def hit(self, entry):
+        """TTL 안의 항목 재사용"""
+        with self.lock:
+            self.stats["requests"] += 1
+            self.stats["fresh"] += 1
+            self.stats["bytes_saved"] += entry["size"]
+
+    def revalidate(self, key, entry):
+        """304 응답 - 본문 전송 없이 항목 재사용"""
+        with self.lock:
+            self.stats["requests"] += 1
+            self.stats["revalidated"] += 1
+            self.stats["bytes_saved"] += entry["size"]
+            entry["stored_at"] = time.time()
+
+    def store(self, key, status, headers, body):
+        """새 응답 저장 - 이전 본문과 내용 해시가 같으면 unchanged로 기록하고 True 반환"""
+        body_hash = hashlib.sha256(body).hexdigest()
+        headers = {k.lower(): v for k, v in headers.items()}
+
+        with self.lock:
+            self.stats["requests"] += 1
+            previous = self.entries.get(key)
+            if previous is None:
+                self.stats["misses"] += 1
+            elif previous["body_hash"] == body_hash:
+                # 조건부 요청을 지원하지 않는 서버 - 내용 해시로 변경 여부 판단
+                self.stats["unchanged"] += 1
+            else:
+                self.stats["changed"] += 1
+
+            if status != 200:
+                return False
+
+            path = self.body_path(body_hash)
+            if body_hash not in self.body_refs and not os.path.exists(path):
+                # 임시 파일에 쓰고 교체 - 중간에 중단돼도 잘린 본문이 캐시 적중으로 쓰이지 않음
+                tmp_path = path + ".tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(body)
+                os.replace(tmp_path, path)
+
+            # 이전 항목 제거 시 같은 본문 파일이 지워지지 않도록 참조를 먼저 잡아 둠
+            self.body_refs[body_hash] = self.body_refs.get(body_hash, 0) + 1
+            if previous is not None:
+                self._remove(key)
+            self._add(key, {
+                "status": status,
+                "headers": {k: v for k, v in headers.items() if k not in DROP_HEADERS},
+                "body_hash": body_hash,
+                "size": len(body),
+                "etag": headers.get("etag"),
+                "last_modified": headers.get("last-modified"),
+                "stored_at": time.time(),
+            })
+            self.body_refs[body_hash] -= 1
+            self._evict()
+            return previous is not None and previous["body_hash"] == body_hash
+
+    def hit_ratio(self):
+        """서버에서 본문을 받지 않은 요청 비율"""
+        if not self.stats["requests"]:
+            return 0.0
+        return (self.stats["fresh"] + self.stats["revalidated"]) / self.stats["requests"]
+
+    def log_summary(self):
+        stats = self.stats
+        logger.info(f"🗃️  HTTP 캐시: 적중률 {self.hit_ratio() * 100:.1f}% "
+                    f"(요청 {stats['requests']}회, TTL 적중 {stats['fresh']}회, 304 재검증 {stats['revalidated']}회, "
+                    f"미변경 {stats['unchanged']}회, 변경 {stats['changed']}회, 신규 {stats['misses']}회)")
+        logger.info(f"   └─ 절약한 전송량: {stats['bytes_saved'] / 1024:.1f}KB, 캐시 크기: {self.total_bytes / 1024:.1f}KB "
+                    f"({len(self.entries)}개 항목, 제거 {stats['evicted']}개)")
+
+    # ---------- 요청 처리 ----------
+
+    async def handle_route(self, route):
+        """Playwright page.route 핸들러 - 목록/상세 요청을 캐시 경유로 처리"""
+        request = route.request
+        if request.resource_type not in CACHEABLE_TYPES or (self.url_prefix and not request.url.startswith(self.url_prefix)):
+            await route.continue_()
+            return
+
+        # 본문 파일 읽기/쓰기(해시 계산 포함)는 스레드에서 - 이벤트 루프가 디스크를 기다리지 않도록
+        # (다른 요청의 저장 중 LRU 제거로 본문 파일이 사라졌으면 캐시 없이 다시 요청)
+        key = cache_key(request.method, request.url, request.post_data)
+        entry = self.lookup(key)
+        if self.is_fresh(entry):
+            body = await asyncio.to_thread(self.read_cached_body, entry)
+            if body is not None:
+                self.hit(entry)
+                await route.fulfill(status=entry["status"], headers=entry["headers"], body=body)
+                return
+            entry = None
+
+        response = await route.fetch(headers={**request.headers, **self.conditional_headers(entry)})
+        if response.status == 304 and entry is not None:
+            body = await asyncio.to_thread(self.read_cached_body, entry)
+            if body is not None:
+                self.revalidate(key, entry)
+                await route.fulfill(status=entry["status"], headers=entry["headers"], body=body)
+                return
+            response = await route.fetch()
+
+        body = await response.body()
+        await asyncio.to_thread(self.store, key, response.status, response.headers, body)
+        await route.fulfill(response=response, body=body)
+
+    async def install(self, page):
+        """페이지의 모든 요청을 캐시 핸들러로 연결"""
+        await page.route("**/*", self.handle_route)
+
+    def fetch(self, url, data=None, timeout=10):
+        """urllib 기반 동기 요청 (캐시 동작 확인/벤치마크용) - (본문, 출처) 반환"""
+        key = cache_key("POST" if data else "GET", url, data)
+        entry = self.lookup(key)
+        if self.is_fresh(entry):
+            self.hit(entry)
+            return self.read_body(entry), "fresh"
+
+        request = urllib.request.Request(url, data=data, headers=self.conditional_headers(entry))
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                body = response.read()
+                unchanged = self.store(key, response.status, dict(response.headers), body)
+                return body, "unchanged" if unchanged else "network"
+        except urllib.error.HTTPError as e:
+            if e.code == 304 and entry is not None:
+                self.revalidate(key, entry)
+                return self.read_body(entry), "revalidated"
+            raise
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """ETag를 내려주는 로컬 대역 서버 (페이지 번호별 고정 HTML)"""
+
+    emit_etag = True
+
+    def do_GET(self):
+        body = (f"<table class='act_table'><tbody><tr class='{len(self.path)}'><td>+</td>"
+                f"<td>{self.path}</td><td>대역 응답</td></tr></tbody></table>" * 50).encode("utf-8")
+        etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+
+        if self.emit_etag and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if self.emit_etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stand_in_server(port=0, emit_etag=True):
+    """대역 서버를 백그라운드 스레드로 시작하고 (서버, 기본 URL) 반환"""
+    handler = type("Handler", (StandInHandler,), {"emit_etag": emit_etag})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    """HTTP 캐시 관리/벤치마크 실행"""
+    parser = argparse.ArgumentParser(description="스크래퍼 HTTP 조건부 요청 캐시")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_serve = sub.add_parser("serve", help="ETag를 내려주는 로컬 대역 서버 실행")
+    p_serve.add_argument("--port", type=int, default=8765)
+    p_serve.add_argument("--no-etag", action="store_true", help="ETag 없이 응답 (내용 해시 비교 경로 확인)")
+
+    p_bench = sub.add_parser("bench", help="대역 서버로 두 번의 수집 실행을 흉내 내어 적중률 측정")
+    p_bench.add_argument("--url", help="대상 서버 (기본: 내장 대역 서버)")
+    p_bench.add_argument("--pages", type=int, default=200)
+    p_bench.add_argument("--ttl", type=float, default=0, help="TTL 초 (0이면 항상 조건부 요청)")
+    p_bench.add_argument("--no-etag", action="store_true")
+    p_bench.add_argument("--cache-dir", default=os.path.join(CACHE_DIR, "bench"))
+
+    p_stats = sub.add_parser("stats", help="캐시 크기 출력")
+    p_stats.add_argument("--cache-dir", default=CACHE_DIR)
+
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.command == "serve":
+        handler = type("Handler", (StandInHandler,), {"emit_etag": not args.no_etag})
+        server = ThreadingHTTPServer(("127.0.0.1", args.port), handler)
+        logger.info(f"대역 서버 실행: http://127.0.0.1:{args.port} (ETag {'없음' if args.no_etag else '사용'})")
+        server.serve_forever()
+
+    elif args.command == "bench":
+        server = None
+        url = args.url
+        if url is None:
+            server, url = start_stand_in_server(emit_etag=not args.no_etag)
+
+        # 실행마다 새 HttpCache를 열어 디스크에 저장된 인덱스 재사용 확인
+        for run in (1, 2):
+            cache = HttpCache(args.cache_dir, ttl=args.ttl)
+            start = time.perf_counter()
+            for page in range(1, args.pages + 1):
+                cache.fetch(f"{url}/ins/act.do?page={page}")
+            elapsed = time.perf_counter() - start
+            cache.save()
+            logger.info(f"실행 {run}: {args.pages}개 요청 {elapsed * 1000:.0f}ms")
+            cache.log_summary()
+
+        if server:
+            server.shutdown()
+
+    else:
+        cache = HttpCache(args.cache_dir)
+        logger.info(f"{len(cache.entries)}개 항목, {cache.total_bytes / 1024:.1f}KB, 고유 본문 {len(cache.body_refs)}개")
+
+
+if __name__ == "__main__":
+    main()
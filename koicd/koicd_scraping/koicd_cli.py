@@ -0,0 +1,131 @@
+import os
+import time
+import asyncio
+import argparse
+import logging
+
+from scraper_config import ScraperConfig, setup_logging, BASE_DIR
+from rate_controller import MAX_RATE
+
+# 설정
+BENCH_DIR = os.path.join(BASE_DIR, "bench")  # 벤치마크 출력은 본 수집 결과와 분리
+BENCH_PAGES = 3
+
+logger = logging.getLogger(__name__)
+
+
+def build_config(args, base_dir=BASE_DIR, **overrides):
+    """공통 인자로 ScraperConfig 생성"""
+    options = dict(
+        base_dir=args.base_dir or base_dir,
+        expand_all=args.expand_all,
+        http_cache=args.http_cache,
+        max_rate=args.max_rate,
+        headless=args.headless,
+        slow_mo=0 if args.headless else 100,
+    )
+    options.update(overrides)
+    return ScraperConfig(**options)
+
+
+def run_scraper(config, resume=False):
+    """스크래퍼 실행 (스크래퍼 모듈은 여기서 처음 import) - 실행한 스크래퍼 반환"""
+    from koicd_complete_scraper import KOICDScraper
+
+    scraper = KOICDScraper(config)
+    if resume:
+        last_page = scraper.load_saved_pages()
+        config.start_page = last_page + 1
+        logger.info(f"페이지 {config.start_page}부터 이어서 수집")
+    asyncio.run(scraper.run())
+    return scraper
+
+
+def cmd_crawl(args):
+    config = build_config(args, start_page=args.start_page, max_pages=args.max_pages,
+                          queue=args.queue, worker_id=args.worker_id)
+    if args.profile is not None:
+        config.profile = args.profile or config.profile_file
+    setup_logging(config.log_file)
+    run_scraper(config)
+
+
+def cmd_resume(args):
+    config = build_config(args, max_pages=args.max_pages)
+    setup_logging(config.log_file)
+    run_scraper(config, resume=True)
+
+
+def cmd_reparse(args):
+    from html_archive import reparse
+
+    config = ScraperConfig(base_dir=args.base_dir or BASE_DIR)
+    setup_logging()
+    reparse(config.archive_dir, config.json_dir, config.csv_file, args.workers)
+
+
+def cmd_bench(args):
+    """지정 페이지 수만 수집해 처리량 측정 (Playwright 왕복 프로파일 포함)"""
+    config = build_config(args, base_dir=BENCH_DIR, start_page=args.start_page, max_pages=args.pages)
+    config.profile = config.profile_file
+    setup_logging(config.log_file)
+
+    start = time.perf_counter()
+    scraper = run_scraper(config)
+    elapsed = time.perf_counter() - start
+
+    rows = len(scraper.all_data)
+    pages = len({record.get("페이지") for record in scraper.all_data})
+    logger.info("=" * 60)
+    logger.info(f"⏱️  벤치마크: {pages}개 페이지, {rows}개 항목, {elapsed:.1f}초")
+    logger.info(f"   └─ 처리량: {rows / elapsed * 60:.1f}행/분, 페이지당 {elapsed / max(1, pages):.1f}초")
+    logger.info(f"   └─ 실패 항목: {len(scraper.failed_items)}개, 최종 속도 {scraper.rate.rate:.2f}회/초")
+    logger.info(f"💾 프로파일: {config.profile}")
+    logger.info("=" * 60)
+
+
+def main(argv=None):
+    """koicd 명령 실행 (crawl / resume / reparse / bench)"""
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--base-dir", help=f"출력 폴더 (기본: {BASE_DIR}, bench는 {BENCH_DIR})")
+
+    browser = argparse.ArgumentParser(add_help=False)
+    browser.add_argument("--expand-all", action="store_true",
+                         help="페이지별 토글 일괄 펼치기 후 한 번에 수집 (상세 팝업 제외)")
+    browser.add_argument("--http-cache", action="store_true",
+                         help="목록/상세 응답을 ETag/Last-Modified 조건부 요청 캐시로 재사용")
+    browser.add_argument("--max-rate", type=float, default=MAX_RATE,
+                         help=f"초당 최대 요청 속도 상한 (기본: {MAX_RATE})")
+    browser.add_argument("--headless", action="store_true", help="브라우저 창 없이 실행")
+
+    parser = argparse.ArgumentParser(prog="koicd", description="KOICD 건강보험 수가코드 스크래퍼")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_crawl = sub.add_parser("crawl", parents=[common, browser], help="전체(또는 지정 범위) 수집")
+    p_crawl.add_argument("--start-page", type=int, default=1)
+    p_crawl.add_argument("--max-pages", type=int, help="수집할 최대 페이지 수")
+    p_crawl.add_argument("--queue", help="공유 작업 큐 URL - 지정 시 임대받은 페이지 범위만 수집")
+    p_crawl.add_argument("--worker-id", help="작업자 식별자 (기본: 호스트명-PID)")
+    p_crawl.add_argument("--profile", nargs="?", const="",
+                         help="Playwright 호출 왕복 수/시간을 folded stack으로 저장 (기본: 출력 폴더/playwright_profile.folded)")
+    p_crawl.set_defaults(func=cmd_crawl)
+
+    p_resume = sub.add_parser("resume", parents=[common, browser], help="저장된 json_pages 다음 페이지부터 이어서 수집")
+    p_resume.add_argument("--max-pages", type=int, help="이번 실행에서 수집할 최대 페이지 수")
+    p_resume.set_defaults(func=cmd_resume)
+
+    p_reparse = sub.add_parser("reparse", parents=[common], help="원본 HTML 아카이브에서 CSV/json_pages 재생성")
+    p_reparse.add_argument("--workers", type=int, help="프로세스 수 (기본: CPU 수)")
+    p_reparse.set_defaults(func=cmd_reparse)
+
+    p_bench = sub.add_parser("bench", parents=[common, browser], help="몇 페이지만 수집해 처리량/왕복 프로파일 측정")
+    p_bench.add_argument("--pages", type=int, default=BENCH_PAGES, help=f"측정할 페이지 수 (기본: {BENCH_PAGES})")
+    p_bench.add_argument("--start-page", type=int, default=1)
+    p_bench.set_defaults(func=cmd_bench)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
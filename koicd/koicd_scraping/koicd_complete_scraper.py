@@ -1,63 +1,226 @@
 import os
 import time
 import json
-import csv
+import socket
 import asyncio
+import argparse
 import logging
 from datetime import datetime
-from playwright.async_api import async_playwright
-
-# 설정
-BASE_URL = "https://www.koicd.kr/ins/act.do"
-BASE_DIR = os.path.abspath("koicd_scraping_results")
-JSON_DIR = os.path.join(BASE_DIR, "json_pages")
-CSV_FILE = os.path.join(BASE_DIR, "koicd_complete_data.csv")
-FAILED_FILE = os.path.join(BASE_DIR, "failed_items.txt")
-LOG_FILE = os.path.join(BASE_DIR, "scraping.log")
-
-# 폴더 생성
-os.makedirs(BASE_DIR, exist_ok=True)
-os.makedirs(JSON_DIR, exist_ok=True)
-
-# 로깅 설정
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(LOG_FILE, encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
+
+from selector_cache import SelectorCache
+from browser_pool import BrowserPool
+from rate_controller import RateController, MAX_RATE
+from work_queue import open_queue, KIND_PAGES, LEASE_TTL
+from playwright_profiler import PlaywrightProfiler, PROFILE_FILE
+from http_cache import HttpCache
+from async_writer import AsyncWriter
+from html_archive import HtmlArchive, KIND_LISTING, KIND_ROW, KIND_POPUP
+from koicd_records import rows_to_records
+from scraper_config import ScraperConfig, setup_logging
+
+# 설정 (URL/출력 경로는 ScraperConfig)
+# 셀렉터 후보 목록 (SelectorCache가 성공한 셀렉터를 먼저 시도)
+POPUP_SELECTORS = [
+    ".div_table_style",
+    ".popup",
+    ".modal",
+    "div[style*='display: block']",
+    "table[class*='popup']"
+]
+CLOSE_SELECTORS = [
+    "button:has-text('닫기')",
+    "button:has-text('Close')",
+    "button:has-text('×')",
+    ".close",
+    ".popup-close",
+    "button[onclick*='close']"
+]
+# {page}는 다음 페이지 번호로 치환
+NEXT_SELECTORS = [
+    "a:has-text('{page}')",
+    ".pagination a:has-text('{page}')",
+    "a[href*='page={page}']",
+    "a:has-text('다음')",
+    "a:has-text('>')",
+    ".next:not(.disabled)"
+]
+
+# 일괄 펼치기 모드 설정
+ROW_SELECTOR = 'table.act_table tbody tr'
+EXPAND_QUIET_MS = 800      # 마지막 DOM 변경 후 이 시간 동안 변화가 없으면 펼치기 완료로 판단
+EXPAND_MAX_WAIT_MS = 15000  # 일괄 펼치기 최대 대기 시간
+
+POPUP_SETTLE = 0.5  # 팝업 닫은 뒤 화면 안정화 대기 (초) - 요청 간격이 아니므로 속도 제어와 무관
+
 logger = logging.getLogger(__name__)
 
+# 토글 함수 탐색: 첫 번째 메인 행의 토글 요소와 onclick 함수명 확인
+# (check_toggle_button과 같이 toggle/expand/fold 호출만 토글로 인정 - 상세 팝업 여는 onclick 제외)
+DISCOVER_TOGGLE_SCRIPT = """
+(rowSelector) => {
+    const TOGGLE = /toggle|expand|fold/i;
+    const rows = Array.from(document.querySelectorAll(rowSelector));
+    const main = rows.find(row => /\\d/.test(row.className || ''));
+    if (!main) return null;
+    const td = main.querySelector('td');
+    if (!td) return null;
+    const candidates = [td, ...td.querySelectorAll('[onclick]')];
+    const handler = candidates.find(el => TOGGLE.test(el.getAttribute('onclick') || ''));
+    const target = handler && handler !== td ? 'td:first-child [onclick]' : 'td:first-child';
+    const onclick = handler ? handler.getAttribute('onclick') : '';
+    const match = onclick.match(/^\\s*([\\w$.]+)\\s*\\(/);
+    return {target: target, onclick: onclick, functionName: match ? match[1] : null};
+}
+"""
+
+# 일괄 펼치기: 모든 메인 행 토글 → DOM 변경이 멈출 때까지 대기 → 전체 행 직렬화 (왕복 1회)
+EXPAND_ALL_SCRIPT = """
+async ([rowSelector, target, functionName, quietMs, maxMs]) => {
+    const TOGGLE = /toggle|expand|fold/i;
+    // onclick이 있으면 탐색한 토글 함수(없으면 toggle/expand/fold) 호출인 요소만, 없으면 + 표시 요소만
+    const isToggle = el => {
+        const onclick = el.getAttribute('onclick') || '';
+        if (onclick) {
+            const match = onclick.match(/^\\s*([\\w$.]+)\\s*\\(/);
+            return functionName ? !!match && match[1] === functionName : TOGGLE.test(onclick);
+        }
+        const text = (el.textContent || '').trim();
+        return text.includes('+') || text.includes('＋');
+    };
+    const rows = Array.from(document.querySelectorAll(rowSelector));
+    const body = rows.length ? rows[0].parentElement : document.body;
+
+    const settled = new Promise(resolve => {
+        const start = performance.now();
+        let timer = null;
+        const finish = () => { observer.disconnect(); resolve(); };
+        const observer = new MutationObserver(() => {
+            clearTimeout(timer);
+            if (performance.now() - start > maxMs) return finish();
+            timer = setTimeout(finish, quietMs);
+        });
+        observer.observe(body, {childList: true, subtree: true});
+        timer = setTimeout(finish, quietMs);
+    });
+
+    let toggled = 0;
+    for (const row of rows) {
+        if (!/\\d/.test(row.className || '')) continue;
+        const el = Array.from(row.querySelectorAll(target)).find(isToggle);
+        if (!el) continue;
+        el.click();
+        toggled++;
+    }
+
+    await settled;
+
+    const serialized = Array.from(document.querySelectorAll(rowSelector)).map(row => ({
+        cls: row.className || '',
+        cells: Array.from(row.querySelectorAll('td')).map(td => (td.textContent || '').trim())
+    }));
+    const table = document.querySelector(rowSelector.split(' ')[0]);
+    return {toggled: toggled, rows: serialized, html: table ? table.outerHTML : ''};
+}
+"""
+
 class KOICDScraper:
-    def __init__(self):
+    def __init__(self, config=None, **options):
+        # KOICDScraper(expand_all=True)처럼 설정 항목을 직접 넘겨도 됨
+        self.config = config or ScraperConfig(**options)
+        self.expand_all = self.config.expand_all
+        self.rate = RateController(max_rate=self.config.max_rate)
+        self.toggle_info = None
+        self.selectors = SelectorCache()
+        # 파일/스레드를 여는 자원은 run()에서 생성 (생성자는 부작용 없음)
+        self.http_cache = None
+        self.writer = None
+        self.archive = None
         self.all_data = []
         self.failed_items = []
         self.current_page = 1
         self.total_processed = 0
-        self.browser = None
+        self.pool = None
         self.page = None
 
+    def open_resources(self):
+        """출력 폴더, 저장 스레드, 원본 아카이브, HTTP 캐시 준비"""
+        self.config.prepare()
+        if self.writer is None:
+            self.writer = AsyncWriter()
+        if self.archive is None:
+            self.archive = HtmlArchive(self.config.archive_dir, run_id=datetime.now().strftime("%Y%m%d_%H%M%S"))
+        if self.config.http_cache and self.http_cache is None:
+            self.http_cache = HttpCache(self.config.http_cache_dir, url_prefix=self.config.site_prefix)
+
+    def load_saved_pages(self):
+        """이전 실행의 페이지별 JSON을 불러와 누적 - 마지막으로 저장된 페이지 번호 반환 (없으면 0)"""
+        pages = {}
+        if os.path.isdir(self.config.json_dir):
+            for name in os.listdir(self.config.json_dir):
+                if name.startswith("page_") and name.endswith("_hierarchical.json"):
+                    number = name[len("page_"):-len("_hierarchical.json")]
+                    if number.isdigit():
+                        pages[int(number)] = os.path.join(self.config.json_dir, name)
+        
+        for page_num in sorted(pages):
+            with open(pages[page_num], "r", encoding="utf-8") as f:
+                self.all_data.extend(json.load(f))
+        
+        last_page = max(pages, default=0)
+        logger.info(f"저장된 페이지 {len(pages)}개 로드: {len(self.all_data)}개 항목 (마지막 페이지 {last_page})")
+        return last_page
+
     async def initialize_browser(self):
         """브라우저 초기화"""
-        playwright = await async_playwright().start()
-        self.browser = await playwright.chromium.launch(
-            headless=False,
-            slow_mo=100  # 디버깅용 느린 실행
+        self.pool = BrowserPool(
+            setup=self.setup_page,
+            headless=self.config.headless,
+            slow_mo=self.config.slow_mo,
+            stuck_selector=".div_table_style"
         )
-        self.page = await self.browser.new_page()
+        self.page = await self.pool.start()
+        
+        # 페이지 이동
+        logger.info(f"페이지 접근: {self.config.base_url}")
+        await self.page.goto(self.config.base_url)
+        await self.wait_for_page_load()
+
+    async def setup_page(self, page):
+        """새 페이지 공통 설정 (컨텍스트 재시작 시에도 호출)"""
+        # 목록/상세 요청을 HTTP 캐시 경유로 처리 (조건부 요청)
+        if self.http_cache:
+            await self.http_cache.install(page)
+        
+        # 서버 과부하 응답(429/5xx)은 즉시 속도 제어기에 반영
+        page.on("response", self.on_response)
         
         # 뷰포트 설정
-        await self.page.set_viewport_size({"width": 1920, "height": 1080})
+        await page.set_viewport_size({"width": 1920, "height": 1080})
         
         # 타임아웃 설정
-        self.page.set_default_timeout(30000)
+        page.set_default_timeout(30000)
+
+    def on_response(self, response):
+        """응답 상태 감시 (속도 제어용)"""
+        if response.url.startswith(self.config.site_prefix) and (response.status == 429 or response.status >= 500):
+            logger.warning(f"⚠️ 서버 오류 응답 {response.status}: {response.url}")
+            self.rate.record(ok=False)
+
+    async def resume_current_page(self, page):
+        """컨텍스트 재시작 후 처리 중이던 페이지로 다시 이동"""
+        self.page = page
+        target_page = self.current_page
         
-        # 페이지 이동
-        logger.info(f"페이지 접근: {BASE_URL}")
-        await self.page.goto(BASE_URL)
+        logger.info(f"페이지 {target_page}로 복귀 중...")
+        await self.page.goto(self.config.base_url)
         await self.wait_for_page_load()
+        
+        self.current_page = 1
+        while self.current_page < target_page:
+            if not await self.navigate_to_next_page():
+                raise RuntimeError(f"페이지 {target_page} 복귀 실패 (페이지 {self.current_page}에서 중단)")
+        
+        logger.info(f"페이지 {target_page} 복귀 완료")
 
     async def wait_for_page_load(self):
         """페이지 로딩 완료 대기"""
@@ -110,7 +273,7 @@ class KOICDScraper:
             logger.error(f"기본 정보 추출 오류: {e}")
             return None
 
-    async def extract_popup_details(self, row):
+    async def extract_popup_details(self, row, code=None):
         """팝업에서 상세 정보 추출"""
         detail_data = {}
         
@@ -134,30 +297,22 @@ class KOICDScraper:
             # 팝업 로딩 대기
             await asyncio.sleep(1)
             
-            # 팝업 대기 (여러 셀렉터 시도)
-            popup_selectors = [
-                ".div_table_style",
-                ".popup",
-                ".modal",
-                "div[style*='display: block']",
-                "table[class*='popup']"
-            ]
+            # 팝업 대기 (마지막으로 성공한 셀렉터 우선)
+            async def find_popup(selector):
+                popup = await self.page.wait_for_selector(selector, timeout=5000)
+                if popup and await popup.is_visible():
+                    return popup
+                return None
             
-            popup = None
-            for selector in popup_selectors:
-                try:
-                    popup = await self.page.wait_for_selector(selector, timeout=5000)
-                    if popup and await popup.is_visible():
-                        logger.debug(f"팝업 발견: {selector}")
-                        break
-                except:
-                    continue
+            selector, popup = await self.selectors.resolve("popup", POPUP_SELECTORS, find_popup)
             
             if not popup:
                 logger.warning("팝업을 찾을 수 없음")
                 return detail_data
             
-            # 팝업 내용 추출
+            # 원본 팝업 HTML 보관 후 내용 추출
+            await self.writer.call("archive", self.archive.put, await popup.evaluate("el => el.outerHTML"),
+                                   KIND_POPUP, self.current_page, code)
             detail_data = await self.extract_popup_content(popup)
             
             # 팝업 닫기
@@ -234,30 +389,23 @@ class KOICDScraper:
     async def close_popup(self, popup_element=None):
         """팝업 닫기"""
         try:
-            # 닫기 버튼 찾기
-            close_selectors = [
-                "button:has-text('닫기')",
-                "button:has-text('Close')",
-                "button:has-text('×')",
-                ".close",
-                ".popup-close",
-                "button[onclick*='close']"
-            ]
-            
-            for selector in close_selectors:
-                try:
-                    close_btn = await self.page.query_selector(selector)
-                    if close_btn and await close_btn.is_visible():
-                        await close_btn.click()
-                        await asyncio.sleep(0.5)
-                        logger.debug(f"팝업 닫기 성공: {selector}")
-                        return True
-                except:
-                    continue
+            # 닫기 버튼 찾기 (마지막으로 성공한 셀렉터 우선)
+            async def click_close(selector):
+                close_btn = await self.page.query_selector(selector)
+                if close_btn and await close_btn.is_visible():
+                    await close_btn.click()
+                    return True
+                return False
+            
+            selector, closed = await self.selectors.resolve("close", CLOSE_SELECTORS, click_close)
+            if closed:
+                await asyncio.sleep(POPUP_SETTLE)
+                logger.debug(f"팝업 닫기 성공: {selector}")
+                return True
             
             # ESC 키로 닫기 시도
             await self.page.keyboard.press('Escape')
-            await asyncio.sleep(0.5)
+            await asyncio.sleep(POPUP_SETTLE)
             
             logger.debug("ESC로 팝업 닫기 시도")
             return True
@@ -504,6 +652,15 @@ class KOICDScraper:
 
     async def process_single_row(self, row, parent_code=None, hierarchy_level=0):
         """단일 행 처리 (메인 행 또는 하위 행)"""
+        start = time.monotonic()
+        async with self.pool.measure("row"):
+            result = await self._process_single_row(row, parent_code, hierarchy_level)
+        
+        # 행 처리 시간(팝업 왕복 포함)과 성공 여부로 요청 속도 조절
+        self.rate.record(time.monotonic() - start, ok=result is not None)
+        return result
+
+    async def _process_single_row(self, row, parent_code, hierarchy_level):
         try:
             # 기본 정보 추출
             basic_info = await self.extract_row_basic_info(row)
@@ -513,8 +670,16 @@ class KOICDScraper:
             current_code = basic_info['수가코드']
             logger.info(f"{'  ' * hierarchy_level}{'└─' if hierarchy_level > 0 else ''}수가코드: {current_code}")
             
+            # 원본 행 HTML 보관 (재파싱용)
+            await self.writer.call(
+                "archive", self.archive.put,
+                await row.evaluate("el => el.outerHTML"), KIND_ROW, self.current_page, current_code,
+                parent_code=parent_code or current_code, hierarchy_level=hierarchy_level,
+                수집일시=datetime.now().isoformat()
+            )
+            
             # 상세 정보 추출
-            detail_info = await self.extract_popup_details(row)
+            detail_info = await self.extract_popup_details(row, current_code)
             
             # 계층 정보 추가
             hierarchical_data = {
@@ -548,6 +713,11 @@ class KOICDScraper:
             main_rows = await self.page.query_selector_all('table.act_table tbody tr')
             main_rows = [row for row in main_rows if await self.is_main_row(row)]
             
+            # 원본 목록 표 보관 (재파싱용)
+            listing_html = await self.page.eval_on_selector('table.act_table', "el => el.outerHTML")
+            await self.writer.call("archive", self.archive.put, listing_html, KIND_LISTING, self.current_page,
+                                   수집일시=datetime.now().isoformat())
+            
             logger.info(f"페이지 {self.current_page}: {len(main_rows)}개 메인 행 발견")
             
             for i, main_row in enumerate(main_rows):
@@ -597,8 +767,8 @@ class KOICDScraper:
                                         page_data.append(child_data)
                                         successful_children += 1
                                         
-                                        # 하위 행 간 대기
-                                        await asyncio.sleep(0.3)
+                                        # 하위 행 간 대기 (속도 제어기)
+                                        await self.rate.pace("child")
                                 
                                 logger.info(f"  {parent_code}: ✅ 하위 행 처리 완료 ({successful_children}/{len(child_rows)} 성공)")
                             else:
@@ -606,14 +776,14 @@ class KOICDScraper:
                             
                             # 하위 행 다시 접기 (선택사항)
                             await self.collapse_child_rows(toggle_element)
-                            await asyncio.sleep(0.5)
+                            await self.rate.pace("row")
                         else:
                             logger.warning(f"  {parent_code}: ❌ 하위 행 펼치기 실패")
                     else:
                         logger.info(f"  {parent_code}: 하위 항목 없음 (토글 버튼 미발견)")
                     
-                    # 메인 행 간 대기
-                    await asyncio.sleep(0.5)
+                    # 메인 행 간 대기 (속도 제어기)
+                    await self.rate.pace("row")
                     
                 except Exception as e:
                     logger.error(f"행 {i+1} 처리 실패: {e}")
@@ -627,21 +797,7 @@ class KOICDScraper:
                     continue
             
             # 페이지별 JSON 저장
-            if page_data:
-                json_path = os.path.join(JSON_DIR, f"page_{self.current_page}_hierarchical.json")
-                with open(json_path, "w", encoding="utf-8") as f:
-                    json.dump(page_data, f, ensure_ascii=False, indent=2)
-                
-                self.all_data.extend(page_data)
-                
-                # 통계 출력
-                main_count = len([d for d in page_data if d['hierarchy_level'] == 0])
-                child_count = len([d for d in page_data if d['hierarchy_level'] == 1])
-                
-                logger.info(f"페이지 {self.current_page} 완료: 메인 {main_count}개, 하위 {child_count}개 (총 {len(page_data)}개)")
-                
-                # 중간 저장
-                self.save_to_csv()
+            await self.save_page_data(page_data)
             
             return len(page_data) > 0
             
@@ -649,6 +805,60 @@ class KOICDScraper:
             logger.error(f"페이지 {self.current_page} 처리 중 오류: {e}")
             return False
 
+    async def save_page_data(self, page_data):
+        """페이지 결과 JSON 저장 및 누적 (중간 CSV 저장 포함) - 실제 쓰기는 저장 스레드에서 수행"""
+        if not page_data:
+            return
+        
+        json_path = os.path.join(self.config.json_dir, f"page_{self.current_page}_hierarchical.json")
+        await self.writer.write_json(json_path, page_data)
+        
+        self.all_data.extend(page_data)
+        
+        # 통계 출력
+        main_count = len([d for d in page_data if d['hierarchy_level'] == 0])
+        child_count = len([d for d in page_data if d['hierarchy_level'] == 1])
+        
+        logger.info(f"페이지 {self.current_page} 완료: 메인 {main_count}개, 하위 {child_count}개 (총 {len(page_data)}개, 저장 대기 {self.writer.depth()}건)")
+        
+        # 중간 저장
+        await self.save_to_csv()
+
+    async def discover_toggle_function(self):
+        """토글 요소/함수 탐색 (스크래퍼당 한 번만 수행)"""
+        if self.toggle_info is None:
+            self.toggle_info = await self.page.evaluate(DISCOVER_TOGGLE_SCRIPT, ROW_SELECTOR) or {
+                "target": "td:first-child", "onclick": "", "functionName": None
+            }
+            logger.info(f"토글 요소 탐색: {self.toggle_info['target']} (함수: {self.toggle_info['functionName'] or '없음 - click 이벤트 사용'})")
+        return self.toggle_info
+
+    async def process_current_page_expanded(self):
+        """일괄 펼치기 모드: 모든 토글을 한 번에 실행하고 펼쳐진 표를 한 번에 수집"""
+        logger.info(f"페이지 {self.current_page} 일괄 펼치기 처리 시작")
+        
+        try:
+            toggle_info = await self.discover_toggle_function()
+            
+            async with self.pool.measure("page"):
+                result = await self.page.evaluate(
+                    EXPAND_ALL_SCRIPT,
+                    [ROW_SELECTOR, toggle_info['target'], toggle_info['functionName'], EXPAND_QUIET_MS, EXPAND_MAX_WAIT_MS]
+                )
+            
+            await self.writer.call("archive", self.archive.put, result['html'], KIND_LISTING, self.current_page,
+                                   수집일시=datetime.now().isoformat())
+            page_data = rows_to_records(result['rows'], self.current_page)
+            self.total_processed += len(page_data)
+            logger.info(f"페이지 {self.current_page}: 토글 {result['toggled']}개 실행, 전체 {len(result['rows'])}개 행 직렬화")
+            
+            await self.save_page_data(page_data)
+            return len(page_data) > 0
+            
+        except Exception as e:
+            logger.error(f"페이지 {self.current_page} 일괄 펼치기 처리 중 오류: {e}")
+            return False
+
     async def is_main_row(self, row):
         """메인 행인지 확인 (숫자 클래스를 가진 행)"""
         try:
@@ -662,34 +872,25 @@ class KOICDScraper:
         try:
             next_page_num = self.current_page + 1
             
-            # 다음 페이지 링크 찾기
-            next_selectors = [
-                f"a:has-text('{next_page_num}')",
-                f".pagination a:has-text('{next_page_num}')",
-                f"a[href*='page={next_page_num}']",
-                "a:has-text('다음')",
-                "a:has-text('>')",
-                ".next:not(.disabled)"
-            ]
-            
-            for selector in next_selectors:
-                try:
-                    next_btn = await self.page.query_selector(selector)
-                    if next_btn and await next_btn.is_visible():
-                        logger.info(f"다음 페이지 버튼 클릭: {selector}")
-                        await next_btn.scroll_into_view_if_needed()
-                        await next_btn.click()
-                        
-                        # 페이지 로딩 대기
-                        await self.wait_for_page_load()
-                        self.current_page += 1
-                        
-                        logger.info(f"페이지 {self.current_page}로 이동 완료")
-                        return True
-                        
-                except Exception as e:
-                    logger.debug(f"셀렉터 {selector} 시도 실패: {e}")
-                    continue
+            # 다음 페이지 링크 찾기 (캐시 키는 페이지 번호 치환 전 템플릿)
+            async def click_next(template):
+                selector = template.format(page=next_page_num)
+                next_btn = await self.page.query_selector(selector)
+                if next_btn and await next_btn.is_visible():
+                    logger.info(f"다음 페이지 버튼 클릭: {selector}")
+                    await next_btn.scroll_into_view_if_needed()
+                    await next_btn.click()
+                    return True
+                return False
+            
+            template, clicked = await self.selectors.resolve("next", NEXT_SELECTORS, click_next)
+            if clicked:
+                # 페이지 로딩 대기
+                await self.wait_for_page_load()
+                self.current_page += 1
+                
+                logger.info(f"페이지 {self.current_page}로 이동 완료")
+                return True
             
             logger.info("다음 페이지 버튼을 찾을 수 없음 - 마지막 페이지로 판단")
             return False
@@ -698,48 +899,19 @@ class KOICDScraper:
             logger.error(f"페이지 이동 오류: {e}")
             return False
 
-    def save_to_csv(self):
-        """CSV 파일로 저장 (계층구조 정보 포함)"""
+    async def save_to_csv(self, checkpoint=False):
+        """CSV 파일로 저장 (계층구조 정보 포함) - 실제 쓰기는 저장 스레드에서 수행"""
         if not self.all_data:
             return
         
         try:
-            # 모든 키 수집
-            all_keys = set()
-            for item in self.all_data:
-                all_keys.update(item.keys())
-            
-            # 계층구조 우선 컬럼 추가
-            priority_cols = [
-                "parent_code", "child_code", "hierarchy_level", "is_parent",
-                "수가코드", "행위명_기본", "분류코드", "분류단계", 
-                "행위명(한글)", "행위명(영문)", "산정명",
-                "수술여부", "상대가치점수", "본인부담률", "급여여부",
-                "페이지", "수집일시"
-            ]
-            
-            ordered_cols = []
-            for col in priority_cols:
-                if col in all_keys:
-                    ordered_cols.append(col)
-                    all_keys.remove(col)
-            
-            ordered_cols.extend(sorted(all_keys))
-            
-            # CSV 쓰기
-            with open(CSV_FILE, "w", newline="", encoding="utf-8-sig") as f:
-                writer = csv.DictWriter(f, fieldnames=ordered_cols)
-                writer.writeheader()
-                
-                for item in self.all_data:
-                    row_data = {col: item.get(col, "") for col in ordered_cols}
-                    writer.writerow(row_data)
+            await self.writer.write_csv(self.config.csv_file, self.all_data, checkpoint=checkpoint)
             
             # 통계 정보 출력
             main_items = len([d for d in self.all_data if d.get('hierarchy_level') == 0])
             child_items = len([d for d in self.all_data if d.get('hierarchy_level') == 1])
             
-            logger.info(f"CSV 저장 완료: 총 {len(self.all_data)}개 항목 (메인 {main_items}개, 하위 {child_items}개)")
+            logger.info(f"CSV 저장 요청: 총 {len(self.all_data)}개 항목 (메인 {main_items}개, 하위 {child_items}개)")
             
         except Exception as e:
             logger.error(f"CSV 저장 오류: {e}")
@@ -750,7 +922,7 @@ class KOICDScraper:
             return
         
         try:
-            with open(FAILED_FILE, "w", encoding="utf-8") as f:
+            with open(self.config.failed_file, "w", encoding="utf-8") as f:
                 json.dump(self.failed_items, f, ensure_ascii=False, indent=2)
             
             logger.info(f"실패 항목 저장: {len(self.failed_items)}개")
@@ -758,32 +930,140 @@ class KOICDScraper:
         except Exception as e:
             logger.error(f"실패 항목 저장 오류: {e}")
 
-    async def run(self):
-        """메인 스크래핑 실행"""
-        start_time = datetime.now()
-        logger.info("KOICD 스크래핑 시작")
+    async def process_page(self):
+        """현재 페이지 처리 (수집 모드에 따라)"""
+        if self.expand_all:
+            return await self.process_current_page_expanded()
+        return await self.process_current_page()
+
+    async def process_page_with_retry(self):
+        """상태 확인 후 현재 페이지 처리 - 실패 시 새 컨텍스트에서 한 번 재시도"""
+        # 메모리/지연 임계값 초과 시 컨텍스트 재시작 후 현재 페이지로 복귀
+        await self.pool.ensure_healthy(self.resume_current_page)
         
+        success = await self.process_page()
+        if not success:
+            await self.pool.recycle(f"페이지 {self.current_page} 처리 실패", self.resume_current_page)
+            success = await self.process_page()
+        return success
+
+    async def crawl_all_pages(self, max_pages=None):
+        """현재 페이지부터 마지막 페이지(또는 max_pages개)까지 순서대로 처리"""
+        processed = 0
+        while True:
+            if not await self.process_page_with_retry():
+                logger.warning(f"페이지 {self.current_page} 처리 실패")
+                break
+            
+            processed += 1
+            if max_pages and processed >= max_pages:
+                logger.info(f"최대 페이지 수({max_pages}) 도달")
+                break
+            
+            # 다음 페이지로 이동
+            if not await self.navigate_to_next_page():
+                logger.info("모든 페이지 처리 완료")
+                break
+            
+            # 페이지 간 대기 (속도 제어기)
+            await self.rate.pace("page")
+
+    async def goto_page(self, page_num):
+        """지정 페이지로 이동 (뒤쪽 페이지면 처음부터 다시 이동)"""
+        if page_num < self.current_page:
+            self.current_page = page_num
+            await self.resume_current_page(self.page)
+        while self.current_page < page_num:
+            if not await self.navigate_to_next_page():
+                return False
+        return True
+
+    async def crawl_page_range(self, start, end):
+        """페이지 범위 작업 단위 처리 - 수집한 레코드 반환 (실패하면 이 범위에서 쌓은 레코드는 되돌림)"""
+        first = len(self.all_data)
         try:
-            await self.initialize_browser()
-            
-            # 모든 페이지 처리
+            if not await self.goto_page(start):
+                raise RuntimeError(f"페이지 {start}로 이동 실패")
+            
+            for page_num in range(start, end + 1):
+                if not await self.process_page_with_retry():
+                    raise RuntimeError(f"페이지 {page_num} 처리 실패")
+                if page_num < end:
+                    if not await self.navigate_to_next_page():
+                        break  # 마지막 페이지 도달
+                    await self.rate.pace("page")
+        except BaseException:
+            # 재시도 시 같은 페이지가 중복으로 쌓이지 않도록
+            del self.all_data[first:]
+            raise
+        
+        return self.all_data[first:]
+
+    async def crawl_from_queue(self, queue_url, worker_id):
+        """공유 작업 큐에서 페이지 범위를 임대받아 처리 (여러 작업자가 겹치지 않게 분할 수집)"""
+        queue = open_queue(queue_url)
+        logger.info(f"작업자 {worker_id}: 큐 {queue_url} 연결")
+        
+        async def keep_lease(unit_id, token):
             while True:
-                success = await self.process_current_page()
-                
-                if not success:
-                    logger.warning(f"페이지 {self.current_page} 처리 실패")
-                    break
-                
-                # 다음 페이지로 이동
-                if not await self.navigate_to_next_page():
-                    logger.info("모든 페이지 처리 완료")
+                await asyncio.sleep(LEASE_TTL / 3)
+                if not await asyncio.to_thread(queue.heartbeat, unit_id, token):
+                    logger.warning(f"⚠️ 작업 단위 {unit_id} 임대 상실 - 다른 작업자가 가져갔을 수 있음")
+                    return
+        
+        try:
+            while True:
+                unit = await asyncio.to_thread(queue.lease, worker_id, [KIND_PAGES])
+                if unit is None:
+                    logger.info("남은 작업 단위 없음")
                     break
                 
-                # 페이지 간 대기
-                await asyncio.sleep(2)
+                unit_id, kind, payload, token = unit
+                logger.info(f"작업 단위 임대: {unit_id} (페이지 {payload['start']}~{payload['end']})")
+                heartbeat = asyncio.create_task(keep_lease(unit_id, token))
+                try:
+                    records = await self.crawl_page_range(payload["start"], payload["end"])
+                    committed = await asyncio.to_thread(queue.commit, unit_id, token, {
+                        "worker": worker_id, "pages": [payload["start"], payload["end"]], "records": records
+                    })
+                    if committed:
+                        logger.info(f"✅ 작업 단위 커밋: {unit_id} ({len(records)}개 항목)")
+                    else:
+                        logger.info(f"작업 단위 {unit_id}는 이미 커밋되었거나 임대를 잃음 - 결과 무시")
+                except Exception as e:
+                    logger.error(f"❌ 작업 단위 {unit_id} 실패: {e}")
+                    await asyncio.to_thread(queue.fail, unit_id, token, e)
+                finally:
+                    heartbeat.cancel()
+        finally:
+            queue.close()
+
+    async def run(self, queue_url=None, worker_id=None):
+        """메인 스크래핑 실행 (인자를 생략하면 설정의 큐/작업자 사용)"""
+        config = self.config
+        queue_url = queue_url or config.queue
+        worker_id = worker_id or config.worker_id
+        start_time = datetime.now()
+        logger.info(f"KOICD 스크래핑 시작 (출력: {config.base_dir})")
+        
+        # Playwright 호출 계측은 설정한 경우에만 (계측 모듈이 Playwright를 불러옴)
+        profiler = PlaywrightProfiler().install() if config.profile else None
+        
+        try:
+            self.open_resources()
+            self.selectors.load(config.selector_cache_file)
+            await self.initialize_browser()
+            
+            # 모든 페이지 처리 (작업 큐가 있으면 임대받은 범위만)
+            if queue_url:
+                await self.crawl_from_queue(queue_url, worker_id or f"{socket.gethostname()}-{os.getpid()}")
+            elif await self.goto_page(config.start_page):
+                await self.crawl_all_pages(config.max_pages)
+            else:
+                logger.error(f"시작 페이지 {config.start_page}로 이동 실패")
             
-            # 최종 저장
-            self.save_to_csv()
+            # 최종 저장 (체크포인트 - fsync)
+            await self.save_to_csv(checkpoint=True)
             self.save_failed_items()
             
             # 결과 요약
@@ -808,20 +1088,54 @@ class KOICDScraper:
             if len(self.all_data) + len(self.failed_items) > 0:
                 success_rate = len(self.all_data)/(len(self.all_data)+len(self.failed_items))*100
                 logger.info(f"✅ 성공률: {success_rate:.1f}%")
-            logger.info(f"💾 저장 위치: {CSV_FILE}")
+            logger.info(f"💾 저장 위치: {self.config.csv_file}")
+            self.rate.log_summary()
+            if self.http_cache:
+                self.http_cache.log_summary()
+            logger.info(f"🎯 셀렉터 캐시 통계:")
+            self.selectors.log_summary()
             logger.info("=" * 60)
             
+            self.selectors.save(self.config.selector_cache_file)
+            
         except Exception as e:
             logger.error(f"스크래핑 중 치명적 오류: {e}")
             
         finally:
-            if self.browser:
-                await self.browser.close()
+            if self.writer:
+                await self.writer.close()
+                self.writer.log_summary()
+            if self.archive:
+                # 아카이브 쓰기는 저장 스레드에서 하므로 저장 스레드 종료 후 집계
+                logger.info(f"🗄️  원본 아카이브: {self.archive.stored}개 저장, {self.archive.deduplicated}개 중복 생략 ({self.archive.codec})")
+            if self.http_cache:
+                await asyncio.to_thread(self.http_cache.save)
+            if self.pool:
+                self.pool.log_summary()
+                await self.pool.close()
+            if profiler:
+                profiler.uninstall()
+                profiler.dump(config.profile)
 
 async def main():
     """메인 함수"""
-    scraper = KOICDScraper()
-    await scraper.run()
+    parser = argparse.ArgumentParser(description="KOICD 건강보험 수가코드 스크래퍼")
+    parser.add_argument("--expand-all", action="store_true",
+                        help="페이지별 토글 일괄 펼치기 후 한 번에 수집 (상세 팝업 제외)")
+    parser.add_argument("--max-rate", type=float, default=MAX_RATE,
+                        help=f"초당 최대 요청 속도 상한 (기본: {MAX_RATE})")
+    parser.add_argument("--http-cache", action="store_true",
+                        help="목록/상세 응답을 ETag/Last-Modified 조건부 요청 캐시로 재사용")
+    parser.add_argument("--queue", help="공유 작업 큐 URL (예: sqlite:///koicd_scraping_results/work_queue.db) - 지정 시 임대받은 페이지 범위만 수집")
+    parser.add_argument("--worker-id", help="작업자 식별자 (기본: 호스트명-PID)")
+    parser.add_argument("--profile", nargs="?", const=PROFILE_FILE,
+                        help=f"Playwright 호출 왕복 수/시간을 메서드별로 계측해 folded stack 저장 (기본: {PROFILE_FILE})")
+    args = parser.parse_args()
+    
+    config = ScraperConfig(expand_all=args.expand_all, http_cache=args.http_cache, max_rate=args.max_rate,
+                           queue=args.queue, worker_id=args.worker_id, profile=args.profile)
+    setup_logging(config.log_file)
+    await KOICDScraper(config).run()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,351 @@
+import os
+import re
+import csv
+import json
+import glob
+import argparse
+import logging
+
+# 설정
+BASE_DIR = os.path.abspath("koicd_scraping_results")
+JSON_DIR = os.path.join(BASE_DIR, "json_pages")
+HIERARCHY_JSON = os.path.join(BASE_DIR, "koicd_hierarchy.json")
+HIERARCHY_CSV = os.path.join(BASE_DIR, "koicd_hierarchy.csv")
+
+BREADCRUMB_SEP = ">"
+
+# 분류번호: 장(가) + 번호(3-2) + 세목 글자(라) + 괄호 세분(2)(가) + 주석(주6)
+CLASS_PATTERN = re.compile(r"^([가-힣])(\d+(?:-\d+)*)([가-힣]*?)((?:\([^)]+\))*)(주\d*)?$")
+# '응급의료(거110가)' 처럼 명칭 뒤 괄호 안에 분류번호가 있는 형태
+WRAPPED_CLASS_PATTERN = re.compile(r"^[^(]+\(([가-힣]\d[^)]*)\)$")
+# 행위명 끝에 붙은 분류단계 (예: '...치과의치과 급여>기본진료료>진찰료')
+GLUED_BREADCRUMB_PATTERN = re.compile(r"(의치과|의과|치과|한방)\s*(급여|비급여|100/100)" + BREADCRUMB_SEP)
+
+logger = logging.getLogger(__name__)
+
+
+def classification_levels(class_code):
+    """분류번호를 상위 → 하위 단계 리스트로 분해
+
+    '가1가(5)' → ['가1', '가1가', '가1가(5)'], '응급의료(거110가)' → ['거110', '거110가'],
+    형식이 다른 값('의료급여', '교통비')은 한 단계로 취급
+    """
+    if not class_code:
+        return []
+    class_code = class_code.strip()
+
+    wrapped = WRAPPED_CLASS_PATTERN.match(class_code)
+    if wrapped:
+        class_code = wrapped.group(1)
+
+    match = CLASS_PATTERN.match(class_code)
+    if not match:
+        return [class_code]
+
+    chapter, number, letters, brackets, note = match.groups()
+    levels = [chapter + number]
+    for letter in letters:
+        levels.append(levels[-1] + letter)
+    for bracket in re.findall(r"\([^)]+\)", brackets):
+        levels.append(levels[-1] + bracket)
+    if note:
+        levels.append(levels[-1] + note)
+    return levels
+
+
+def is_class_code(value):
+    """분류번호 형식인지 여부 (분류코드/분류단계 컬럼이 뒤바뀐 데이터 대응)"""
+    return bool(value) and BREADCRUMB_SEP not in value and (
+        bool(CLASS_PATTERN.match(value)) or bool(WRAPPED_CLASS_PATTERN.match(value))
+    )
+
+
+def split_name_breadcrumb(name, known_breadcrumbs=()):
+    """'행위명_기본'에서 뒤에 붙은 분류단계를 분리 → (행위명, 분류단계)"""
+    if not name:
+        return name, None
+    # 수집된 분류단계 중 가장 긴 것부터 접미사 일치 확인
+    for breadcrumb in known_breadcrumbs:
+        if name.endswith(breadcrumb) and len(name) > len(breadcrumb):
+            return name[:-len(breadcrumb)].strip(), breadcrumb
+    match = GLUED_BREADCRUMB_PATTERN.search(name)
+    if match:
+        return name[:match.start()].strip(), name[match.start():].strip()
+    return name, None
+
+
+class HierarchyTree:
+    """분류단계/분류번호/수가코드 노드 트리 - 오일러 투어 구간으로 O(1) 하위 포함 판정"""
+
+    ROOT = "ROOT"
+
+    def __init__(self):
+        self.keys = [self.ROOT]
+        self.labels = ["전체"]
+        self.kinds = ["root"]
+        self.parent = [-1]
+        self.children = [[]]
+        self.index = {self.ROOT: 0}
+        self.tin = []
+        self.tout = []
+        self.depth = []
+        self.order = []
+
+    def add(self, key, label, kind, parent_key=ROOT):
+        """노드 추가 (이미 있으면 기존 번호 반환 - 처음 등록된 부모 유지)"""
+        if key in self.index:
+            return self.index[key]
+        node = len(self.keys)
+        parent = self.index[parent_key]
+        self.keys.append(key)
+        self.labels.append(label)
+        self.kinds.append(kind)
+        self.parent.append(parent)
+        self.children.append([])
+        self.children[parent].append(node)
+        self.index[key] = node
+        self.tin = []  # 구조 변경 → 오일러 투어 재계산 필요
+        return node
+
+    def add_path(self, path):
+        """[(키, 이름, 종류), ...] 경로(상위 → 하위)를 따라 노드 추가 후 마지막 노드 키 반환"""
+        parent_key = self.ROOT
+        for key, label, kind in path:
+            self.add(key, label, kind, parent_key)
+            parent_key = key
+        return parent_key
+
+    def build(self):
+        """반복 DFS로 진입/종료 시각과 깊이 계산"""
+        n = len(self.keys)
+        self.tin, self.tout, self.depth = [0] * n, [0] * n, [0] * n
+        self.order = []
+        stack = [(0, False)]
+        while stack:
+            node, done = stack.pop()
+            if done:
+                self.tout[node] = len(self.order)
+                continue
+            self.tin[node] = len(self.order)
+            self.order.append(node)
+            stack.append((node, True))
+            for child in reversed(self.children[node]):
+                self.depth[child] = self.depth[node] + 1
+                stack.append((child, False))
+        return self
+
+    def _ensure_built(self):
+        if not self.tin:
+            self.build()
+
+    def is_ancestor(self, ancestor_key, node_key):
+        """ancestor가 node의 조상(자기 자신 포함)인지 - O(1)"""
+        self._ensure_built()
+        a, b = self.index[ancestor_key], self.index[node_key]
+        return self.tin[a] <= self.tin[b] < self.tout[a]
+
+    def subtree(self, key, kind=None):
+        """하위 노드 키 목록 (오일러 순서 구간 슬라이스)"""
+        self._ensure_built()
+        node = self.index[key]
+        nodes = self.order[self.tin[node]:self.tout[node]]
+        return [self.keys[i] for i in nodes if kind is None or self.kinds[i] == kind]
+
+    def prefix_sums(self, values):
+        """노드별 값 → 오일러 순서 누적합 (rollup 용)"""
+        self._ensure_built()
+        sums = [0.0]
+        for node in self.order:
+            sums.append(sums[-1] + values.get(self.keys[node], 0.0))
+        return sums
+
+    def rollup(self, key, sums):
+        """노드 하위 전체 합계 - prefix_sums 결과로 O(1)"""
+        node = self.index[key]
+        return sums[self.tout[node]] - sums[self.tin[node]]
+
+    def parent_key(self, key):
+        parent = self.parent[self.index[key]]
+        return self.keys[parent] if parent >= 0 else None
+
+    def ancestors(self, key, kind=None):
+        """조상 노드 키 목록 (가까운 순, 자기 자신 제외)"""
+        result = []
+        node = self.parent[self.index[key]]
+        while node >= 0:
+            if kind is None or self.kinds[node] == kind:
+                result.append(self.keys[node])
+            node = self.parent[node]
+        return result
+
+    def level(self, key):
+        self._ensure_built()
+        return self.depth[self.index[key]]
+
+
+def load_page_records(json_dir=JSON_DIR):
+    """json_pages의 모든 페이지 결과 로드 (기본/계층 두 형식 모두)"""
+    records = []
+    for path in sorted(glob.glob(os.path.join(json_dir, "page_*.json"))):
+        with open(path, "r", encoding="utf-8") as f:
+            records.extend(json.load(f))
+    return records
+
+
+def collect_code_info(records):
+    """수가코드별 분류번호·분류단계·행위명 정리
+
+    상세 팝업 값(분류코드, 분류단계 등)은 팝업의 수가코드 기준,
+    행위명_기본은 표의 행 코드(child_code, 없으면 수가코드) 기준으로 모은다.
+    """
+    breadcrumbs = set()
+    info = {}
+
+    for record in records:
+        class_code, breadcrumb = record.get("분류코드"), record.get("분류단계")
+        # 분류코드/분류단계가 뒤바뀐 경우 보정
+        if breadcrumb and is_class_code(breadcrumb) and not is_class_code(class_code or ""):
+            class_code, breadcrumb = breadcrumb, class_code
+        if breadcrumb and BREADCRUMB_SEP in breadcrumb:
+            breadcrumbs.add(breadcrumb.strip())
+
+        code = record.get("수가코드")
+        if code and class_code:
+            entry = info.setdefault(code, {})
+            entry.setdefault("분류번호", class_code.strip())
+            if breadcrumb:
+                entry.setdefault("분류단계", breadcrumb.strip())
+            if record.get("상대가치점수"):
+                entry.setdefault("상대가치점수", record["상대가치점수"])
+
+    known = sorted(breadcrumbs, key=len, reverse=True)
+    for record in records:
+        row_code = record.get("child_code") or record.get("수가코드")
+        if not row_code:
+            continue
+        name, breadcrumb = split_name_breadcrumb(record.get("행위명_기본"), known)
+        entry = info.setdefault(row_code, {})
+        entry.setdefault("행위명", name)
+        if breadcrumb:
+            entry.setdefault("분류단계", breadcrumb)
+
+    return info
+
+
+def build_hierarchy(records):
+    """페이지 레코드로 전체 트리 구성 → (트리, 수가코드별 정보)"""
+    info = collect_code_info(records)
+    tree = HierarchyTree()
+
+    # 정렬 순서로 순회하며 접두어 스택 유지 - 다른 코드의 접두어인 코드(AA154 → AA1541)를 부모로 사용
+    prefix_stack = []
+    for code in sorted(info):
+        entry = info[code]
+        path = []
+        breadcrumb = entry.get("분류단계")
+        if breadcrumb:
+            parts = [p.strip() for p in breadcrumb.split(BREADCRUMB_SEP)]
+            path += [("cat:" + BREADCRUMB_SEP.join(parts[:i + 1]), parts[i], "category") for i in range(len(parts))]
+        path += [("cls:" + level, level, "class") for level in classification_levels(entry.get("분류번호"))]
+        parent_key = tree.add_path(path)
+
+        while prefix_stack and not code.startswith(prefix_stack[-1]):
+            prefix_stack.pop()
+        if prefix_stack:
+            parent_key = prefix_stack[-1]
+        tree.add(code, entry.get("행위명") or code, "code", parent_key)
+        prefix_stack.append(code)
+
+    return tree.build(), info
+
+
+def annotate_records(records, tree):
+    """레코드에 parent_code/hierarchy_level 채우기 (브라우저 토글 없이 재구성한 값)
+
+    parent_code/hierarchy_level은 스크래퍼와 같은 의미(상위 수가코드 - 최상위 행은 자기 자신,
+    0 = 최상위 행 / 1 = 하위 행)로 채우고, 트리상 부모 노드와 깊이는 parent_node/tree_depth에 따로 둔다.
+    """
+    annotated = []
+    for record in records:
+        code = record.get("child_code") or record.get("수가코드")
+        if code not in tree.index:
+            annotated.append(dict(record))
+            continue
+        code_ancestors = tree.ancestors(code, "code")
+        parent = tree.parent_key(code)
+        annotated.append({
+            **record,
+            "parent_code": code_ancestors[0] if code_ancestors else code,
+            "child_code": code,
+            "hierarchy_level": len(code_ancestors),
+            "is_parent": any(tree.kinds[c] == "code" for c in tree.children[tree.index[code]]),
+            "parent_node": parent if parent != tree.ROOT else None,
+            "tree_depth": tree.level(code),
+        })
+    return annotated
+
+
+def category_rollup(tree, info, key="상대가치점수"):
+    """분류 노드별 하위 수가코드 개수와 값 합계"""
+    counts = tree.prefix_sums({code: 1.0 for code in info if code in tree.index})
+    values = {}
+    for code, entry in info.items():
+        try:
+            values[code] = float(str(entry.get(key, "")).replace(",", ""))
+        except ValueError:
+            continue
+    sums = tree.prefix_sums(values)
+
+    rollup = []
+    for node, node_key in enumerate(tree.keys):
+        if tree.kinds[node] in ("category", "class"):
+            rollup.append({
+                "노드": node_key[4:],
+                "종류": tree.kinds[node],
+                "레벨": tree.depth[node],
+                "수가코드수": int(tree.rollup(node_key, counts)),
+                f"{key}_합계": round(tree.rollup(node_key, sums), 2),
+            })
+    return rollup
+
+
+def main():
+    """오프라인 계층구조 재구성 실행"""
+    parser = argparse.ArgumentParser(description="수집 데이터로 수가코드 계층구조 재구성 (브라우저 불필요)")
+    parser.add_argument("--json-dir", default=JSON_DIR, help="페이지별 JSON 폴더")
+    parser.add_argument("--output-json", default=HIERARCHY_JSON)
+    parser.add_argument("--output-csv", default=HIERARCHY_CSV, help="분류별 rollup CSV")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    records = load_page_records(args.json_dir)
+    tree, info = build_hierarchy(records)
+    code_count = sum(1 for k in tree.kinds if k == "code")
+    logger.info(f"계층구조 재구성: 노드 {len(tree.keys)}개 (수가코드 {code_count}개), 최대 깊이 {max(tree.depth)}")
+
+    nodes = [
+        {
+            "key": key,
+            "label": tree.labels[i],
+            "kind": tree.kinds[i],
+            "parent": tree.keys[tree.parent[i]] if tree.parent[i] >= 0 else None,
+            "level": tree.depth[i],
+        }
+        for i, key in enumerate(tree.keys)
+    ]
+    with open(args.output_json, "w", encoding="utf-8") as f:
+        json.dump({"nodes": nodes, "records": annotate_records(records, tree)}, f, ensure_ascii=False, indent=2)
+    logger.info(f"💾 계층구조 저장: {args.output_json}")
+
+    rollup = category_rollup(tree, info)
+    if rollup:
+        with open(args.output_csv, "w", newline="", encoding="utf-8-sig") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rollup[0]))
+            writer.writeheader()
+            writer.writerows(rollup)
+        logger.info(f"💾 분류별 rollup 저장: {args.output_csv}")
+
+
+if __name__ == "__main__":
+    main()
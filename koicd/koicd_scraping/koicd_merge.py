@@ -0,0 +1,232 @@
+import os
+import csv
+import json
+import glob
+import argparse
+import logging
+
+from koicd_hierarchy import split_name_breadcrumb
+from koicd_records import write_records_csv
+
+# 설정
+BASE_DIR = os.path.abspath("koicd_scraping_results")
+JSON_DIR = os.path.join(BASE_DIR, "json_pages")
+MERGED_JSON = os.path.join(BASE_DIR, "koicd_merged.json")
+MERGED_CSV = os.path.join(BASE_DIR, "koicd_merged.csv")
+FLAGS_JSON = os.path.join(BASE_DIR, "koicd_merge_flags.json")
+
+# 목록 표의 행 자체에서 얻는 값 (나머지는 상세 팝업 값)
+BASIC_KEYS = {"수가코드", "행위명_기본", "페이지", "수집일시", "parent_code", "child_code", "hierarchy_level", "is_parent",
+              "parent_node", "tree_depth"}
+HIERARCHY_KEYS = ("parent_code", "hierarchy_level", "is_parent", "parent_node", "tree_depth")
+
+# 플래그 종류
+FLAG_CONFLICT = "field_conflict"            # 같은 코드의 일관된 레코드끼리 값이 다름
+FLAG_MISATTRIBUTED = "popup_misattribution"  # 팝업 행위명(한글)이 행의 행위명_기본과 다름
+FLAG_REASSIGNED = "detail_reassigned"       # 잘못 붙은 상세 값을 행위명이 일치하는 코드로 이동
+FLAG_UNRESOLVED = "detail_unresolved"       # 상세 값의 주인 코드를 찾지 못해 버림
+
+logger = logging.getLogger(__name__)
+
+
+def name_key(name):
+    """행위명 비교 키 - 뒤에 붙은 분류단계와 공백 제거"""
+    if not name:
+        return ""
+    return "".join(split_name_breadcrumb(name.strip())[0].split())
+
+
+def iter_page_files(json_dir=JSON_DIR, csv_path=None):
+    """모든 페이지 결과를 (출처, 레코드)로 하나씩 반환 - 파일 단위로 읽어 전체를 한 번에 들고 있지 않음"""
+    for path in sorted(glob.glob(os.path.join(json_dir, "page_*.json"))):
+        with open(path, "r", encoding="utf-8") as f:
+            records = json.load(f)
+        name = os.path.basename(path)
+        for i, record in enumerate(records):
+            yield f"{name}#{i}", record
+    if csv_path and os.path.exists(csv_path):
+        with open(csv_path, "r", newline="", encoding="utf-8-sig") as f:
+            for i, record in enumerate(csv.DictReader(f)):
+                yield f"{os.path.basename(csv_path)}#{i}", {k: v for k, v in record.items() if v != ""}
+
+
+class Fact:
+    """레코드에서 분리한 행 정보 또는 상세 정보 한 건"""
+
+    __slots__ = ("code", "values", "collected_at", "source")
+
+    def __init__(self, code, values, collected_at, source):
+        self.code = code
+        self.values = values
+        self.collected_at = collected_at or ""
+        self.source = source
+
+
+class MergeEngine:
+    """페이지 결과 중복 제거 병합 - 수가코드별 가장 최근의 일관된 행/상세 정보 선택 + 충돌/오귀속 플래그
+
+    레코드마다 상수 시간 작업만 하므로 전체 O(레코드 수).
+    """
+
+    def __init__(self):
+        self.basics = {}           # 수가코드 → 가장 최근 행 정보
+        self.basic_names = {}      # 수가코드 → {행위명 키: 출처}
+        self.details = {}          # 수가코드 → [일관된 상세 정보]
+        self.pending = []          # 주인 코드 확인이 필요한 상세 정보
+        self.flags = []
+        self.records_seen = 0
+        self.previous = {}         # 파일별 직전 행 (행위명 키, 코드) - 한 칸 밀림 판정용
+
+    def add(self, source, record):
+        self.records_seen += 1
+        file_name = source.split("#")[0]
+        # _hierarchical 형식은 child_code가 행 코드, 평면 형식은 상세가 있으면 수가코드가 팝업 코드일 수 있음
+        row_code = (record.get("child_code") or "").strip() or None
+        popup_code = (record.get("수가코드") or "").strip() or None
+        collected_at = record.get("수집일시")
+        row_name = name_key(record.get("행위명_기본"))
+
+        detail = {k: v for k, v in record.items() if k not in BASIC_KEYS and v not in (None, "")}
+        detail_name = "".join((detail.get("행위명(한글)") or "").split())
+        consistent = not detail or not detail_name or detail_name == row_name
+
+        # 행 정보: 행 코드가 확실한 경우(계층 형식, 상세 없음, 상세가 행과 일치)만 코드에 귀속
+        code = row_code or (popup_code if consistent else None)
+        if code:
+            basic = {k: record[k] for k in BASIC_KEYS if k in record and k != "child_code"}
+            basic["수가코드"] = code
+            self._add_basic(Fact(code, basic, collected_at, source), row_name)
+
+        if detail:
+            fact = Fact(popup_code, detail, collected_at, source)
+            if not consistent:
+                previous_name, previous_code = self.previous.get(file_name, (None, None))
+                self.flags.append({
+                    "type": FLAG_MISATTRIBUTED,
+                    "row_code": code,
+                    "popup_code": popup_code,
+                    "행위명_기본": record.get("행위명_기본"),
+                    "행위명(한글)": detail.get("행위명(한글)"),
+                    "off_by_one": bool(previous_name) and previous_name == detail_name,
+                    "previous_code": previous_code,
+                    "source": source,
+                })
+            # 팝업 코드의 행위명과 맞는지는 모든 행 정보를 모은 뒤 확인
+            self.pending.append((fact, detail_name))
+
+        self.previous[file_name] = (row_name, code)
+
+    def _add_basic(self, fact, row_name):
+        names = self.basic_names.setdefault(fact.code, {})
+        names.setdefault(row_name, fact.source)
+        current = self.basics.get(fact.code)
+        if current is None or fact.collected_at >= current.collected_at:
+            # 행 정보 중 계층 값은 계층 형식 레코드에만 있으므로 이전 값 유지
+            for key in HIERARCHY_KEYS:
+                if current is not None and key not in fact.values and key in current.values:
+                    fact.values[key] = current.values[key]
+            self.basics[fact.code] = fact
+        else:
+            for key in HIERARCHY_KEYS:
+                if key in fact.values and key not in current.values:
+                    current.values[key] = fact.values[key]
+
+    def _resolve_details(self):
+        """상세 정보를 행위명이 일치하는 코드에 귀속 (팝업 코드 우선, 아니면 행위명 유일 일치 코드)"""
+        owners = {}  # 행위명 키 → 코드 (여러 코드가 같은 이름이면 None)
+        for code, names in self.basic_names.items():
+            for name in names:
+                owners[name] = code if owners.get(name, code) == code else None
+
+        for fact, detail_name in self.pending:
+            claimed = fact.code
+            if claimed and (not detail_name or detail_name in self.basic_names.get(claimed, ())):
+                self.details.setdefault(claimed, []).append(fact)
+                continue
+
+            owner = owners.get(detail_name)
+            if owner:
+                self.flags.append({"type": FLAG_REASSIGNED, "popup_code": claimed, "code": owner,
+                                   "행위명(한글)": fact.values.get("행위명(한글)"), "source": fact.source})
+                fact.code = owner
+                self.details.setdefault(owner, []).append(fact)
+            else:
+                self.flags.append({"type": FLAG_UNRESOLVED, "popup_code": claimed,
+                                   "행위명(한글)": fact.values.get("행위명(한글)"), "source": fact.source})
+        self.pending = []
+
+    def _check_conflicts(self, code, facts, chosen):
+        """선택한 상세 값과 다른 값을 가진 일관된 레코드 → 필드별 충돌 플래그"""
+        for key, value in chosen.values.items():
+            variants = {}
+            for fact in facts:
+                other = fact.values.get(key)
+                if other not in (None, ""):
+                    variants.setdefault(str(other).strip(), []).append(fact.source)
+            if len(variants) > 1:
+                self.flags.append({"type": FLAG_CONFLICT, "code": code, "field": key,
+                                   "chosen": value, "values": variants})
+
+    def merge(self):
+        """수가코드별 병합 레코드 (행 정보 + 가장 최근 상세 정보)"""
+        self._resolve_details()
+        merged = []
+        for code in sorted(self.basics.keys() | self.details.keys()):
+            basic = self.basics.get(code)
+            facts = self.details.get(code, [])
+            record = dict(basic.values) if basic else {"수가코드": code}
+            sources = [basic.source] if basic else []
+
+            if facts:
+                chosen = max(facts, key=lambda fact: fact.collected_at)
+                self._check_conflicts(code, facts, chosen)
+                record.update(chosen.values)
+                record["상세_수집일시"] = chosen.collected_at
+                sources.append(chosen.source)
+
+            record["child_code"] = code
+            record["출처"] = ";".join(sources)
+            merged.append(record)
+        return merged
+
+
+def merge_pages(json_dir=JSON_DIR, csv_path=None):
+    """페이지 파일(+CSV) 스트리밍 병합 → (병합 레코드, 플래그)"""
+    engine = MergeEngine()
+    for source, record in iter_page_files(json_dir, csv_path):
+        engine.add(source, record)
+    merged = engine.merge()
+    logger.info(f"레코드 {engine.records_seen}개 → 수가코드 {len(merged)}개 (상세 포함 {len(engine.details)}개)")
+    return merged, engine.flags
+
+
+def main():
+    """페이지 결과 중복 제거 병합 실행"""
+    parser = argparse.ArgumentParser(description="page_N.json / page_N_hierarchical.json 중복 제거 병합 + 충돌·오귀속 검사")
+    parser.add_argument("--json-dir", default=JSON_DIR, help="페이지별 JSON 폴더")
+    parser.add_argument("--csv", help="함께 병합할 스크래핑 CSV (예: koicd_complete_data.csv)")
+    parser.add_argument("--output-json", default=MERGED_JSON)
+    parser.add_argument("--output-csv", default=MERGED_CSV)
+    parser.add_argument("--flags", default=FLAGS_JSON, help="충돌/오귀속 플래그 JSON")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    merged, flags = merge_pages(args.json_dir, args.csv)
+
+    with open(args.output_json, "w", encoding="utf-8") as f:
+        json.dump(merged, f, ensure_ascii=False, indent=2)
+    write_records_csv(merged, args.output_csv)
+    with open(args.flags, "w", encoding="utf-8") as f:
+        json.dump(flags, f, ensure_ascii=False, indent=2)
+
+    counts = {}
+    for flag in flags:
+        counts[flag["type"]] = counts.get(flag["type"], 0) + 1
+    off_by_one = sum(1 for flag in flags if flag.get("off_by_one"))
+    logger.info(f"💾 병합 결과 저장: {args.output_json}, {args.output_csv}")
+    logger.info(f"⚠️ 플래그 {len(flags)}건: {counts} (한 칸 밀린 팝업 {off_by_one}건) → {args.flags}")
+
+
+if __name__ == "__main__":
+    main()
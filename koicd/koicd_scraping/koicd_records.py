@@ -0,0 +1,184 @@
+import csv
+from datetime import datetime
+from html.parser import HTMLParser
+
+# CSV 계층구조 우선 컬럼
+PRIORITY_COLUMNS = [
+    "parent_code", "child_code", "hierarchy_level", "is_parent",
+    "수가코드", "행위명_기본", "분류코드", "분류단계",
+    "행위명(한글)", "행위명(영문)", "산정명",
+    "수술여부", "상대가치점수", "본인부담률", "급여여부",
+    "페이지", "수집일시"
+]
+
+# 닫는 태그가 없는 요소
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+
+class Node:
+    """저장된 HTML 파싱용 최소 DOM 노드"""
+
+    __slots__ = ("tag", "attrs", "children", "parent")
+
+    def __init__(self, tag, attrs=None, parent=None):
+        self.tag = tag
+        self.attrs = attrs or {}
+        self.children = []
+        self.parent = parent
+
+    def find_all(self, tag):
+        """하위 요소 중 태그가 일치하는 요소 (문서 순서, querySelectorAll과 동일)"""
+        found = []
+        stack = list(reversed(self.children))
+        while stack:
+            node = stack.pop()
+            if isinstance(node, Node):
+                if node.tag == tag:
+                    found.append(node)
+                stack.extend(reversed(node.children))
+        return found
+
+    def text_content(self):
+        """textContent와 같은 방식으로 하위 텍스트 연결"""
+        parts = []
+        stack = list(reversed(self.children))
+        while stack:
+            node = stack.pop()
+            if isinstance(node, Node):
+                stack.extend(reversed(node.children))
+            else:
+                parts.append(node)
+        return "".join(parts)
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Node("#document")
+        self.current = self.root
+
+    def handle_starttag(self, tag, attrs):
+        node = Node(tag, dict(attrs), self.current)
+        self.current.children.append(node)
+        if tag not in VOID_TAGS:
+            self.current = node
+
+    def handle_endtag(self, tag):
+        # 짝이 맞지 않는 닫는 태그는 가장 가까운 같은 태그까지 닫음
+        node = self.current
+        while node is not self.root and node.tag != tag:
+            node = node.parent
+        if node is not self.root:
+            self.current = node.parent
+
+    def handle_data(self, data):
+        self.current.children.append(data)
+
+
+def parse_html(html):
+    """HTML 문자열 → Node 트리"""
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.root
+
+
+def parse_table_rows(html):
+    """목록/행 HTML → [{cls, cells}] (펼치기 스크립트의 직렬화 형식과 동일)"""
+    return [
+        {
+            "cls": tr.attrs.get("class") or "",
+            "cells": [td.text_content().strip() for td in tr.find_all("td")],
+        }
+        for tr in parse_html(html).find_all("tr")
+    ]
+
+
+def parse_popup(html):
+    """팝업 HTML → 상세 정보 dict (extract_popup_content와 같은 규칙)"""
+    detail_data = {}
+
+    for table in parse_html(html).find_all("table"):
+        for row in table.find_all("tr"):
+            ths = [th.text_content().strip() for th in row.find_all("th")]
+            tds = [td.text_content().strip() for td in row.find_all("td")]
+
+            # 단일 TH-TD 구조 (colspan 또는 일반적인 경우)
+            if len(ths) == 1 and (len(tds) == 1 or len(tds) >= 3):
+                detail_data[ths[0]] = tds[0]
+            # 2개 TH-TD 쌍 구조
+            elif len(ths) == 2 and len(tds) >= 2:
+                detail_data[ths[0]] = tds[0]
+                detail_data[ths[1]] = tds[1]
+            # 3개 이상의 TH-TD 쌍
+            elif len(ths) >= 3 and len(tds) >= 3:
+                for th_text, td_text in zip(ths, tds):
+                    if th_text and td_text:
+                        detail_data[th_text] = td_text
+
+    # 텍스트 정리
+    cleaned_data = {}
+    for key, value in detail_data.items():
+        if key and value and key != value:  # 의미있는 데이터만
+            cleaned_data[key.replace('\n', ' ').strip()] = value.replace('\n', ' ').strip()
+    return cleaned_data
+
+
+def row_basic_info(cells):
+    """행 TD 텍스트 → 기본 정보 (TD[1]: 수가코드, TD[2]: 행위명)"""
+    if len(cells) < 3 or not cells[1] or not cells[2]:
+        return None
+    return {"수가코드": cells[1], "행위명_기본": cells[2]}
+
+
+def is_main_class(row_class):
+    """숫자가 포함된 class를 가진 행이 메인 행"""
+    return any(c.isdigit() for c in row_class or "")
+
+
+def rows_to_records(rows, page, collected_at=None):
+    """직렬화된 전체 행 → 레코드 (행 순서와 class로 부모/자식 관계 결정)"""
+    page_data = []
+    parent_code = None
+
+    for row in rows:
+        basic_info = row_basic_info(row["cells"])
+        if not basic_info:
+            continue
+
+        code = basic_info["수가코드"]
+        if is_main_class(row["cls"]):
+            parent_code = code
+            level = 0
+        elif parent_code is not None:
+            level = 1
+        else:
+            continue
+
+        page_data.append({
+            **basic_info,
+            "parent_code": parent_code,
+            "child_code": code,
+            "hierarchy_level": level,
+            "is_parent": level == 0,
+            "페이지": page,
+            "수집일시": collected_at or datetime.now().isoformat()
+        })
+
+    return page_data
+
+
+def write_records_csv(records, path):
+    """레코드를 CSV로 저장 (계층구조 우선 컬럼 → 나머지 컬럼 이름순)"""
+    all_keys = set()
+    for item in records:
+        all_keys.update(item.keys())
+
+    ordered_cols = [col for col in PRIORITY_COLUMNS if col in all_keys]
+    ordered_cols.extend(sorted(all_keys - set(ordered_cols)))
+
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.DictWriter(f, fieldnames=ordered_cols)
+        writer.writeheader()
+        for item in records:
+            writer.writerow({col: item.get(col, "") for col in ordered_cols})
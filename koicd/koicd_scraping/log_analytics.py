@@ -0,0 +1,419 @@
+import os
+import re
+import csv
+import json
+import math
+import argparse
+import logging
+from collections import deque
+from datetime import datetime
+
+# 설정
+BASE_DIR = os.path.abspath("koicd_scraping_results")
+LOG_FILE = os.path.join(BASE_DIR, "scraping.log")
+BURST_WINDOW = 60      # 오류 폭주 판단 창 (초)
+BURST_THRESHOLD = 5    # 창 안의 오류가 이 개수 이상이면 폭주 구간
+THROUGHPUT_BUCKET = 60  # 처리량 집계 단위 (초)
+ROW_BATCH = 10000      # 행 테이블 배치 크기 (메모리 상한)
+
+# 텍스트 로그 한 줄: "2025-08-05 16:31:10,080 - INFO - 메시지"
+LINE_PATTERN = re.compile(r"^(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d),(\d{3}) - (\w+) - (.*)$")
+
+RUN_START = "KOICD 스크래핑 시작"
+PAGE_START_PATTERN = re.compile(r"^페이지 (\d+) (?:일괄 펼치기 )?처리 시작")
+PAGE_DONE_PATTERN = re.compile(r"^페이지 (\d+) 완료")
+PAGE_MOVED_PATTERN = re.compile(r"^페이지 (\d+)로 이동 완료")
+ROW_START_PATTERN = re.compile(r"^\s*행 (\d+)/(\d+) 처리 중 \(class: ([^)]*)\)")
+CODE_PATTERN = re.compile(r"^(\s*)(└─)?수가코드: (\S+)")
+ROW_DONE_PATTERN = re.compile(r"✅ (\S+) 처리 완료(?: \(레벨 (\d+)\))?")
+ROW_FAIL_PATTERN = re.compile(r"^행 (\d+) 처리 실패: ([^:]+)")
+
+# 행 테이블 컬럼
+ROW_COLUMNS = ["run", "page", "row", "code", "level", "row_class", "start", "end",
+               "duration", "basic_s", "detail_s", "after_s", "status", "error"]
+
+logger = logging.getLogger(__name__)
+
+
+class StreamingStats:
+    """고정 크기 로그 스케일 히스토그램 기반 통계 (개수/합/최소/최대/근사 분위수)"""
+
+    BUCKETS_PER_DECADE = 20
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self.buckets = {}
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        bucket = math.floor(math.log10(max(value, 1e-3)) * self.BUCKETS_PER_DECADE)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= target:
+                return min(self.max, 10 ** ((bucket + 1) / self.BUCKETS_PER_DECADE))
+        return self.max
+
+    def summary(self):
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 3),
+            "min": round(self.min, 3),
+            "p50": round(self.quantile(0.5), 3),
+            "p95": round(self.quantile(0.95), 3),
+            "max": round(self.max, 3),
+        }
+
+
+def parse_timestamp(text, millis, cache={}):
+    """'YYYY-MM-DD HH:MM:SS' + 밀리초 → epoch 초 (같은 초는 캐시 재사용)"""
+    base = cache.get(text)
+    if base is None:
+        cache.clear()
+        base = cache[text] = datetime.strptime(text, "%Y-%m-%d %H:%M:%S").timestamp()
+    return base + int(millis) / 1000
+
+
+def iter_log_events(lines):
+    """로그 줄 → (epoch 초, 레벨, 메시지) 스트림 - 텍스트 로그와 JSON lines 로그 모두 처리"""
+    for line in lines:
+        line = line.rstrip("\n")
+        if line.startswith("{"):
+            try:
+                event = json.loads(line)
+                yield float(event["ts"]), event.get("level", "INFO"), event.get("msg", "")
+            except (ValueError, KeyError):
+                continue
+            continue
+
+        match = LINE_PATTERN.match(line)
+        if match:
+            yield parse_timestamp(match.group(1), match.group(2)), match.group(3), match.group(4)
+
+
+class LogAnalyzer:
+    """로그 이벤트를 한 번 훑으며 행/단계 소요 시간, 오류 폭주 구간, 시간대별 처리량 계산"""
+
+    def __init__(self, row_sink=None, burst_window=BURST_WINDOW, burst_threshold=BURST_THRESHOLD):
+        self.row_sink = row_sink  # 완료된 행 배치를 받는 콜백 (메모리에 쌓지 않음)
+        self.burst_window = burst_window
+        self.burst_threshold = burst_threshold
+
+        self.runs = []
+        self.run = None
+        self.page = None
+        self.page_started = None
+        self.row = None
+        self.last_row = None
+        self.batch = []
+
+        self.phases = {name: StreamingStats() for name in ("row", "basic", "detail", "after", "page", "navigation")}
+        self.throughput = {}  # 버킷 시작 epoch → 완료 행 수
+        self.error_types = {}
+        self.recent_errors = deque()
+        self.bursts = []
+        self.burst = None
+        self.nav_started = None
+
+    # ---------- 실행/페이지 ----------
+
+    def _start_run(self, ts):
+        self._close_row(ts, "interrupted")
+        if self.last_row is not None:
+            self._emit(self.last_row)
+        self.run = {"run": len(self.runs) + 1, "start": ts, "end": ts, "pages": 0, "rows": 0, "errors": 0, "warnings": 0}
+        self.runs.append(self.run)
+        self.page = None
+        self.last_row = None
+
+    # ---------- 행 ----------
+
+    def _open_row(self, ts, row_index=None, row_class=None, code=None, level=0):
+        self._close_row(ts, "interrupted")
+        if self.last_row is not None and self.last_row["after_s"] is None:
+            self.last_row["after_s"] = ts - self.last_row["end"]
+            self.phases["after"].add(self.last_row["after_s"])
+            self._emit(self.last_row)
+        self.last_row = None
+        self.row = {
+            "run": self.run["run"], "page": self.page, "row": row_index, "code": code, "level": level,
+            "row_class": row_class, "start": ts, "end": None, "duration": None, "basic_s": None,
+            "detail_s": None, "after_s": None, "status": None, "error": None, "code_ts": ts if code else None,
+        }
+
+    def _close_row(self, ts, status, error=None):
+        row = self.row
+        if row is None:
+            return
+        self.row = None
+        row["end"] = ts
+        row["duration"] = ts - row["start"]
+        row["status"] = status
+        row["error"] = error
+        if row["code_ts"] is not None:
+            row["detail_s"] = ts - row["code_ts"]
+        if status != "ok":
+            self._emit(row)
+            return
+
+        self.phases["row"].add(row["duration"])
+        if row["basic_s"] is not None:
+            self.phases["basic"].add(row["basic_s"])
+        if row["detail_s"] is not None:
+            self.phases["detail"].add(row["detail_s"])
+        bucket = int(ts // THROUGHPUT_BUCKET * THROUGHPUT_BUCKET)
+        self.throughput[bucket] = self.throughput.get(bucket, 0) + 1
+        self.run["rows"] += 1
+        # 다음 행 시작까지의 시간(토글/대기)을 채운 뒤 내보냄
+        self.last_row = row
+
+    def _emit(self, row):
+        row.pop("code_ts", None)
+        for key in ("start", "end", "duration", "basic_s", "detail_s", "after_s"):
+            if row[key] is not None:
+                row[key] = round(row[key], 3)
+        self.batch.append(row)
+        if len(self.batch) >= ROW_BATCH:
+            self.flush()
+
+    def flush(self):
+        if self.batch and self.row_sink:
+            self.row_sink(self.batch)
+        self.batch = []
+
+    # ---------- 오류 ----------
+
+    def _error(self, ts, kind):
+        self.run["errors"] += 1
+        self.error_types[kind] = self.error_types.get(kind, 0) + 1
+
+        self.recent_errors.append(ts)
+        while self.recent_errors and ts - self.recent_errors[0] > self.burst_window:
+            self.recent_errors.popleft()
+
+        if self.burst and ts - self.burst["end"] <= self.burst_window:
+            self.burst["end"] = ts
+            self.burst["errors"] += 1
+        elif len(self.recent_errors) >= self.burst_threshold:
+            self.burst = {"run": self.run["run"], "start": self.recent_errors[0], "end": ts,
+                          "errors": len(self.recent_errors), "first_error": kind}
+            self.bursts.append(self.burst)
+
+    # ---------- 이벤트 처리 ----------
+
+    def feed(self, ts, level, msg):
+        if msg == RUN_START or self.run is None:
+            self._start_run(ts)
+            if msg == RUN_START:
+                return
+        self.run["end"] = ts
+
+        if level == "WARNING":
+            self.run["warnings"] += 1
+
+        match = ROW_START_PATTERN.match(msg)
+        if match:
+            self._open_row(ts, int(match.group(1)), match.group(3))
+            return
+
+        match = CODE_PATTERN.match(msg)
+        if match:
+            level_num = 1 if match.group(2) else 0
+            if self.row is None or self.row["code"] is not None:
+                # 하위 행은 '행 i/n' 없이 수가코드 줄로 시작
+                self._open_row(ts, code=match.group(3), level=level_num)
+            else:
+                self.row["code"] = match.group(3)
+                self.row["code_ts"] = ts
+                self.row["basic_s"] = ts - self.row["start"]
+            return
+
+        match = ROW_DONE_PATTERN.search(msg)
+        if match and self.row is not None and self.row["code"] == match.group(1):
+            if match.group(2):
+                self.row["level"] = int(match.group(2))
+            self._close_row(ts, "ok")
+            return
+
+        match = ROW_FAIL_PATTERN.match(msg)
+        if match:
+            kind = match.group(2).strip()
+            if self.row is not None:
+                self._close_row(ts, "error", kind)
+            self._error(ts, kind)
+            return
+
+        if level in ("ERROR", "CRITICAL"):
+            self._error(ts, msg.split(":")[0][:60])
+            return
+
+        match = PAGE_START_PATTERN.match(msg)
+        if match:
+            self.page = int(match.group(1))
+            self.page_started = ts
+            self.run["pages"] += 1
+            if self.nav_started is not None:
+                self.phases["navigation"].add(ts - self.nav_started)
+                self.nav_started = None
+            return
+
+        match = PAGE_DONE_PATTERN.match(msg)
+        if match and self.page_started is not None:
+            self.phases["page"].add(ts - self.page_started)
+            self.page_started = None
+            self.nav_started = ts
+            return
+
+        if PAGE_MOVED_PATTERN.match(msg) and self.nav_started is None:
+            self.nav_started = ts
+
+    def finish(self):
+        if self.runs:
+            self._close_row(self.runs[-1]["end"], "interrupted")
+        if self.last_row is not None:
+            self._emit(self.last_row)
+            self.last_row = None
+        self.flush()
+
+    def report(self):
+        """요약 보고서 dict"""
+        def iso(ts):
+            return datetime.fromtimestamp(ts).isoformat(timespec="seconds")
+
+        runs = []
+        for run in self.runs:
+            duration = run["end"] - run["start"]
+            runs.append({
+                **run,
+                "start": iso(run["start"]),
+                "end": iso(run["end"]),
+                "duration_s": round(duration, 1),
+                "rows_per_min": round(run["rows"] / duration * 60, 2) if duration > 0 else None,
+            })
+
+        return {
+            "runs": runs,
+            "phases": {name: stats.summary() for name, stats in self.phases.items()},
+            "error_types": dict(sorted(self.error_types.items(), key=lambda item: -item[1])),
+            "error_bursts": [
+                {**burst, "start": iso(burst["start"]), "end": iso(burst["end"]),
+                 "duration_s": round(burst["end"] - burst["start"], 1)}
+                for burst in self.bursts
+            ],
+            "throughput_per_min": [
+                {"minute": iso(bucket), "rows": count} for bucket, count in sorted(self.throughput.items())
+            ],
+        }
+
+
+class CsvRowSink:
+    """행 테이블 CSV 출력"""
+
+    def __init__(self, path):
+        self.file = open(path, "w", newline="", encoding="utf-8-sig")
+        self.writer = csv.DictWriter(self.file, fieldnames=ROW_COLUMNS)
+        self.writer.writeheader()
+
+    def __call__(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetRowSink:
+    """행 테이블 Parquet 출력 (배치 단위 row group으로 기록)"""
+
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet 출력에는 pyarrow가 필요합니다 (pip install pyarrow) - CSV 출력은 --rows-csv 사용")
+        self.pa = pa
+        self.schema = pa.schema([
+            ("run", pa.int32()), ("page", pa.int32()), ("row", pa.int32()), ("code", pa.string()),
+            ("level", pa.int8()), ("row_class", pa.string()), ("start", pa.float64()), ("end", pa.float64()),
+            ("duration", pa.float64()), ("basic_s", pa.float64()), ("detail_s", pa.float64()),
+            ("after_s", pa.float64()), ("status", pa.string()), ("error", pa.string()),
+        ])
+        self.writer = pq.ParquetWriter(path, self.schema, compression="zstd")
+
+    def __call__(self, rows):
+        columns = {name: [row[name] for row in rows] for name in ROW_COLUMNS}
+        self.writer.write_table(self.pa.Table.from_pydict(columns, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+def analyze(paths, row_sinks=()):
+    """로그 파일들을 순서대로 스트리밍 분석"""
+    def sink(rows):
+        for row_sink in row_sinks:
+            row_sink(rows)
+
+    analyzer = LogAnalyzer(row_sink=sink)
+    for path in paths:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for ts, level, msg in iter_log_events(f):
+                analyzer.feed(ts, level, msg)
+    analyzer.finish()
+    return analyzer.report()
+
+
+def main():
+    """수집 로그 분석 실행"""
+    parser = argparse.ArgumentParser(description="scraping.log 스트리밍 분석 (행/단계 소요 시간, 오류 폭주, 처리량)")
+    parser.add_argument("logs", nargs="*", default=[LOG_FILE], help="분석할 로그 파일 (기본: scraping.log)")
+    parser.add_argument("--report", help="요약 보고서 JSON 저장 경로")
+    parser.add_argument("--rows-csv", help="행 단위 소요 시간 CSV 저장 경로")
+    parser.add_argument("--rows-parquet", help="행 단위 소요 시간 Parquet 저장 경로 (pyarrow 필요)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    sinks = []
+    if args.rows_csv:
+        sinks.append(CsvRowSink(args.rows_csv))
+    if args.rows_parquet:
+        sinks.append(ParquetRowSink(args.rows_parquet))
+
+    try:
+        report = analyze(args.logs, sinks)
+    finally:
+        for sink in sinks:
+            sink.close()
+
+    for run in report["runs"]:
+        logger.info(f"실행 {run['run']}: {run['start']} ~ {run['end']} ({run['duration_s']}초), "
+                    f"페이지 {run['pages']}개, 행 {run['rows']}개 ({run['rows_per_min']}행/분), 오류 {run['errors']}개")
+    for name, stats in report["phases"].items():
+        if stats["count"]:
+            logger.info(f"   └─ {name}: {stats['count']}회, 평균 {stats['mean']}초, p50 {stats['p50']}초, "
+                        f"p95 {stats['p95']}초, 최대 {stats['max']}초")
+    for burst in report["error_bursts"]:
+        logger.info(f"⚠️ 오류 폭주: {burst['start']} ~ {burst['end']} ({burst['errors']}건, {burst['first_error']})")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        logger.info(f"💾 보고서 저장: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import os
+import sys
+import time
+import runpy
+import atexit
+import inspect
+import argparse
+import functools
+import logging
+
+# 설정
+SCRAPER_DIR = os.path.dirname(os.path.abspath(__file__))
+PROFILE_FILE = os.path.abspath(os.path.join("koicd_scraping_results", "playwright_profile.folded"))
+
+# 감싸는 Playwright 클래스 (각 비동기 메서드 호출 = 브라우저와의 왕복 1회 이상)
+WRAPPED_CLASSES = ["Page", "Frame", "ElementHandle", "JSHandle", "Locator", "Keyboard", "Mouse", "BrowserContext"]
+
+logger = logging.getLogger(__name__)
+
+
+class PlaywrightProfiler:
+    """Playwright 비동기 호출을 호출한 스크래퍼 메서드 스택별로 횟수/시간 집계"""
+
+    def __init__(self, roots=(SCRAPER_DIR,)):
+        self.roots = tuple(os.path.abspath(root) + os.sep for root in roots)
+        self.own_file = os.path.abspath(__file__)
+        self.stacks = {}  # (스크래퍼 메서드..., Playwright 메서드) → [호출 수, 누적 시간]
+        self.originals = []
+        self.started = None
+
+    def scraper_stack(self):
+        """현재 호출 위치의 스크래퍼 코드 프레임 이름 (바깥 → 안쪽)"""
+        names = []
+        frame = sys._getframe(2)
+        while frame is not None:
+            filename = os.path.abspath(frame.f_code.co_filename)
+            if filename != self.own_file and filename.startswith(self.roots):
+                names.append(frame.f_code.co_qualname)
+            frame = frame.f_back
+        names.reverse()
+        return tuple(names)
+
+    def record(self, stack, elapsed):
+        entry = self.stacks.get(stack)
+        if entry is None:
+            self.stacks[stack] = [1, elapsed]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed
+
+    def _wrap(self, cls_name, name, method):
+        profiler = self
+
+        @functools.wraps(method)
+        async def wrapper(*args, **kwargs):
+            stack = profiler.scraper_stack() + (f"{cls_name}.{name}",)
+            start = time.perf_counter()
+            try:
+                return await method(*args, **kwargs)
+            finally:
+                profiler.record(stack, time.perf_counter() - start)
+
+        return wrapper
+
+    def install(self):
+        """Playwright 클래스의 비동기 메서드를 계측 래퍼로 교체"""
+        from playwright.async_api import _generated
+
+        for cls_name in WRAPPED_CLASSES:
+            cls = getattr(_generated, cls_name, None)
+            if cls is None:
+                continue
+            for name, method in list(vars(cls).items()):
+                if name.startswith("_") or not inspect.iscoroutinefunction(method):
+                    continue
+                self.originals.append((cls, name, method))
+                setattr(cls, name, self._wrap(cls_name, name, method))
+
+        self.started = time.perf_counter()
+        logger.info(f"Playwright 호출 계측 시작: {len(self.originals)}개 메서드")
+        return self
+
+    def uninstall(self):
+        for cls, name, method in self.originals:
+            setattr(cls, name, method)
+        self.originals = []
+
+    def method_totals(self):
+        """가장 안쪽 스크래퍼 메서드별 (왕복 수, 누적 시간)"""
+        totals = {}
+        for stack, (count, elapsed) in self.stacks.items():
+            owner = stack[-2] if len(stack) > 1 else "(외부)"
+            total = totals.setdefault(owner, [0, 0.0])
+            total[0] += count
+            total[1] += elapsed
+        return sorted(totals.items(), key=lambda item: -item[1][1])
+
+    def dump(self, path=PROFILE_FILE):
+        """flame graph 도구(flamegraph.pl, speedscope)용 folded stack 저장 - 값은 마이크로초"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, (count, elapsed) in sorted(self.stacks.items()):
+                f.write(f"{';'.join(stack)} {int(elapsed * 1_000_000)}\n")
+
+        total_calls = sum(count for count, _ in self.stacks.values())
+        total_time = sum(elapsed for _, elapsed in self.stacks.values())
+        wall = time.perf_counter() - self.started if self.started else 0.0
+        logger.info(f"🔥 Playwright 왕복 {total_calls}회, 누적 {total_time:.1f}초 (실행 시간 {wall:.1f}초)")
+        for owner, (count, elapsed) in self.method_totals()[:15]:
+            logger.info(f"   └─ {owner}: {count}회, {elapsed:.2f}초 (평균 {elapsed / count * 1000:.0f}ms)")
+        logger.info(f"💾 프로파일 저장: {path}")
+
+
+def main():
+    """스크립트를 Playwright 호출 계측 상태로 실행 (python -m cProfile과 같은 방식)"""
+    parser = argparse.ArgumentParser(description="Playwright 왕복 프로파일러")
+    parser.add_argument("--output", default=PROFILE_FILE, help="folded stack 출력 경로")
+    parser.add_argument("script", help="실행할 스크래퍼/디버깅 스크립트")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="스크립트 인자")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    script = os.path.abspath(args.script)
+    profiler = PlaywrightProfiler(roots=(SCRAPER_DIR, os.path.dirname(script))).install()
+    atexit.register(profiler.dump, args.output)
+
+    sys.argv = [script] + args.args
+    sys.path.insert(0, os.path.dirname(script))
+    runpy.run_path(script, run_name="__main__")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+import time
+import random
+import asyncio
+import argparse
+import logging
+import threading
+import urllib.error
+import urllib.request
+from collections import deque
+from contextlib import asynccontextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 설정
+INITIAL_RATE = 2.0         # 시작 요청 속도 (회/초) - 기존 고정 대기(행 0.5초)와 같은 수준
+MIN_RATE = 0.2             # 최저 속도
+MAX_RATE = 10.0            # 최고 속도 (서버 부담 상한)
+ADDITIVE_STEP = 0.5        # 정상 구간에서 증가량 (회/초)
+DECREASE_FACTOR = 0.5      # 오류/지연 시 감소 배율
+INCREASE_EVERY = 5         # 최소 연속 성공 횟수 (실제로는 약 1초 분량의 성공마다 한 번 증가)
+SLOW_FACTOR = 2.0          # 지연이 기준의 이 배수를 넘으면 감속
+BASELINE_SAMPLES = 10      # 기준 지연 측정 샘플 수
+MAX_CONCURRENCY = 8        # 동시 작업 수 상한
+
+# 작업 종류별 대기 가중치 (대기 시간 = 가중치 / 속도, 직전 작업이 끝난 시점부터)
+# 초기 속도 2.0에서 하위 행 0.3초, 행 0.5초, 페이지 2초로 기존 고정 대기와 같음
+# (팝업 닫기 후 화면 안정화 대기는 서버 요청 간격이 아니므로 스크래퍼의 고정 대기로 유지)
+PACE_WEIGHTS = {
+    "child": 0.6,
+    "row": 1.0,
+    "page": 4.0,
+}
+
+logger = logging.getLogger(__name__)
+
+
+class RateController:
+    """AIMD(가산 증가/승산 감소) 방식 요청 속도·동시성 제어"""
+
+    def __init__(self, initial_rate=INITIAL_RATE, min_rate=MIN_RATE, max_rate=MAX_RATE,
+                 max_concurrency=MAX_CONCURRENCY, slow_factor=SLOW_FACTOR):
+        self.rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.max_concurrency = max_concurrency
+        self.concurrency = 1
+        self.slow_factor = slow_factor
+
+        self.next_slot = 0.0   # 다음 슬롯 시작 가능 시각 (동시 슬롯 간 시작 간격)
+        self.last_end = 0.0    # 직전 작업 종료 시각
+        self.in_flight = 0
+        self.condition = None  # 이벤트 루프 안에서 생성
+        self.latency = None    # 지연 EWMA
+        self.samples = []
+        self.baseline = None
+        self.successes = 0
+        self.last_decrease = 0.0
+        self.history = deque(maxlen=1000)  # (시각, 속도, 동시성)
+        self.stats = {"requests": 0, "errors": 0, "slow": 0, "increases": 0, "decreases": 0, "waited": 0.0}
+
+    async def pace(self, kind="row"):
+        """작업 직후 호출 - 지금(직전 작업 종료 시점)부터 작업 종류별 최소 간격 대기 (기존 고정 sleep 대체)
+
+        작업이 간격보다 오래 걸렸어도 대기를 건너뛰지 않는다.
+        """
+        interval = PACE_WEIGHTS.get(kind, 1.0) / self.rate
+        self.last_end = time.monotonic()
+        self.next_slot = max(self.next_slot, self.last_end + interval)
+        await self._sleep(interval)
+
+    async def _wait_turn(self, kind):
+        """슬롯 시작 전 대기 - 동시 슬롯끼리는 시작 간격, 혼자 실행 중이면 직전 작업 종료 후 간격"""
+        interval = PACE_WEIGHTS.get(kind, 1.0) / self.rate
+        now = time.monotonic()
+        start = max(now, self.next_slot)
+        if self.in_flight == 1:
+            start = max(start, self.last_end + interval)
+        self.next_slot = start + interval
+        await self._sleep(start - now)
+
+    async def _sleep(self, delay):
+        if delay > 0:
+            self.stats["waited"] += delay
+            await asyncio.sleep(delay)
+
+    @asynccontextmanager
+    async def slot(self, kind="row"):
+        """동시성 한도 안에서 요청 실행 + 지연/오류 기록"""
+        if self.condition is None:
+            self.condition = asyncio.Condition()
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.in_flight < self.concurrency)
+            self.in_flight += 1
+
+        await self._wait_turn(kind)
+        start = time.monotonic()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.last_end = time.monotonic()
+            self.record(self.last_end - start, ok)
+            async with self.condition:
+                self.in_flight -= 1
+                self.condition.notify_all()
+
+    def record(self, latency=None, ok=True):
+        """응답 결과 반영 - 오류/지연이면 승산 감소, 정상이 이어지면 가산 증가"""
+        self.stats["requests"] += 1
+        slow = False
+        if latency is not None:
+            self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+            if self.baseline is None:
+                self.samples.append(latency)
+                if len(self.samples) >= BASELINE_SAMPLES:
+                    self.baseline = sorted(self.samples)[len(self.samples) // 2]
+            elif self.latency > self.baseline * self.slow_factor:
+                slow = True
+
+        if not ok or slow:
+            self.stats["errors" if not ok else "slow"] += 1
+            self._decrease("오류" if not ok else f"지연 {self.latency * 1000:.0f}ms")
+            return
+
+        self.successes += 1
+        if self.successes >= max(INCREASE_EVERY, self.rate):
+            self.successes = 0
+            self._increase()
+
+    def _increase(self):
+        if self.rate >= self.max_rate and self.concurrency >= self.max_concurrency:
+            return
+        self.rate = min(self.max_rate, self.rate + ADDITIVE_STEP)
+        self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+        self.stats["increases"] += 1
+        self.history.append((time.monotonic(), self.rate, self.concurrency))
+
+    def _decrease(self, cause):
+        self.successes = 0
+        now = time.monotonic()
+        # 한 번의 과부하에 연속으로 여러 번 감속하지 않도록 현재 간격만큼은 유지
+        if now - self.last_decrease < max(1.0 / self.rate, self.latency or 0):
+            return
+        self.last_decrease = now
+        self.rate = max(self.min_rate, self.rate * DECREASE_FACTOR)
+        self.concurrency = max(1, int(self.concurrency * DECREASE_FACTOR))
+        self.stats["decreases"] += 1
+        self.history.append((now, self.rate, self.concurrency))
+        logger.info(f"🐢 감속 ({cause}): {self.rate:.2f}회/초, 동시성 {self.concurrency}")
+
+    def log_summary(self):
+        stats = self.stats
+        rates = [rate for _, rate, _ in self.history] or [self.rate]
+        logger.info(f"🚦 속도 제어: 현재 {self.rate:.2f}회/초 (범위 {min(rates):.2f}~{max(rates):.2f}), "
+                    f"증가 {stats['increases']}회, 감소 {stats['decreases']}회")
+        logger.info(f"   └─ 요청 {stats['requests']}회, 오류 {stats['errors']}회, 지연 감지 {stats['slow']}회, "
+                    f"대기 합계 {stats['waited']:.1f}초")
+
+
+class OverloadHandler(BaseHTTPRequestHandler):
+    """처리 용량을 넘으면 지연이 늘고 503을 내는 대역 서버"""
+
+    capacity = 20.0      # 초당 처리 가능 요청 수
+    base_latency = 0.02  # 기본 응답 지연 (초)
+    arrivals = deque()
+    lock = threading.Lock()
+
+    def do_GET(self):
+        now = time.monotonic()
+        with self.lock:
+            self.arrivals.append(now)
+            while self.arrivals and now - self.arrivals[0] > 1.0:
+                self.arrivals.popleft()
+            load = len(self.arrivals) / self.capacity
+
+        # 부하에 따라 지연 주입, 용량의 1.5배를 넘으면 일부 요청 거절
+        time.sleep(self.base_latency * max(1.0, load) ** 2 * random.uniform(0.8, 1.2))
+        if load > 1.5 and random.random() < 0.5:
+            self.send_response(503)
+            self.end_headers()
+            return
+
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_overload_server(capacity, base_latency):
+    """대역 서버를 백그라운드 스레드로 시작하고 (서버, URL) 반환"""
+    handler = type("Handler", (OverloadHandler,), {
+        "capacity": capacity, "base_latency": base_latency, "arrivals": deque(), "lock": threading.Lock()
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+def fetch_status(url):
+    try:
+        with urllib.request.urlopen(url, timeout=10) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+async def simulate(requests, workers, capacity, base_latency, max_rate):
+    """대역 서버에 대해 제어기 동작 시뮬레이션"""
+    server, url = start_overload_server(capacity, base_latency)
+    controller = RateController(max_rate=max_rate, max_concurrency=workers)
+    remaining = list(range(requests))
+    statuses = []
+
+    async def worker():
+        while remaining:
+            remaining.pop()
+            try:
+                async with controller.slot("row"):
+                    status = await asyncio.to_thread(fetch_status, url)
+                    statuses.append(status)
+                    if status != 200:
+                        raise RuntimeError(status)
+            except RuntimeError:
+                pass
+
+    async def monitor():
+        while remaining:
+            await asyncio.sleep(1)
+            logger.info(f"   속도 {controller.rate:.2f}회/초, 동시성 {controller.concurrency}, "
+                        f"지연 {(controller.latency or 0) * 1000:.0f}ms")
+
+    start = time.monotonic()
+    monitor_task = asyncio.create_task(monitor())
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    monitor_task.cancel()
+    elapsed = time.monotonic() - start
+    server.shutdown()
+
+    ok = statuses.count(200)
+    logger.info(f"✅ 시뮬레이션 완료: {len(statuses)}개 요청 {elapsed:.1f}초 "
+                f"(성공 처리량 {ok / elapsed:.1f}회/초, 서버 용량 {capacity}회/초, 오류율 {(1 - ok / max(1, len(statuses))) * 100:.1f}%)")
+    controller.log_summary()
+
+
+def main():
+    """속도 제어기 시뮬레이션 실행"""
+    parser = argparse.ArgumentParser(description="AIMD 속도 제어기 (로컬 대역 서버 시뮬레이션)")
+    parser.add_argument("--requests", type=int, default=1500)
+    parser.add_argument("--workers", type=int, default=MAX_CONCURRENCY, help="최대 동시성")
+    parser.add_argument("--capacity", type=float, default=20.0, help="대역 서버 초당 처리 용량")
+    parser.add_argument("--base-latency", type=float, default=0.02, help="대역 서버 기본 지연 (초)")
+    parser.add_argument("--max-rate", type=float, default=50.0, help="속도 상한 (회/초)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    asyncio.run(simulate(args.requests, args.workers, args.capacity, args.base_latency, args.max_rate))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import os
+import logging
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+from rate_controller import MAX_RATE
+
+# 설정
+BASE_URL = "https://www.koicd.kr/ins/act.do"
+BASE_DIR = "koicd_scraping_results"
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+
+@dataclass
+class ScraperConfig:
+    """스크래퍼 실행 설정 - 모든 출력 경로는 base_dir 기준 (스크래퍼마다 다른 base_dir로 한 프로세스에서 함께 실행 가능)"""
+
+    base_dir: str = BASE_DIR
+    base_url: str = BASE_URL
+    expand_all: bool = False       # 페이지별 토글 일괄 펼치기 모드
+    http_cache: bool = False       # ETag/Last-Modified 조건부 요청 캐시 사용
+    max_rate: float = MAX_RATE     # 초당 최대 요청 속도 상한
+    headless: bool = False
+    slow_mo: int = 100             # 디버깅용 느린 실행 (ms)
+    start_page: int = 1            # 이 페이지부터 수집 (이어서 수집 시 마지막 저장 페이지 + 1)
+    max_pages: int = None          # 수집할 최대 페이지 수 (None이면 마지막 페이지까지)
+    queue: str = None              # 공유 작업 큐 URL - 지정 시 임대받은 페이지 범위만 수집
+    worker_id: str = None
+    profile: str = None            # Playwright 왕복 프로파일 저장 경로
+
+    def __post_init__(self):
+        self.base_dir = os.path.abspath(self.base_dir)
+
+    @property
+    def json_dir(self):
+        return os.path.join(self.base_dir, "json_pages")
+
+    @property
+    def csv_file(self):
+        return os.path.join(self.base_dir, "koicd_complete_data.csv")
+
+    @property
+    def failed_file(self):
+        return os.path.join(self.base_dir, "failed_items.txt")
+
+    @property
+    def log_file(self):
+        return os.path.join(self.base_dir, "scraping.log")
+
+    @property
+    def selector_cache_file(self):
+        return os.path.join(self.base_dir, "selector_cache.json")
+
+    @property
+    def archive_dir(self):
+        return os.path.join(self.base_dir, "raw_archive")
+
+    @property
+    def http_cache_dir(self):
+        return os.path.join(self.base_dir, "http_cache")
+
+    @property
+    def profile_file(self):
+        return os.path.join(self.base_dir, "playwright_profile.folded")
+
+    @property
+    def site_prefix(self):
+        """캐시/오류 감시 대상 URL 접두사 (https://www.koicd.kr/)"""
+        parts = urlsplit(self.base_url)
+        return f"{parts.scheme}://{parts.netloc}/"
+
+    def prepare(self):
+        """출력 폴더 생성 (실행 시점에만 호출 - import/설정 생성 시에는 파일 시스템을 건드리지 않음)"""
+        os.makedirs(self.base_dir, exist_ok=True)
+        os.makedirs(self.json_dir, exist_ok=True)
+
+
+def setup_logging(log_file=None):
+    """콘솔 + (지정 시) 파일 로깅 설정 - CLI 진입점에서만 호출"""
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        os.makedirs(os.path.dirname(log_file), exist_ok=True)
+        handlers.insert(0, logging.FileHandler(log_file, encoding='utf-8'))
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT, handlers=handlers)
@@ -0,0 +1,113 @@
+import os
+import json
+import logging
+
+# 설정
+DEMOTE_AFTER = 3  # 연속 실패 횟수가 이 값 이상이면 후순위로 강등
+
+logger = logging.getLogger(__name__)
+
+
+class SelectorCache:
+    """컨텍스트별 셀렉터 후보 중 성공한 셀렉터를 기억하는 적응형 캐시"""
+
+    def __init__(self, demote_after=DEMOTE_AFTER):
+        self.demote_after = demote_after
+        self.winners = {}   # 컨텍스트 → 마지막으로 성공한 셀렉터
+        self.stats = {}     # 컨텍스트 → 셀렉터 → {hits, misses, streak}
+        self.counters = {}  # 컨텍스트 → {hits, misses, reprobes}
+
+    def _selector_stats(self, context, selector):
+        return self.stats.setdefault(context, {}).setdefault(
+            selector, {"hits": 0, "misses": 0, "streak": 0}
+        )
+
+    def _counter(self, context):
+        return self.counters.setdefault(context, {"hits": 0, "misses": 0, "reprobes": 0})
+
+    def ordered(self, context, selectors):
+        """시도 순서: 우승 셀렉터 → 일반 후보 (원래 순서) → 강등된 후보"""
+        winner = self.winners.get(context)
+        stats = self.stats.get(context, {})
+        first = [winner] if winner in selectors else []
+        normal, demoted = [], []
+        for selector in selectors:
+            if selector == winner:
+                continue
+            if stats.get(selector, {}).get("streak", 0) >= self.demote_after:
+                demoted.append(selector)
+            else:
+                normal.append(selector)
+        return first + normal + demoted
+
+    def record(self, context, selector, matched):
+        """셀렉터 시도 결과 기록"""
+        stats = self._selector_stats(context, selector)
+        if matched:
+            stats["hits"] += 1
+            stats["streak"] = 0
+            self.winners[context] = selector
+        else:
+            stats["misses"] += 1
+            stats["streak"] += 1
+
+    async def resolve(self, context, selectors, probe):
+        """후보 셀렉터를 순서대로 시도해 (셀렉터, 결과) 반환 - probe(selector)는 결과 또는 None 반환
+
+        우승 셀렉터가 계속 일치하면 다른 후보는 시도하지 않고, 일치하지 않을 때만 재탐색한다.
+        """
+        counter = self._counter(context)
+        winner = self.winners.get(context)
+
+        for selector in self.ordered(context, selectors):
+            try:
+                result = await probe(selector)
+            except Exception as e:
+                logger.debug(f"셀렉터 {selector} 시도 실패: {e}")
+                result = None
+
+            self.record(context, selector, bool(result))
+            if result:
+                if selector == winner:
+                    counter["hits"] += 1
+                else:
+                    counter["misses"] += 1
+                    if winner is not None:
+                        counter["reprobes"] += 1
+                        logger.info(f"셀렉터 재탐색 ({context}): {winner} → {selector}")
+                return selector, result
+
+        counter["misses"] += 1
+        return None, None
+
+    def summary(self):
+        """컨텍스트별 적중/실패 통계"""
+        return {
+            context: {
+                **self._counter(context),
+                "winner": self.winners.get(context),
+                "selectors": self.stats.get(context, {}),
+            }
+            for context in sorted(set(self.counters) | set(self.stats))
+        }
+
+    def log_summary(self):
+        """통계 로그 출력"""
+        for context, info in self.summary().items():
+            logger.info(f"   └─ {context}: 적중 {info['hits']}회, 실패 {info['misses']}회, "
+                        f"재탐색 {info['reprobes']}회 (우선: {info['winner']})")
+
+    def save(self, path):
+        """우승 셀렉터와 통계 저장 (다음 실행에서 재사용)"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"winners": self.winners, "stats": self.stats}, f, ensure_ascii=False, indent=2)
+
+    def load(self, path):
+        """저장된 우승 셀렉터와 통계 로드 (파일이 없으면 무시)"""
+        if not os.path.exists(path):
+            return
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self.winners = data.get("winners", {})
+        self.stats = data.get("stats", {})
+        logger.info(f"셀렉터 캐시 로드: {len(self.winners)}개 컨텍스트")
@@ -0,0 +1,301 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import hashlib
+import argparse
+import logging
+import functools
+import threading
+from abc import ABC, abstractmethod
+
+from koicd_records import write_records_csv
+
+# 설정
+BASE_DIR = os.path.abspath("koicd_scraping_results")
+QUEUE_URL = "sqlite:///" + os.path.join(BASE_DIR, "work_queue.db")
+LEASE_TTL = 300       # 임대 유효 시간 (초) - heartbeat가 끊기면 다른 작업자가 가져감
+MAX_ATTEMPTS = 3      # 이 횟수만큼 실패하면 failed로 전환
+
+# 작업 단위 종류
+KIND_PAGES = "pages"  # {"start": 시작 페이지, "end": 끝 페이지}
+
+# 작업 단위 상태
+PENDING, LEASED, DONE, FAILED = "pending", "leased", "done", "failed"
+
+logger = logging.getLogger(__name__)
+
+
+class WorkQueue(ABC):
+    """작업 단위 임대 큐 인터페이스 (SQLite 외 Redis 등 서버 백엔드도 같은 메서드로 구현)"""
+
+    @abstractmethod
+    def enqueue(self, kind, payloads):
+        """작업 단위 추가 - 같은 내용의 단위는 한 번만 등록"""
+
+    @abstractmethod
+    def lease(self, worker_id, kinds=None, ttl=LEASE_TTL):
+        """대기 중이거나 임대가 만료된 단위 하나를 임대 - (id, kind, payload, token) 또는 None"""
+
+    @abstractmethod
+    def heartbeat(self, unit_id, token, ttl=LEASE_TTL):
+        """임대 연장 - 임대를 잃었으면 False"""
+
+    @abstractmethod
+    def commit(self, unit_id, token, result):
+        """결과 커밋 - 현재 임대 토큰의 처음 커밋만 반영 (만료·회수된 토큰이나 이미 커밋된 단위는 False)"""
+
+    @abstractmethod
+    def fail(self, unit_id, token, error):
+        """실패 기록 후 다시 대기 상태로 (MAX_ATTEMPTS 초과 시 failed)"""
+
+    @abstractmethod
+    def stats(self):
+        """상태별 단위 수, 만료된 임대 수, 작업자별 커밋 수"""
+
+    @abstractmethod
+    def results(self):
+        """커밋된 결과 (단위 id 순)"""
+
+
+def unit_id_for(kind, payload):
+    """작업 단위 id (내용 해시 - 여러 작업자가 동시에 등록해도 중복 없음)"""
+    data = json.dumps([kind, payload], ensure_ascii=False, sort_keys=True)
+    return f"{kind}:{hashlib.sha256(data.encode('utf-8')).hexdigest()[:16]}"
+
+
+def locked(method):
+    """연결 하나를 여러 스레드(asyncio.to_thread)에서 쓸 때 호출 직렬화"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """SQLite 파일 기반 작업 큐 (로컬 다중 프로세스/공유 파일 시스템용)"""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA busy_timeout=30000")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS units (
+                id TEXT PRIMARY KEY,
+                seq INTEGER,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                worker TEXT,
+                token TEXT,
+                lease_expires REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT
+            );
+            CREATE INDEX IF NOT EXISTS units_status ON units(status, kind, seq);
+            CREATE TABLE IF NOT EXISTS results (
+                unit_id TEXT PRIMARY KEY,
+                worker TEXT,
+                result TEXT NOT NULL,
+                committed_at REAL NOT NULL
+            );
+        """)
+
+    def _transaction(self):
+        # 쓰기 잠금을 먼저 잡아 두 작업자가 같은 단위를 임대하지 않도록 함
+        self.conn.execute("BEGIN IMMEDIATE")
+
+    @locked
+    def enqueue(self, kind, payloads):
+        added = 0
+        self._transaction()
+        try:
+            seq = self.conn.execute("SELECT COALESCE(MAX(seq), 0) FROM units").fetchone()[0]
+            for payload in payloads:
+                seq += 1
+                cursor = self.conn.execute(
+                    "INSERT OR IGNORE INTO units (id, seq, kind, payload) VALUES (?, ?, ?, ?)",
+                    (unit_id_for(kind, payload), seq, kind, json.dumps(payload, ensure_ascii=False))
+                )
+                added += cursor.rowcount
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return added
+
+    @locked
+    def lease(self, worker_id, kinds=None, ttl=LEASE_TTL):
+        now = time.time()
+        kind_filter = ""
+        params = [now]
+        if kinds:
+            kind_filter = f"AND kind IN ({','.join('?' * len(kinds))})"
+            params.extend(kinds)
+
+        self._transaction()
+        try:
+            # 작업자가 죽어 fail()을 부르지 못한 단위도 시도 횟수를 다 쓰면 재임대하지 않고 failed로 전환
+            self.conn.execute(
+                f"""UPDATE units SET status = '{FAILED}', lease_expires = NULL,
+                       error = COALESCE(error, '임대 만료 (작업자 중단)')
+                    WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?""",
+                (now, MAX_ATTEMPTS)
+            )
+            row = self.conn.execute(
+                f"""SELECT id, kind, payload FROM units
+                    WHERE (status = 'pending' OR (status = 'leased' AND lease_expires < ?)) {kind_filter}
+                    ORDER BY seq LIMIT 1""",
+                params
+            ).fetchone()
+            if row is None:
+                self.conn.execute("COMMIT")
+                return None
+
+            token = uuid.uuid4().hex
+            self.conn.execute(
+                "UPDATE units SET status = 'leased', worker = ?, token = ?, lease_expires = ?, attempts = attempts + 1 WHERE id = ?",
+                (worker_id, token, now + ttl, row[0])
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return row[0], row[1], json.loads(row[2]), token
+
+    @locked
+    def heartbeat(self, unit_id, token, ttl=LEASE_TTL):
+        cursor = self.conn.execute(
+            "UPDATE units SET lease_expires = ? WHERE id = ? AND token = ? AND status = 'leased'",
+            (time.time() + ttl, unit_id, token)
+        )
+        return cursor.rowcount == 1
+
+    @locked
+    def commit(self, unit_id, token, result):
+        self._transaction()
+        try:
+            # 토큰이 다르면 다른 작업자가 다시 임대한 단위 - 오래된 결과는 버림
+            worker = self.conn.execute(
+                "SELECT worker FROM units WHERE id = ? AND token = ? AND status = 'leased'", (unit_id, token)
+            ).fetchone()
+            if worker is None:
+                self.conn.execute("COMMIT")
+                return False
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO results (unit_id, worker, result, committed_at) VALUES (?, ?, ?, ?)",
+                (unit_id, worker[0], json.dumps(result, ensure_ascii=False), time.time())
+            )
+            committed = cursor.rowcount == 1
+            if committed:
+                self.conn.execute(
+                    "UPDATE units SET status = 'done', lease_expires = NULL, error = NULL WHERE id = ?",
+                    (unit_id,)
+                )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return committed
+
+    @locked
+    def fail(self, unit_id, token, error):
+        self.conn.execute(
+            f"""UPDATE units SET status = CASE WHEN attempts >= ? THEN '{FAILED}' ELSE '{PENDING}' END,
+                   lease_expires = NULL, error = ?
+                WHERE id = ? AND token = ? AND status = 'leased'""",
+            (MAX_ATTEMPTS, str(error), unit_id, token)
+        )
+
+    @locked
+    def reset_failed(self):
+        cursor = self.conn.execute("UPDATE units SET status = 'pending', attempts = 0 WHERE status = 'failed'")
+        return cursor.rowcount
+
+    @locked
+    def stats(self):
+        counts = dict(self.conn.execute("SELECT status, COUNT(*) FROM units GROUP BY status").fetchall())
+        expired = self.conn.execute(
+            "SELECT COUNT(*) FROM units WHERE status = 'leased' AND lease_expires < ?", (time.time(),)
+        ).fetchone()[0]
+        workers = self.conn.execute(
+            "SELECT worker, COUNT(*) FROM results GROUP BY worker ORDER BY worker"
+        ).fetchall()
+        return {"status": counts, "expired_leases": expired, "workers": dict(workers)}
+
+    @locked
+    def results(self):
+        rows = self.conn.execute(
+            "SELECT r.unit_id, r.result FROM results r JOIN units u ON u.id = r.unit_id ORDER BY u.seq"
+        ).fetchall()
+        return [(unit_id, json.loads(result)) for unit_id, result in rows]
+
+    @locked
+    def close(self):
+        self.conn.close()
+
+
+def open_queue(url=QUEUE_URL):
+    """큐 URL로 백엔드 선택 (현재는 sqlite:///경로만 지원)"""
+    if url.startswith("sqlite:///"):
+        return SQLiteWorkQueue(url[len("sqlite:///"):])
+    raise ValueError(f"지원하지 않는 큐 백엔드: {url}")
+
+
+def page_range_units(first, last, chunk):
+    """페이지 범위를 chunk 크기의 작업 단위로 분할"""
+    return [{"start": start, "end": min(start + chunk - 1, last)} for start in range(first, last + 1, chunk)]
+
+
+def main():
+    """작업 큐 관리 실행"""
+    parser = argparse.ArgumentParser(description="분산 수집 작업 큐 관리")
+    parser.add_argument("--queue", default=QUEUE_URL, help="큐 URL (sqlite:///경로)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_pages = sub.add_parser("add-pages", help="페이지 범위 작업 단위 등록")
+    p_pages.add_argument("first", type=int)
+    p_pages.add_argument("last", type=int)
+    p_pages.add_argument("--chunk", type=int, default=5, help="작업 단위당 페이지 수")
+
+    sub.add_parser("stats", help="큐 상태 출력")
+    sub.add_parser("reset-failed", help="failed 단위를 다시 대기 상태로")
+
+    p_export = sub.add_parser("export", help="커밋된 결과를 CSV로 내보내기")
+    p_export.add_argument("--csv", default=os.path.join(BASE_DIR, "koicd_queue_data.csv"))
+
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    queue = open_queue(args.queue)
+
+    if args.command == "add-pages":
+        units = page_range_units(args.first, args.last, args.chunk)
+        added = queue.enqueue(KIND_PAGES, units)
+        logger.info(f"페이지 작업 단위 {added}개 등록 (요청 {len(units)}개)")
+
+    elif args.command == "reset-failed":
+        logger.info(f"{queue.reset_failed()}개 단위 재등록")
+
+    elif args.command == "export":
+        records = [record for _, result in queue.results() for record in result.get("records", [])]
+        write_records_csv(records, args.csv)
+        logger.info(f"💾 {len(records)}개 항목 저장: {args.csv}")
+
+    else:
+        stats = queue.stats()
+        logger.info(f"큐 상태: {stats['status']} (만료된 임대 {stats['expired_leases']}개)")
+        for worker, count in stats["workers"].items():
+            logger.info(f"   └─ {worker}: {count}개 단위 커밋")
+
+    queue.close()
+
+
+if __name__ == "__main__":
+    main()